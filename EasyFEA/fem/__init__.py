@@ -6,4 +6,5 @@ from ._utils import ElemType, MatrixType
 from ._mesh import Mesh, Mesh_Optim, Calc_projector
 from ._boundary_conditions import BoundaryCondition, LagrangeCondition
 from ._gmsh_interface import Mesher, gmsh
-from ._group_elems import _GroupElem, GroupElemFactory
\ No newline at end of file
+from ._group_elems import _GroupElem, GroupElemFactory
+from ._strain_operator import StrainOperator
\ No newline at end of file
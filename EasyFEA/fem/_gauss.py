@@ -11,8 +11,12 @@ from ._utils import ElemType, MatrixType
 
 class Gauss:
 
+    # process-wide registry (elemType, matrixType) -> (coord, weights) shared by all Gauss objects
+    __dict_quadratures: dict[tuple[str, str], tuple[np.ndarray, np.ndarray]] = {}
+
     def __init__(self, elemType: str, matrixType: str):
-        """Creates integration points.
+        """Creates integration points.\n
+        The coordinates and weights are computed once per (elemType, matrixType) and returned as read-only arrays.
 
         Parameters
         ----------
@@ -22,7 +26,7 @@ class Gauss:
             matrix type (e.g [MatrixType.rigi, MatrixType.mass, MatrixType.beam])
         """
 
-        coord, weights = Gauss._Gauss_factory(elemType, matrixType)
+        coord, weights = Gauss.__Get_quadrature(elemType, matrixType)
 
         self.__coord = coord
         self.__weights = weights
@@ -243,6 +247,17 @@ class Gauss:
 
         return x, y, z, weights
 
+    @staticmethod
+    def __Get_quadrature(elemType: str, matrixType: str) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the read-only coordinates and weights stored in the registry."""
+        key = (elemType, matrixType)
+        if key not in Gauss.__dict_quadratures:
+            coord, weights = Gauss._Gauss_factory(elemType, matrixType)
+            coord.flags.writeable = False
+            weights.flags.writeable = False
+            Gauss.__dict_quadratures[key] = (coord, weights)
+        return Gauss.__dict_quadratures[key]
+
     @staticmethod
     def _Gauss_factory(elemType: str, matrixType: str) -> tuple[np.ndarray, np.ndarray]:
         """Calculation of integration points according to element and matrix type
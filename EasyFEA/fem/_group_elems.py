@@ -8,13 +8,14 @@ For instance, a TRI3 mesh uses POINT, SEG2 and TRI3 elements."""
 
 from abc import ABC, abstractmethod
 
-from scipy.optimize import least_squares
 import numpy as np
 import scipy.sparse as sparse
 from typing import Callable
+from itertools import product
 
 # fem
 from ._gauss import Gauss
+from ._strain_operator import StrainOperator
 # utils
 from ._utils import ElemType, MatrixType
 
@@ -60,6 +61,8 @@ class _GroupElem(ABC):
         # dictionnary associated with tags on elements or nodes
         self.__dict_nodes_tags = {}
         self.__dict_elements_tags = {}        
+        self.__zeroCopy = False
+        self.__useInt32Indexes = False
         self._InitMatrix()
     
     def _InitMatrix(self) -> None:
@@ -75,9 +78,93 @@ class _GroupElem(ABC):
         self.__dict_phaseField_ReactionPart_e_pg: dict[MatrixType, np.ndarray] = {}
         self.__dict_DiffusePart_e_pg: dict[MatrixType, np.ndarray] = {}
         self.__dict_SourcePart_e_pg: dict[MatrixType, np.ndarray] = {}
+        # Dictionary for each dof_n
+        self.__dict_sparsityPattern: dict[tuple[int, bool], tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self.__InitIndexes()
+        # Adjacency matrices
+        self.__connect_n_e: sparse.csr_matrix = None
+        self.__connect_e_e: sparse.csr_matrix = None
+        # Bin grid used to locate coordinates in elements
+        self.__binGrid: tuple[np.ndarray, float, np.ndarray, np.ndarray, np.ndarray] = None
+
+    def __InitIndexes(self) -> None:
+        """Initializes the assembly indexes dictionaries (assembly_e, lines_e and columns_e for each dof_n).\n
+        The connectivity matrix is set when the group is created, the indexes are only cleared with the other matrices or when the index type changes."""
+        self.__dict_assembly_e: dict[int, np.ndarray] = {}
+        self.__dict_lines_e: dict[int, np.ndarray] = {}
+        self.__dict_columns_e: dict[int, np.ndarray] = {}
+
+    def __Get_cached(self, array: np.ndarray) -> np.ndarray:
+        """Returns the cached array as a read-only view if zeroCopy is enabled, otherwise returns a copy.\n
+        The copy of an array broadcasted over the integration points (see __Broadcast_pg) is the full (e, pg, ...) array."""
+        if not self.__Is_broadcasted(array):
+            # broadcasted views are already read-only
+            array.flags.writeable = False
+        if self.zeroCopy:
+            return array
+        else:
+            return array.copy()
+
+    @staticmethod
+    def __Is_broadcasted(array_e_pg: np.ndarray) -> bool:
+        """Checks whether the array is broadcasted over the integration points (see __Broadcast_pg)."""
+        return array_e_pg.ndim > 1 and array_e_pg.shape[1] > 1 and array_e_pg.strides[1] == 0
+
+    def __Get_first_pg(self, array_e_pg: np.ndarray) -> np.ndarray:
+        """Returns the first integration point (e, 1, ...) if the element is a constant strain element, otherwise returns the array."""
+        if self.isConstantStrain:
+            return array_e_pg[:,:1]
+        else:
+            return array_e_pg
+
+    def __Broadcast_pg(self, array_e_pg: np.ndarray, matrixType: MatrixType) -> np.ndarray:
+        """Broadcasts an array computed on a single integration point (e, 1, ...) over the integration points of matrixType without copying it."""
+        nPg = self.Get_gauss(matrixType).nPg
+        if array_e_pg.shape[1] == nPg:
+            return array_e_pg
+        shape = (array_e_pg.shape[0], nPg, *array_e_pg.shape[2:])
+        return np.broadcast_to(array_e_pg, shape)
 
     ################################################ METHODS ##################################################
+
+    @property
+    def zeroCopy(self) -> bool:
+        """matrices stored in the group (dN_e_pg, B_e_pg, jacobian_e_pg ...) are returned as read-only views instead of copies.\n
+        Saves memory on large meshes, but the returned arrays cannot be modified in place.\n
+        For constant strain elements (TRI3, TETRA4), F_e_pg, invF_e_pg, jacobian_e_pg and dN_e_pg are then returned as views broadcasted over the integration points."""
+        return self.__zeroCopy
+
+    @zeroCopy.setter
+    def zeroCopy(self, value: bool) -> None:
+        self.__zeroCopy = bool(value)
     
+    @property
+    def useInt32Indexes(self) -> bool:
+        """assembly indexes (assembly_e, lines_e and columns_e) are stored as int32 instead of int64 when Nn*dof_n < 2**31.\n
+        Halves the memory used by the indexes."""
+        return self.__useInt32Indexes
+
+    @useInt32Indexes.setter
+    def useInt32Indexes(self, value: bool) -> None:
+        value = bool(value)
+        if value != self.useInt32Indexes:
+            self.__useInt32Indexes = value
+            self.__InitIndexes()
+
+    def Get_index_dtype(self, dof_n: int) -> type:
+        """Returns the integer type used by the assembly indexes of the specified dof_n (np.int32 or np.int64)."""
+        Ndof = self.__coordGlob.shape[0] * dof_n
+        if self.useInt32Indexes and Ndof < np.iinfo(np.int32).max:
+            return np.int32
+        else:
+            return np.int64
+
+    @property
+    def isConstantStrain(self) -> bool:
+        """the element is affine (TRI3, TETRA4), F_e_pg, jacobian_e_pg, invF_e_pg and dN_e_pg are constant in each element.\n
+        They are computed and stored on a single integration point and broadcasted (read-only views) over the integration points."""
+        return False
+
     @property
     def gmshId(self) -> int:
         """gmsh Id"""
@@ -178,36 +265,74 @@ class _GroupElem(ABC):
         # values_n_e(Nn,1) = connecNoeud(Nn,Ne) values_n_e(Ne,1)
         # where connecNoeud(Nn,:) is a row vector composed of 0 and 1, which will be used to sum values_e[nodes].
         # Then just divide by the number of times the node appears in the line        
-        Ne = self.Ne
-        nPe = self.nPe
-        elems = np.arange(Ne)
+        return self.__Get_connect_n_e().copy()
+
+    def __Get_connect_n_e(self) -> sparse.csr_matrix:
+        """Cached node to element adjacency matrix (Nn, Ne) returned by Get_connect_n_e."""
+        if self.__connect_n_e is None:
+            Ne = self.Ne
+            nPe = self.nPe
+            elems = np.arange(Ne)
+
+            lines = self.__connect.ravel()
 
-        lines = self.connect.ravel()
+            Nn = int(lines.max()+1)
+            columns = np.repeat(elems, nPe)
 
-        Nn = int(lines.max()+1)
-        columns = np.repeat(elems, nPe)
+            self.__connect_n_e = sparse.csr_matrix((np.ones(nPe*Ne),(lines, columns)),shape=(Nn,Ne))
 
-        return sparse.csr_matrix((np.ones(nPe*Ne),(lines, columns)),shape=(Nn,Ne))
+        return self.__connect_n_e
+
+    def Get_connect_e_e(self) -> sparse.csr_matrix:
+        """Sparse matrix (Ne, Ne) of zeros and ones with ones when the elements share at least one node.\n
+        The diagonal is filled with ones."""
+        if self.__connect_e_e is None:
+            connect_n_e = self.__Get_connect_n_e()
+            connect_e_e = (connect_n_e.T @ connect_n_e).tocsr()
+            connect_e_e.data[:] = 1
+            connect_e_e.sort_indices()
+            self.__connect_e_e = connect_e_e
+
+        return self.__connect_e_e.copy()
 
     @property
     def assembly_e(self) -> np.ndarray:
         """assembly matrix (Ne, nPe*dim)"""
+        return self.Get_assembly_e(self.dim)
+    
+    def Get_assembly_e(self, dof_n: int) -> np.ndarray:
+        """Get the assembly matrix for the specified dof_n (Ne, nPe*dof_n)\n
+        The matrix is cached for each dof_n and returned as a read-only view if zeroCopy is enabled, otherwise as a copy.
 
-        nPe = self.nPe
-        dim = self.dim        
-        taille = nPe * dim
+        Parameters
+        ----------
+        dof_n : int
+            degree of freedom per node
+        """
+        return self.__Get_cached(self.__Get_assembly_e(dof_n))
 
-        assembly = np.zeros((self.Ne, taille), dtype=np.int64)
-        connect = self.connect
+    def __Get_assembly_e(self, dof_n: int) -> np.ndarray:
+        """Returns the cached assembly matrix for the specified dof_n (Ne, nPe*dof_n)."""
 
-        for d in range(dim):
-            colonnes = np.arange(d, taille, dim)
-            assembly[:, colonnes] = np.array(connect) * dim + d
+        if dof_n not in self.__dict_assembly_e.keys():
 
-        return assembly
-    
-    def Get_assembly_e(self, dof_n: int) -> np.ndarray:
-        """Get the assembly matrix for the specified dof_n (Ne, nPe*dof_n)
+            nPe = self.nPe
+            ndof = dof_n*nPe
+
+            assembly = np.zeros((self.Ne, ndof), dtype=self.Get_index_dtype(dof_n))
+            connect = self.__connect
+
+            for d in range(dof_n):
+                columns = np.arange(d, ndof, dof_n)
+                assembly[:, columns] = connect * dof_n + d
+
+            self.__dict_assembly_e[dof_n] = assembly
+
+        return self.__dict_assembly_e[dof_n]
+
+    def Get_lines_e(self, dof_n: int) -> np.ndarray:
+        """Returns the lines used to fill the assembly matrix with the elementary matrices (Ne, (nPe*dof_n)**2)\n
+        The lines are cached for each dof_n and returned as a read-only view if zeroCopy is enabled, otherwise as a copy.
 
         Parameters
         ----------
@@ -215,20 +340,91 @@ class _GroupElem(ABC):
             degree of freedom per node
         """
 
-        nPe = self.nPe
-        ndof = dof_n*nPe
+        if dof_n not in self.__dict_lines_e.keys():
+            assembly_e = self.__Get_assembly_e(dof_n)
+            lines_e = np.repeat(assembly_e, assembly_e.shape[1], axis=1)
+            self.__dict_lines_e[dof_n] = lines_e
+
+        return self.__Get_cached(self.__dict_lines_e[dof_n])
 
-        assembly = np.zeros((self.Ne, ndof), dtype=np.int64)
-        connect = self.connect
+    def Get_columns_e(self, dof_n: int) -> np.ndarray:
+        """Returns the columns used to fill the assembly matrix with the elementary matrices (Ne, (nPe*dof_n)**2)\n
+        The columns are cached for each dof_n and returned as a read-only view if zeroCopy is enabled, otherwise as a copy.
+
+        Parameters
+        ----------
+        dof_n : int
+            degree of freedom per node
+        """
 
-        for d in range(dof_n):
-            columns = np.arange(d, ndof, dof_n)
-            assembly[:, columns] = np.array(connect) * dof_n + d
+        if dof_n not in self.__dict_columns_e.keys():
+            assembly_e = self.__Get_assembly_e(dof_n)
+            columns_e = np.tile(assembly_e, (1, assembly_e.shape[1]))
+            self.__dict_columns_e[dof_n] = columns_e
+
+        return self.__Get_cached(self.__dict_columns_e[dof_n])
+
+    def Get_sparsity_pattern(self, dof_n: int, symmetric=False) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the csr sparsity pattern of the matrices assembled with dof_n degrees of freedom per node.\n
+        returns indptr, indices, map_e\n
+        indptr (Nn*dof_n+1) and indices (nnz) describe the csr structure.\n
+        map_e (Ne*(nPe*dof_n)**2) gives the position in the csr data array of each value in the elementary matrices (Ne, nPe*dof_n, nPe*dof_n).\n
+        The returned arrays are read-only.
+
+        Parameters
+        ----------
+        dof_n : int
+            degree of freedom per node
+        symmetric : bool, optional
+            only the upper triangle of the symmetric matrices is stored, by default False\n
+            map_e (Ne*ndof_e*(ndof_e+1)/2) then gives the position of the values in the upper triangle of the elementary matrices (see np.triu_indices(ndof_e)).
+        """
 
-        return assembly    
+        key = (dof_n, bool(symmetric))
+
+        if key not in self.__dict_sparsityPattern.keys():
+
+            assembly_e = self.__Get_assembly_e(dof_n)
+            ndof_e = assembly_e.shape[1]
+            Ndof = self.__coordGlob.shape[0] * dof_n
+
+            # same lines and columns as Get_lines_e(dof_n) and Get_columns_e(dof_n)
+            # int64 to compute the keys without overflow
+            assembly_e = assembly_e.astype(np.int64)
+            if symmetric:
+                # the elementary matrices are symmetric and the dofs of an element are different
+                # each value of the global upper triangle appears once in the local upper triangles
+                rows, cols = np.triu_indices(ndof_e)
+                lines_e, columns_e = assembly_e[:, rows], assembly_e[:, cols]
+                lines = np.minimum(lines_e, columns_e).ravel()
+                columns = np.maximum(lines_e, columns_e).ravel()
+            else:
+                lines = np.repeat(assembly_e, ndof_e, axis=1).ravel()
+                columns = np.tile(assembly_e, (1, ndof_e)).ravel()
+
+            # sorting the (line, column) keys gives the csr order
+            keys, map_e = np.unique(lines * Ndof + columns, return_inverse=True)
+            lines = keys // Ndof
+            indices = keys % Ndof
+            indptr = np.zeros(Ndof+1, dtype=np.int64)
+            indptr[1:] = np.cumsum(np.bincount(lines, minlength=Ndof))
+
+            # scipy uses int32 indices whenever possible
+            if max(Ndof, indices.size) < np.iinfo(np.int32).max:
+                indptr = indptr.astype(np.int32)
+                indices = indices.astype(np.int32)
+
+            map_e = map_e.ravel()
+            for array in [indptr, indices, map_e]:
+                array.flags.writeable = False
+
+            self.__dict_sparsityPattern[key] = (indptr, indices, map_e)
+
+        return self.__dict_sparsityPattern[key]
 
     def Get_gauss(self, matrixType: MatrixType) -> Gauss:
-        """Returns integration points according to the matrix type."""
+        """Returns integration points according to the matrix type.\n
+        The coordinates and weights are read-only arrays shared by all the groups."""
         return Gauss(self.elemType, matrixType)
     
     def Get_weight_pg(self, matrixType: MatrixType) -> np.ndarray:
@@ -303,15 +499,16 @@ class _GroupElem(ABC):
 
         if matrixType not in self.__dict_dN_e_pg.keys():
 
-            invF_e_pg = self.Get_invF_e_pg(matrixType)
+            self.Get_invF_e_pg(matrixType) # makes sure invF_e_pg is stored
+            invF_e_pg = self.__Get_first_pg(self.__dict_invF_e_pg[matrixType])
 
-            dN_pg = self.Get_dN_pg(matrixType)
+            dN_pg = self.Get_dN_pg(matrixType)[:invF_e_pg.shape[1]]
 
             # Derivation of shape functions in the (x,y,z) coordinates
             dN_e_pg: np.ndarray = np.einsum('epdk,pkn->epdn', invF_e_pg, dN_pg, optimize='optimal')
-            self.__dict_dN_e_pg[matrixType] = dN_e_pg
+            self.__dict_dN_e_pg[matrixType] = self.__Broadcast_pg(dN_e_pg, matrixType)
 
-        return self.__dict_dN_e_pg[matrixType].copy()
+        return self.__Get_cached(self.__dict_dN_e_pg[matrixType])
     
     def Get_ddN_e_pg(self, matrixType: MatrixType) -> np.ndarray:
         """Evaluates the second-order derivatives of shape functions in (x,y,z) coordinates.\n
@@ -332,7 +529,7 @@ class _GroupElem(ABC):
             ddN_e_pg = np.array(np.einsum('epdk,pkn->epdn', invF_e_pg, ddN_pg, optimize='optimal'))
             self.__dict_ddN_e_pg[matrixType] = ddN_e_pg
 
-        return self.__dict_ddN_e_pg[matrixType].copy()
+        return self.__Get_cached(self.__dict_ddN_e_pg[matrixType])
     
     def Get_Nv_e_pg(self) -> np.ndarray:
         """Evaluates beam shape functions in (x,y,z) coordinates.\n
@@ -403,67 +600,111 @@ class _GroupElem(ABC):
 
         return ddNv_e_pg
 
-    def Get_B_e_pg(self, matrixType: MatrixType) -> np.ndarray:
+    def Get_strainOperator(self, matrixType: MatrixType, elements: np.ndarray=None) -> StrainOperator:
+        """Get the operator used to calculate deformations from displacements.\n
+        Only the stored dN_e_pg and jacobian_e_pg * weight_pg are used, the B_e_pg matrices are not built.\n
+        If elements are given, the operator is restricted to these elements.
+        """
+        assert matrixType in MatrixType.Get_types()
+
+        # makes sure dN_e_pg and jacobian_e_pg are stored
+        # the stored arrays are read-only and are never copied
+        self.Get_dN_e_pg(matrixType)
+        self.Get_jacobian_e_pg(matrixType)
+        # constant strain elements only keep the gradients of the first integration point
+        dN_e_pg = self.__Get_first_pg(self.__dict_dN_e_pg[matrixType])
+        jacobian_e_pg = self.__dict_jacobian_e_pg[matrixType]
+
+        if elements is not None:
+            dN_e_pg = dN_e_pg[elements]
+            jacobian_e_pg = np.abs(jacobian_e_pg[elements])
+        else:
+            jacobian_e_pg = np.abs(jacobian_e_pg)
+
+        wJ_e_pg = jacobian_e_pg * self.Get_gauss(matrixType).weights
+
+        return StrainOperator(dN_e_pg, wJ_e_pg)
+
+    def Get_B_e_pg(self, matrixType: MatrixType, elements: np.ndarray=None) -> np.ndarray:
         """Get the matrix used to calculate deformations from displacements.\n
         WARNING: Use Kelvin Mandel Notation\n
         [N1,x 0 N2,x 0 Nn,x 0\n
         0 N1,y 0 N2,y 0 Nn,y\n
         N1,y N1,x N2,y N2,x N3,y N3,x]\n
-        (e, pg, (3 or 6), nPe*dim)        
+        (e, pg, (3 or 6), nPe*dim)\n
+        If elements are given, the matrices are only computed for these elements and are not stored.\n
+        The matrices are mostly zeros, prefer Get_strainOperator() which does not build them.
         """
         assert matrixType in MatrixType.Get_types()
 
+        if elements is not None:
+            self.Get_dN_e_pg(matrixType) # makes sure dN_e_pg is stored
+            return self.__Calc_B_e_pg(self.__dict_dN_e_pg[matrixType][elements])
+
         if matrixType not in self.__dict_B_e_pg.keys():
 
-            dN_e_pg = self.Get_dN_e_pg(matrixType)
+            self.Get_dN_e_pg(matrixType) # makes sure dN_e_pg is stored
+            dN_e_pg = self.__dict_dN_e_pg[matrixType]
 
-            Ne = self.Ne
-            nPg = self.Get_gauss(matrixType).nPg
-            nPe = self.nPe
-            dim = self.dim
+            self.__dict_B_e_pg[matrixType] = self.__Calc_B_e_pg(dN_e_pg)
+        
+        return self.__Get_cached(self.__dict_B_e_pg[matrixType])
 
-            cM = 1/np.sqrt(2)
-            
-            columnsX = np.arange(0, nPe*dim, dim)
-            columnsY = np.arange(1, nPe*dim, dim)
-            columnsZ = np.arange(2, nPe*dim, dim)
+    def __Calc_B_e_pg(self, dN_e_pg: np.ndarray) -> np.ndarray:
+        """Builds the B matrices (e, pg, (3 or 6), nPe*dim) from the shape functions derivatives (e, pg, dim, nPe)."""
 
-            if self.dim == 2:                
-                B_e_pg = np.zeros((Ne, nPg, 3, nPe*dim))                
-                
-                dNdx = dN_e_pg[:,:,0]
-                dNdy = dN_e_pg[:,:,1]
+        Ne, nPg = dN_e_pg.shape[:2]
+        nPe = self.nPe
+        dim = self.dim
 
-                B_e_pg[:,:,0,columnsX] = dNdx
-                B_e_pg[:,:,1,columnsY] = dNdy
-                B_e_pg[:,:,2,columnsX] = dNdy*cM; B_e_pg[:,:,2,columnsY] = dNdx*cM
-            else:
-                B_e_pg = np.zeros((Ne, nPg, 6, nPe*dim))
+        cM = 1/np.sqrt(2)
+        
+        columnsX = np.arange(0, nPe*dim, dim)
+        columnsY = np.arange(1, nPe*dim, dim)
+        columnsZ = np.arange(2, nPe*dim, dim)
 
-                dNdx = dN_e_pg[:,:,0]
-                dNdy = dN_e_pg[:,:,1]
-                dNdz = dN_e_pg[:,:,2]
+        if self.dim == 2:                
+            B_e_pg = np.zeros((Ne, nPg, 3, nPe*dim))                
+            
+            dNdx = dN_e_pg[:,:,0]
+            dNdy = dN_e_pg[:,:,1]
 
-                B_e_pg[:,:,0,columnsX] = dNdx
-                B_e_pg[:,:,1,columnsY] = dNdy
-                B_e_pg[:,:,2,columnsZ] = dNdz
-                B_e_pg[:,:,3,columnsY] = dNdz*cM; B_e_pg[:,:,3,columnsZ] = dNdy*cM
-                B_e_pg[:,:,4,columnsX] = dNdz*cM; B_e_pg[:,:,4,columnsZ] = dNdx*cM
-                B_e_pg[:,:,5,columnsX] = dNdy*cM; B_e_pg[:,:,5,columnsY] = dNdx*cM
+            B_e_pg[:,:,0,columnsX] = dNdx
+            B_e_pg[:,:,1,columnsY] = dNdy
+            B_e_pg[:,:,2,columnsX] = dNdy*cM; B_e_pg[:,:,2,columnsY] = dNdx*cM
+        else:
+            B_e_pg = np.zeros((Ne, nPg, 6, nPe*dim))
 
-            self.__dict_B_e_pg[matrixType] = B_e_pg
-        
-        return self.__dict_B_e_pg[matrixType].copy()
+            dNdx = dN_e_pg[:,:,0]
+            dNdy = dN_e_pg[:,:,1]
+            dNdz = dN_e_pg[:,:,2]
+
+            B_e_pg[:,:,0,columnsX] = dNdx
+            B_e_pg[:,:,1,columnsY] = dNdy
+            B_e_pg[:,:,2,columnsZ] = dNdz
+            B_e_pg[:,:,3,columnsY] = dNdz*cM; B_e_pg[:,:,3,columnsZ] = dNdy*cM
+            B_e_pg[:,:,4,columnsX] = dNdz*cM; B_e_pg[:,:,4,columnsZ] = dNdx*cM
+            B_e_pg[:,:,5,columnsX] = dNdy*cM; B_e_pg[:,:,5,columnsY] = dNdx*cM
 
-    def Get_leftDispPart(self, matrixType: MatrixType) -> np.ndarray:
+        return B_e_pg
+
+    def Get_leftDispPart(self, matrixType: MatrixType, elements: np.ndarray=None) -> np.ndarray:
         """Get the left side of local displacement matrices.\n
         Ku_e = jacobian_e_pg * weight_pg * B_e_pg' * c_e_pg * B_e_pg\n
         
-        Returns (epij) -> jacobian_e_pg * weight_pg * B_e_pg'.
+        Returns (epij) -> jacobian_e_pg * weight_pg * B_e_pg'.\n
+        If elements are given, the matrices are only computed for these elements and are not stored.
         """
 
         assert matrixType in MatrixType.Get_types()
 
+        if elements is not None:
+            self.Get_jacobian_e_pg(matrixType) # makes sure jacobian_e_pg is stored
+            jacobian_e_pg = np.abs(self.__dict_jacobian_e_pg[matrixType][elements])
+            weight_pg = self.Get_gauss(matrixType).weights
+            B_e_pg = self.Get_B_e_pg(matrixType, elements)
+            return np.einsum('ep,p,epij->epji', jacobian_e_pg, weight_pg, B_e_pg, optimize='optimal')
+
         if matrixType not in self.__dict_leftDispPart.keys():
             
             jacobian_e_pg = self.Get_jacobian_e_pg(matrixType)
@@ -474,7 +715,7 @@ class _GroupElem(ABC):
 
             self.__dict_leftDispPart[matrixType] = leftDispPart
 
-        return self.__dict_leftDispPart[matrixType].copy()
+        return self.__Get_cached(self.__dict_leftDispPart[matrixType])
     
     def Get_ReactionPart_e_pg(self, matrixType: MatrixType) -> np.ndarray:
         """Get the part that builds the reaction term (scalar).\n
@@ -495,7 +736,7 @@ class _GroupElem(ABC):
 
             self.__dict_phaseField_ReactionPart_e_pg[matrixType] = ReactionPart_e_pg
         
-        return self.__dict_phaseField_ReactionPart_e_pg[matrixType].copy()
+        return self.__Get_cached(self.__dict_phaseField_ReactionPart_e_pg[matrixType])
     
     def Get_DiffusePart_e_pg(self, matrixType: MatrixType) -> np.ndarray:
         """Get the part that builds the diffusion term (scalar).\n
@@ -516,7 +757,7 @@ class _GroupElem(ABC):
 
             self.__dict_DiffusePart_e_pg[matrixType] = DiffusePart_e_pg
         
-        return self.__dict_DiffusePart_e_pg[matrixType].copy()
+        return self.__Get_cached(self.__dict_DiffusePart_e_pg[matrixType])
 
     def Get_SourcePart_e_pg(self, matrixType: MatrixType) -> np.ndarray:
         """Get the part that builds the source term (scalar).\n
@@ -537,7 +778,7 @@ class _GroupElem(ABC):
 
             self.__dict_SourcePart_e_pg[matrixType] = SourcePart_e_pg
         
-        return self.__dict_SourcePart_e_pg[matrixType].copy()
+        return self.__Get_cached(self.__dict_SourcePart_e_pg[matrixType])
     
     def _Get_sysCoord_e(self, displacementMatrix:np.ndarray=None):
         """Get the basis transformation matrix (Ne,3,3).\n
@@ -746,12 +987,14 @@ class _GroupElem(ABC):
             nodesBaseDim = nodesBase[:,:,range(self.dim)]
 
             dN_pg = self.Get_dN_pg(matrixType)
+            if self.isConstantStrain:
+                dN_pg = dN_pg[:1]
 
             F_e_pg: np.ndarray = np.einsum('pik,ekj->epij', dN_pg, nodesBaseDim, optimize='optimal')
             
-            self.__dict_F_e_pg[matrixType] = F_e_pg
+            self.__dict_F_e_pg[matrixType] = self.__Broadcast_pg(F_e_pg, matrixType)
 
-        return self.__dict_F_e_pg[matrixType].copy()
+        return self.__Get_cached(self.__dict_F_e_pg[matrixType])
     
     def Get_jacobian_e_pg(self, matrixType: MatrixType, absoluteValues=True) -> np.ndarray:
         """Returns the jacobians.\n
@@ -760,7 +1003,8 @@ class _GroupElem(ABC):
         if self.dim == 0: return
         if matrixType not in self.__dict_jacobian_e_pg.keys():
 
-            F_e_pg = self.Get_F_e_pg(matrixType)
+            self.Get_F_e_pg(matrixType) # makes sure F_e_pg is stored
+            F_e_pg = self.__Get_first_pg(self.__dict_F_e_pg[matrixType])
 
             if self.dim == 1:
                 Ne = F_e_pg.shape[0]
@@ -782,11 +1026,14 @@ class _GroupElem(ABC):
                 jacobian_e_pg = a11_e_pg * ((a22_e_pg*a33_e_pg)-(a32_e_pg*a23_e_pg)) - a12_e_pg * ((a21_e_pg*a33_e_pg)-(a31_e_pg*a23_e_pg)) + a13_e_pg * ((a21_e_pg*a32_e_pg)-(a31_e_pg*a22_e_pg))
 
             # test = np.linalg.det(F_e_pg) - jacobian_e_pg
-            self.__dict_jacobian_e_pg[matrixType] = jacobian_e_pg
+            self.__dict_jacobian_e_pg[matrixType] = self.__Broadcast_pg(jacobian_e_pg, matrixType)
 
-        jacobian_e_pg = self.__dict_jacobian_e_pg[matrixType].copy()
+        jacobian_e_pg = self.__Get_cached(self.__dict_jacobian_e_pg[matrixType])
 
-        if absoluteValues:
+        if absoluteValues and self.__Is_broadcasted(jacobian_e_pg):
+            # the absolute values are computed on the first integration point
+            jacobian_e_pg = np.broadcast_to(np.abs(jacobian_e_pg[:,:1]), jacobian_e_pg.shape)
+        elif absoluteValues:
             jacobian_e_pg = np.abs(jacobian_e_pg)
 
         return jacobian_e_pg
@@ -799,7 +1046,8 @@ class _GroupElem(ABC):
         if self.dim == 0: return 
         if matrixType not in self.__dict_invF_e_pg.keys():
 
-            F_e_pg = self.Get_F_e_pg(matrixType)
+            self.Get_jacobian_e_pg(matrixType) # makes sure F_e_pg and jacobian_e_pg are stored
+            F_e_pg = self.__Get_first_pg(self.__dict_F_e_pg[matrixType])
 
             if self.dim == 1:
                 invF_e_pg = 1/F_e_pg
@@ -811,7 +1059,7 @@ class _GroupElem(ABC):
                 nPg = F_e_pg.shape[1]
                 invF_e_pg = np.zeros((Ne,nPg,2,2))
 
-                det = self.Get_jacobian_e_pg(matrixType, absoluteValues=False)
+                det = self.__Get_first_pg(self.__dict_jacobian_e_pg[matrixType])
 
                 alpha = F_e_pg[:,:,0,0]
                 beta = F_e_pg[:,:,0,1]
@@ -828,7 +1076,7 @@ class _GroupElem(ABC):
                 # optimized such that invF_e_pg = 1/det * Adj(F_e_pg)
                 # https://fr.wikihow.com/calculer-l'inverse-d'une-matrice-3x3
 
-                det = self.Get_jacobian_e_pg(matrixType, absoluteValues=False)
+                det = self.__Get_first_pg(self.__dict_jacobian_e_pg[matrixType])
 
                 FT_e_pg = np.einsum('epij->epji', F_e_pg, optimize='optimal')
 
@@ -849,9 +1097,9 @@ class _GroupElem(ABC):
 
                 # test = np.array(np.linalg.inv(F_e_pg)) - invF_e_pg
 
-            self.__dict_invF_e_pg[matrixType] = invF_e_pg
+            self.__dict_invF_e_pg[matrixType] = self.__Broadcast_pg(invF_e_pg, matrixType)
 
-        return self.__dict_invF_e_pg[matrixType].copy()
+        return self.__Get_cached(self.__dict_invF_e_pg[matrixType])
 
     # Shape functions
 
@@ -879,18 +1127,136 @@ class _GroupElem(ABC):
 
         evalFunctions = np.zeros((nP, nF, nPe))
 
-        # for each points
-        for p in range(nP):
-            # for each functions
-            for n, function_nPe in enumerate(functions):
-                # for each dimension
-                for f in range(nF):
-                    # appy the function                     
-                    evalFunctions[p, f, n] = function_nPe[f](*coord[p])
-                    # * means take all the coordinates 
+        # for each functions
+        for n, function_nPe in enumerate(functions):
+            # for each dimension
+            for f in range(nF):
+                # appy the function on all points at once
+                evalFunctions[:, f, n] = function_nPe[f](*coord.T)
+                # * means take all the coordinates 
 
         return evalFunctions
     
+    # polynomial tables shared by the groups of the same element type
+    __dict_polynomials: dict[tuple[str, str], tuple[np.ndarray, np.ndarray, tuple[int, int]]] = {}
+
+    def __Get_functions(self, name: str) -> np.ndarray:
+        """Returns the functions 'name' (N, dN, ddN, dddN, ddddN, Nv, dNv, ddNv) in (ξ,η,ζ) coordinates."""
+        functions = {
+            "N": self._Ntild, "dN": self._dNtild, "ddN": self._ddNtild, "dddN": self._dddNtild, "ddddN": self._ddddNtild,
+            "Nv": self._Nvtild, "dNv": self.dNvtild, "ddNv": self._ddNvtild
+        }
+        return functions[name]()
+
+    @staticmethod
+    def __Evaluates_Monomials(exponents: np.ndarray, coord: np.ndarray) -> np.ndarray:
+        """Evaluates the monomials ξ^a η^b ζ^c given by exponents (m, dim) at coordinates (nP, dim).\n
+        Returns (nP, m)"""
+        nP = coord.shape[0]
+        monomials = np.ones((nP, exponents.shape[0]))
+        for d, exponents_d in enumerate(exponents.T):
+            if not exponents_d.any(): continue
+            # powers of the coordinate computed by successive products
+            powers = np.ones((nP, exponents_d.max()+1))
+            for k in range(1, powers.shape[1]):
+                powers[:,k] = powers[:,k-1] * coord[:,d]
+            monomials *= powers[:,exponents_d]
+        return monomials
+
+    def _Get_polynomials(self, name: str) -> tuple[np.ndarray, np.ndarray, tuple[int, int]]:
+        """Returns the functions 'name' (N, dN, ddN, dddN, ddddN, Nv, dNv, ddNv) as a polynomial table.\n
+        functions(ξ) = sum_m coefs[m] * ξ^exponents[m]
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, tuple[int, int]]
+            exponents (m, dim), coefs (m, nF*nPe) and (nF, nPe)\n
+            None if the functions are not polynomials.
+        """
+
+        key = (self.elemType, name)
+
+        if key not in _GroupElem.__dict_polynomials:
+
+            functions = self.__Get_functions(name)
+            dim = self.dim
+
+            # the functions are polynomials of degree <= order in each coordinate (2*nPe-1 for beam hermitian functions)
+            degree = 2*self.nPe-1 if dim == 1 else self.order
+            exponents = np.array(list(product(range(degree+1), repeat=dim)), dtype=int)
+
+            # the coefficients are interpolated on a grid of chebyshev points
+            x = np.cos(np.pi * (np.arange(degree+1) + 0.5) / (degree+1))
+            coord = np.array(list(product(x, repeat=dim)), dtype=float)
+            values = _GroupElem._Evaluates_Functions(functions, coord)
+            shape = values.shape[1:]
+            coefs = np.linalg.solve(_GroupElem.__Evaluates_Monomials(exponents, coord), values.reshape(coord.shape[0], -1))
+            coefs[np.abs(coefs) < 1e-12] = 0
+
+            # only the monomials used by the functions are kept
+            used = np.any(coefs != 0, axis=1)
+            exponents, coefs = exponents[used], coefs[used]
+
+            # checks the table on random coordinates
+            coord = np.random.default_rng(0).uniform(-1, 1, (20, dim))
+            values = _GroupElem._Evaluates_Functions(functions, coord).reshape(coord.shape[0], -1)
+            error = np.abs(_GroupElem.__Evaluates_Monomials(exponents, coord) @ coefs - values).max(initial=0)
+            isPolynomial = error <= 1e-10 * max(np.abs(values).max(initial=0), 1)
+
+            _GroupElem.__dict_polynomials[key] = (exponents, coefs, shape) if isPolynomial else None
+
+        return _GroupElem.__dict_polynomials[key]
+
+    # functions evaluated at the integration points, shared by the groups of the same element type
+    __dict_functions_pg: dict[tuple[str, MatrixType, str], np.ndarray] = {}
+
+    def __Get_functions_pg(self, name: str, matrixType: MatrixType) -> np.ndarray:
+        """Returns the functions 'name' (N, dN, ddN, dddN, ddddN, Nv, dNv, ddNv) evaluated at the integration points (pg, nF, nPe).\n
+        The values are computed once per (elemType, matrixType) and returned as read-only arrays."""
+
+        key = (self.elemType, matrixType, name)
+
+        if key not in _GroupElem.__dict_functions_pg:
+            values = self._Evaluates_Polynomials(name, self.Get_gauss(matrixType).coord)
+            values.flags.writeable = False
+            _GroupElem.__dict_functions_pg[key] = values
+
+        return _GroupElem.__dict_functions_pg[key]
+
+    def _Evaluates_Polynomials(self, name: str, coord: np.ndarray) -> np.ndarray:
+        """Evaluates the functions 'name' (N, dN, ddN, dddN, ddddN, Nv, dNv, ddNv) at coordinates with their polynomial table.\n
+        All the coordinates are evaluated at once with a matrix product instead of calling the functions one by one.
+
+        Parameters
+        ----------
+        name : str
+            functions to evaluate (N, dN, ddN, dddN, ddddN, Nv, dNv, ddNv)
+        coord : np.ndarray
+            coordinates in the reference element (nP, dim)
+
+        Returns
+        -------
+        np.ndarray
+            Evaluated functions (nP, nF, nPe)
+        """
+
+        coord = np.asarray(coord, dtype=float)
+        table = self._Get_polynomials(name)
+        if table is None:
+            return _GroupElem._Evaluates_Functions(self.__Get_functions(name), coord)
+
+        exponents, coefs, shape = table
+        nP = coord.shape[0]
+        values = np.empty((nP, coefs.shape[1]))
+
+        # the monomials are evaluated by blocks of points to limit the memory used
+        size = 2**16
+        for start in range(0, nP, size):
+            points = slice(start, start+size)
+            values[points] = _GroupElem.__Evaluates_Monomials(exponents, coord[points]) @ coefs
+
+        return values.reshape(nP, *shape)
+
     def __Init_Functions(self, order: int) -> np.ndarray:
         """Initializes functions to be evaluated at gauss points."""
         if self.dim == 1 and self.order < order:
@@ -919,11 +1285,7 @@ class _GroupElem(ABC):
         """
         if self.dim == 0: return
 
-        Ntild = self._Ntild()
-        gauss = self.Get_gauss(matrixType)
-        N_pg = _GroupElem._Evaluates_Functions(Ntild, gauss.coord)
-
-        return N_pg
+        return self.__Get_functions_pg("N", matrixType)
 
     @abstractmethod
     def _dNtild(self) -> np.ndarray:
@@ -942,12 +1304,7 @@ class _GroupElem(ABC):
         """
         if self.dim == 0: return
 
-        dNtild = self._dNtild()
-
-        gauss = self.Get_gauss(matrixType)
-        dN_pg = _GroupElem._Evaluates_Functions(dNtild, gauss.coord)
-
-        return dN_pg    
+        return self.__Get_functions_pg("dN", matrixType)
 
     @abstractmethod
     def _ddNtild(self) -> np.ndarray:
@@ -966,12 +1323,7 @@ class _GroupElem(ABC):
         """
         if self.dim == 0: return
 
-        ddNtild = self._ddNtild()
-
-        gauss = self.Get_gauss(matrixType)
-        ddN_pg = _GroupElem._Evaluates_Functions(ddNtild, gauss.coord)
-
-        return ddN_pg
+        return self.__Get_functions_pg("ddN", matrixType)
 
     @abstractmethod
     def _dddNtild(self) -> np.ndarray:
@@ -990,12 +1342,7 @@ class _GroupElem(ABC):
         """
         if self.elemType == 0: return
 
-        dddNtild = self._dddNtild()
-
-        gauss = self.Get_gauss(matrixType)
-        dddN_pg = _GroupElem._Evaluates_Functions(dddNtild, gauss.coord)
-
-        return dddN_pg
+        return self.__Get_functions_pg("dddN", matrixType)
 
     @abstractmethod
     def _ddddNtild(self) -> np.ndarray:
@@ -1016,12 +1363,7 @@ class _GroupElem(ABC):
         """
         if self.elemType == 0: return
 
-        ddddNtild = self._ddddNtild()
-
-        gauss = self.Get_gauss(matrixType)
-        ddddN_pg = _GroupElem._Evaluates_Functions(ddddNtild, gauss.coord)
-
-        return ddddN_pg
+        return self.__Get_functions_pg("ddddN", matrixType)
 
     # Beams shapes functions
     # Use hermitian shape functions
@@ -1040,12 +1382,7 @@ class _GroupElem(ABC):
         """
         if self.dim != 1: return
 
-        Nvtild = self._Nvtild()
-
-        gauss = self.Get_gauss(matrixType)
-        Nv_pg = _GroupElem._Evaluates_Functions(Nvtild, gauss.coord)
-
-        return Nv_pg
+        return self.__Get_functions_pg("Nv", matrixType)
     
     def dNvtild(self) -> np.ndarray:
         """Beam shape functions first derivatives in the (ξ,η,ζ) coordinates.\n
@@ -1061,12 +1398,7 @@ class _GroupElem(ABC):
         """
         if self.dim != 1: return
 
-        dNvtild = self.dNvtild()
-
-        gauss = self.Get_gauss(matrixType)
-        dNv_pg = _GroupElem._Evaluates_Functions(dNvtild, gauss.coord)
-
-        return dNv_pg
+        return self.__Get_functions_pg("dNv", matrixType)
     
     def _ddNvtild(self) -> np.ndarray:
         """Beam shape functions second derivatives in the (ξ,η,ζ) coordinates.\n
@@ -1082,50 +1414,31 @@ class _GroupElem(ABC):
         """
         if self.dim != 1: return
 
-        ddNvtild = self._ddNvtild()
-
-        gauss = self.Get_gauss(matrixType)
-        ddNv_pg = _GroupElem._Evaluates_Functions(ddNvtild, gauss.coord)
-
-        return ddNv_pg
+        return self.__Get_functions_pg("ddNv", matrixType)
 
     # find elements
 
     def Get_Elements_Nodes(self, nodes: np.ndarray, exclusively=True) -> np.ndarray:
         """Returns elements that exclusively or not use the specified nodes."""
-        connect = self.__connect
-        connect_n_e = self.Get_connect_n_e()
+        connect_n_e = self.__Get_connect_n_e()
 
-        if isinstance(nodes, list):
-            nodes = np.array(nodes)
+        nodes = np.asarray(nodes, dtype=int).ravel()
 
         # Check that there are no excess nodes
         # It is possible that the nodes entered do not belong to the group
-        if connect_n_e.shape[0] < nodes.max():
-            # Remove all excess nodes
-            availableNodes = np.where(nodes < self.Nn)[0]
-            nodes = nodes[availableNodes]
-        
-        __, columns, __ = sparse.find(connect_n_e[nodes])
+        nodes = nodes[(nodes >= 0) & (nodes < connect_n_e.shape[0])]
 
-        elements =  list(set(columns))
+        # elements using the nodes
+        indptr = connect_n_e.indptr
+        count_n = indptr[nodes+1] - indptr[nodes]
+        idx = np.repeat(indptr[nodes] - np.cumsum(count_n) + count_n, count_n) + np.arange(count_n.sum())
+        elements = np.unique(connect_n_e.indices[idx])
         
-        if exclusively:
+        if exclusively and elements.size > 0:
             # Check whether elements use only nodes in the node list
-            
-            # get nodes used by elements
-            nodesElem = set(connect[elements].ravel())
-
-            # detect nodes used by elements that are not in the nodes specified
-            nodesIntru = list(nodesElem - set(nodes))
-
-            # We detect the list of elements associated with unused nodes
-            cols = sparse.find(connect_n_e[nodesIntru])[1]
-            elementsIntru = list(set(cols))
-
-            if len(elementsIntru) > 0:
-                # Remove detected elements
-                elements = list(set(elements) - set(elementsIntru))
+            usedNodes = np.zeros(connect_n_e.shape[0], dtype=bool)
+            usedNodes[nodes] = True
+            elements = elements[np.all(usedNodes[self.__connect[elements]], axis=1)]
 
         return np.asarray(elements, dtype=int)
 
@@ -1160,46 +1473,48 @@ class _GroupElem(ABC):
         except TypeError:
             print("Must provide a 3-parameter function of type lambda x,y,z: ...")
     
-    def Get_Nodes_Point(self, point: Point) -> np.ndarray:
-        """Returns nodes on the point."""
+    def Get_Nodes_Point(self, point: Point, idx: np.ndarray=None) -> np.ndarray:
+        """Returns nodes on the point.\n
+        idx are the indexes in coord of the candidate nodes (all the nodes by default)."""
 
         assert isinstance(point, Point)
 
-        xn, yn, zn = self.coord.T
+        coord = self.coord
+        if idx is None: idx = np.arange(coord.shape[0])
+        idx = np.asarray(idx, dtype=int)
 
-        idx = np.where((xn == point.x) & (yn == point.y) & (zn == point.z))[0]        
+        # nodes with the same coordinates
+        nodes = idx[np.all(coord[idx] == point.coord, axis=1)]
 
-        if len(idx) == 0:
+        if len(nodes) == 0:
             # the previous condition may be too restrictive
             tolerance = 1e-3
             
             # we make sure there is no coordinates = 0
-            dec = 10
-            decX = np.abs(xn.min()) + dec
-            decY = np.abs(yn.min()) + dec
-            decZ = np.abs(zn.min()) + dec
-            x = point.x + decX
-            y = point.y + decY
-            z = point.z + decZ
-            coordo = coordo + [decX, decY, decZ]
+            dec = np.abs(coord.min(0)) + 10
+            coordinates = point.coord + dec
+            coord_n = coord[idx] + dec
             
             # get errors between coordinates
-            errorX = np.abs((xn-x)/xn)
-            errorY = np.abs((yn-y)/yn)
-            errorZ = np.abs((zn-z)/zn)
+            error = np.abs((coord_n - coordinates) / coord_n)
             
-            idx = np.where((errorX <= tolerance) & (errorY <= tolerance) & (errorZ <= tolerance))[0]
+            nodes = idx[np.all(error <= tolerance, axis=1)]
 
-        return self.__nodes[idx].copy()
+        return self.__nodes[nodes].copy()
 
-    def Get_Nodes_Line(self, line: Line) -> np.ndarray:
-        """Returns nodes on the line."""
+    def Get_Nodes_Line(self, line: Line, idx: np.ndarray=None) -> np.ndarray:
+        """Returns nodes on the line.\n
+        idx are the indexes in coord of the candidate nodes (all the nodes by default)."""
 
         assert isinstance(line, Line)
+
+        coord = self.coord
+        if idx is None: idx = np.arange(coord.shape[0])
+        idx = np.asarray(idx, dtype=int)
         
         unitVector = line.unitVector
 
-        vect = self.coord-line.coord[0]
+        vect = coord[idx]-line.coord[0]
 
         scalarProd = np.einsum('i,ni-> n', unitVector, vect, optimize='optimal')
         crossProd = np.cross(vect, unitVector)
@@ -1207,45 +1522,55 @@ class _GroupElem(ABC):
 
         eps = 1e-12
 
-        idx = np.where((norm<eps) & (scalarProd>=-eps) & (scalarProd<=line.length+eps))[0]
+        idx = idx[np.where((norm<eps) & (scalarProd>=-eps) & (scalarProd<=line.length+eps))[0]]
 
         return self.__nodes[idx].copy()
     
-    def Get_Nodes_Domain(self, domain: Domain) -> np.ndarray:
-        """Returns nodes in the domain."""
+    def Get_Nodes_Domain(self, domain: Domain, idx: np.ndarray=None) -> np.ndarray:
+        """Returns nodes in the domain.\n
+        idx are the indexes in coord of the candidate nodes (all the nodes by default)."""
 
         assert isinstance(domain, Domain)
 
-        xn, yn, zn = self.coord.T
+        coord = self.coord
+        if idx is None: idx = np.arange(coord.shape[0])
+        idx = np.asarray(idx, dtype=int)
+
+        xn, yn, zn = coord[idx].T
 
         eps = 1e-12
 
-        idx = np.where( (xn >= domain.pt1.x-eps) & (xn <= domain.pt2.x+eps) &
-                        (yn >= domain.pt1.y-eps) & (yn <= domain.pt2.y+eps) &
-                        (zn >= domain.pt1.z-eps) & (zn <= domain.pt2.z+eps))[0]
+        idx = idx[np.where( (xn >= domain.pt1.x-eps) & (xn <= domain.pt2.x+eps) &
+                            (yn >= domain.pt1.y-eps) & (yn <= domain.pt2.y+eps) &
+                            (zn >= domain.pt1.z-eps) & (zn <= domain.pt2.z+eps))[0]]
         
         return self.__nodes[idx].copy()
 
-    def Get_Nodes_Circle(self, circle: Circle, onlyOnEdge=False) -> np.ndarray:
-        """Returns nodes in the circle."""
+    def Get_Nodes_Circle(self, circle: Circle, onlyOnEdge=False, idx: np.ndarray=None) -> np.ndarray:
+        """Returns nodes in the circle.\n
+        idx are the indexes in coord of the candidate nodes (all the nodes by default)."""
 
         assert isinstance(circle, Circle)
 
+        coord = self.coord
+        if idx is None: idx = np.arange(coord.shape[0])
+        idx = np.asarray(idx, dtype=int)
+
         eps = 1e-12
 
-        vals = np.linalg.norm(self.coord - circle.center.coord, axis=1)
+        vals = np.linalg.norm(coord[idx] - circle.center.coord, axis=1)
 
         if onlyOnEdge:
-            idx = np.where((vals <= circle.diam/2+eps) & (vals >= circle.diam/2-eps))
+            idx = idx[np.where((vals <= circle.diam/2+eps) & (vals >= circle.diam/2-eps))[0]]
         else:
-            idx = np.where(vals <= circle.diam/2+eps)    
-
-        return self.__nodes[idx]
+            idx = idx[np.where(vals <= circle.diam/2+eps)[0]]
 
-    def Get_Nodes_Cylinder(self, circle: Circle, direction=[0,0,1], onlyOnEdge=False) -> np.ndarray:
-        """Returns nodes in the cylinder."""
+        return self.__nodes[idx].copy()
 
-        assert isinstance(circle, Circle)
+    @staticmethod
+    def _Get_Cylinder_Jacobian(circle: Circle, direction=[0,0,1]) -> np.ndarray:
+        """Returns the matrix used to express coordinates in the cylinder basis (rotAxis, j*cj, direction).\n
+        In this basis, the nodes in the cylinder verify x^2 + y^2 <= R^2."""
         
         rotAxis = np.cross(circle.n, direction)
         if np.linalg.norm(rotAxis) <= 1e-12:
@@ -1261,17 +1586,31 @@ class _GroupElem(ABC):
             # (rotAxis, j*cj, direction)
             cj = (R - coordN[:,1].max())/R
             J[:,1] *= cj
+
+        return J
+
+    def Get_Nodes_Cylinder(self, circle: Circle, direction=[0,0,1], onlyOnEdge=False, idx: np.ndarray=None) -> np.ndarray:
+        """Returns nodes in the cylinder.\n
+        idx are the indexes in coord of the candidate nodes (all the nodes by default)."""
+
+        assert isinstance(circle, Circle)
+
+        coord = self.coord
+        if idx is None: idx = np.arange(coord.shape[0])
+        idx = np.asarray(idx, dtype=int)
+        
+        J = self._Get_Cylinder_Jacobian(circle, direction)
         
         eps = 1e-12
-        coord = np.einsum('ij,nj->ni', np.linalg.inv(J), self.coord - circle.center.coord)
+        coord = np.einsum('ij,nj->ni', np.linalg.inv(J), coord[idx] - circle.center.coord)
 
         vals = np.linalg.norm(coord[:,:2], axis=1)
         if onlyOnEdge:
-            idx = np.where((vals <= circle.diam/2+eps) & (vals >= circle.diam/2-eps))
+            idx = idx[np.where((vals <= circle.diam/2+eps) & (vals >= circle.diam/2-eps))[0]]
         else:
-            idx = np.where(vals <= circle.diam/2+eps)    
+            idx = idx[np.where(vals <= circle.diam/2+eps)[0]]
 
-        return self.__nodes[idx]
+        return self.__nodes[idx].copy()
     
     # TODO Get_Nodes_Points
     # use Points.contour also give a normal
@@ -1378,123 +1717,245 @@ class _GroupElem(ABC):
         if coordinates_n.size == 0:
             return np.array([])
 
+        elements_p = np.full(coordinates_n.shape[0], elem, dtype=int)
+
+        idx = np.where(self.__Get_pointsInElements(coordinates_n, elements_p))[0]
+
+        return idx
+
+    def __Get_pointsInElements(self, coordinates_p: np.ndarray, elements_p: np.ndarray) -> np.ndarray:
+        """Checks whether the coordinates are contained in the elements.\n
+        The p-th coordinate is tested with the p-th element.
+
+        Parameters
+        ----------
+        coordinates_p : np.ndarray
+            coordinates (p, 3)
+        elements_p : np.ndarray
+            elements (p)
+
+        Returns
+        -------
+        np.ndarray
+            boolean array (p), True if the coordinate is contained in the element.
+        """
+
         dim = self.__dim
+        coordGlob = self.__coordGlob
+        connect_p = self.__connect[elements_p]
 
         tol = 1e-12
         # tol = 1e-6
 
         if dim == 0:
 
-            coord = self.coord[self.__connect[elem,0]]
-
-            idx = np.where((coordinates_n[:,0] == coord[0]) & (coordinates_n[:,1] == coord[1]) & (coordinates_n[:,2] == coord[2]))[0]
+            coord_p = coordGlob[connect_p[:,0]]
 
-            return idx
+            return np.all(coordinates_p == coord_p, axis=1)
 
         elif dim == 1:
 
-            coord = self.coord
-
-            p1 = self.__connect[elem,0]
-            p2 = self.__connect[elem,1]
+            p1_p = coordGlob[connect_p[:,0]]
+            p2_p = coordGlob[connect_p[:,1]]
 
             # vector between the points of the segment
-            vect = coord[p2] - coord[p1]
-            length = np.linalg.norm(vect)
-            vect = vect / length
+            vect_p = p2_p - p1_p
+            length_p = np.linalg.norm(vect_p, axis=1)
+            vect_p = self.__Normalize(vect_p)
 
             # vector starting from the first point of the element
-            p_n = coordinates_n - coord[p1]
+            v_p = coordinates_p - p1_p
 
-            cross_n = np.cross(e_i, p_n, axisa=0, axisb=1)
-            norm_n = np.linalg.norm(cross_n, axis=1)
+            cross_p = np.cross(vect_p, v_p, axis=1)
+            norm_p = np.linalg.norm(cross_p, axis=1)
 
-            dot_n = p_n @ vect
-            
-            idx = np.where((norm_n <= tol) & (dot_n >= -tol) & (dot_n <= length+tol))[0]
+            dot_p = np.einsum("pi,pi->p", v_p, vect_p, optimize="optimal")
+
+            return (norm_p <= tol) & (dot_p >= -tol) & (dot_p <= length_p+tol)
 
-            return idx
-        
         elif dim == 2:
-            # coordinates_n (n,3)
-            # points n
+            # points p
             # corners i [1, nPe]
-            
-            coord = self.coord
+
             faces = self.faces[:-1]
             nPe = len(faces)
-            connect_e = self.connect[elem, faces]
-            corners_i = coord[connect_e]
-            
-            # Vectors e_i for edge segments (nPe, 3)
+            connect_p_i = connect_p[:, faces]
+            corners_p_i = coordGlob[connect_p_i]
+
+            # Vectors e_i for edge segments (p, nPe, 3)
             indexReord = np.append(np.arange(1, nPe), 0)
-            e_i = coord[connect_e[indexReord]] - corners_i
-            e_i = np.einsum("id,i->id", e_i, 1/np.linalg.norm(e_i, axis=1), optimize="optimal")
+            e_p_i = coordGlob[connect_p_i[:, indexReord]] - corners_p_i
+            e_p_i = self.__Normalize(e_p_i)
 
             # normal vector to element face
-            n_i = np.cross(e_i[0], -e_i[-1])
-
-            # (n, i, 3)
-            coordinates_n_i = coordinates_n[:, np.newaxis].repeat(nPe, 1)
+            n_p = np.cross(e_p_i[:,0], -e_p_i[:,-1], axis=1)
 
             # Construct p vectors from corners
-            p_n_i = coordinates_n_i - corners_i
-            
-            cross_n_i = np.cross(e_i, p_n_i, axisa=1, axisb=2)
-            test_n_i = cross_n_i @ n_i >= -tol
-            # Return the index of nodes around the element that meet all conditions
-            test_n = np.sum(test_n_i, 1)
-            idx = np.where(test_n == nPe)[0]
+            v_p_i = coordinates_p[:, np.newaxis] - corners_p_i
+
+            cross_p_i = np.cross(e_p_i, v_p_i, axis=2)
+            test_p_i = np.einsum("pid,pd->pi", cross_p_i, n_p, optimize="optimal") >= -tol
+
+            return np.all(test_p_i, axis=1)
 
-            return idx
-        
         elif dim == 3:
-        
+
             faces = self.faces
             nbFaces = self.nbFaces
-            coord = self.coord[self.__connect[elem]]
-
-            if self.elemType is ElemType.PRISM6:
-                faces = np.array(faces)
-                faces = np.array([faces[np.arange(0,4)],
-                                  faces[np.arange(4,8)],
-                                  faces[np.arange(8,12)],
-                                  faces[np.arange(12,15)],
-                                  faces[np.arange(15,18)]], dtype=object)
-            elif self.elemType is ElemType.PRISM15:
-                faces = np.array(faces)
-                faces = np.array([faces[np.arange(0,8)],
-                                  faces[np.arange(8,16)],
-                                  faces[np.arange(16,24)],
-                                  faces[np.arange(24,30)],
-                                  faces[np.arange(30,36)]], dtype=object)
-            else:
-                faces = np.reshape(faces, (nbFaces,-1))
+
+            # the triangular faces of the prisms are padded with their first node
+            faces = np.reshape(faces, (nbFaces,-1))
 
             p0_f = [f[0] for f in faces]
             p1_f = [f[1] for f in faces]
-            p2_f = [f[-1] for f in faces]
+            p2_f = [f[f != f[0]][-1] for f in faces]
+
+            p0_p_f = coordGlob[connect_p[:, p0_f]]
+
+            i_p_f = coordGlob[connect_p[:, p1_f]] - p0_p_f
+            i_p_f = self.__Normalize(i_p_f)
 
-            i_f = coord[p1_f]-coord[p0_f]
-            i_f = np.einsum("ni,n->ni", i_f, 1/np.linalg.norm(i_f, axis=1), optimize="optimal")
+            j_p_f = coordGlob[connect_p[:, p2_f]] - p0_p_f
+            j_p_f = self.__Normalize(j_p_f)
 
-            j_f = coord[p2_f]-coord[p0_f]
-            j_f = np.einsum("ni,n->ni", j_f, 1/np.linalg.norm(j_f, axis=1), optimize="optimal")
+            n_p_f = np.cross(i_p_f, j_p_f, axis=2)
+            n_p_f = self.__Normalize(n_p_f)
 
-            n_f = np.cross(i_f, j_f, 1, 1)
-            n_f = np.einsum("ni,n->ni", n_f, 1/np.linalg.norm(n_f, axis=1), optimize="optimal")
+            v_p_f = coordinates_p[:, np.newaxis] - p0_p_f
+
+            t_p_f = np.einsum("pfi,pfi->pf", v_p_f, n_p_f, optimize="optimal") >= -tol
+
+            return np.all(t_p_f, axis=1)
+
+    @staticmethod
+    def __Normalize(vectors: np.ndarray) -> np.ndarray:
+        """Returns the unit vectors along the last axis.\n
+        Null vectors (degenerated edges or faces) remain null instead of producing nan values."""
+        norm = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return np.divide(vectors, norm, out=np.zeros(vectors.shape, dtype=float), where=norm > 0)
+
+    def _Get_binGrid(self) -> tuple[np.ndarray, float, np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the uniform grid of bins used to locate coordinates in elements.\n
+        The grid is built once and reset when the coordinates are modified.
+
+        Returns
+        -------
+        tuple[np.ndarray, float, np.ndarray, np.ndarray, np.ndarray]
+            - xMin : grid origin (3)
+            - h : bin size
+            - nBins : number of bins in each direction (3)
+            - indptr : bins pointer (nBins.prod()+1)
+            - elements : elements whose bounding box intersects the bin b are elements[indptr[b]:indptr[b+1]]
+        """
+
+        if self.__binGrid is None:
+
+            coord_e = self.__coordGlob[self.__connect] # (Ne, nPe, 3)
+            min_e = coord_e.min(1)
+            max_e = coord_e.max(1)
+
+            xMin = min_e.min(0)
+            extent = max_e.max(0) - xMin
+            active = extent > 0
+            nDim = max(np.count_nonzero(active), 1)
+
+            # bins have the size of the mean element bounding box
+            size_e = (max_e - min_e)[:, active]
+            h = np.mean(size_e) if size_e.size > 0 else 0.0
+            if h == 0:
+                h = 1.0
+            nBins = np.where(active, np.floor(extent / h), 0).astype(int) + 1
+            # limit the number of bins for meshes containing very different element sizes
+            maxBins = 8 * self.Ne
+            if nBins.prod() > maxBins:
+                h *= (nBins.prod() / maxBins) ** (1/nDim)
+                nBins = np.where(active, np.floor(extent / h), 0).astype(int) + 1
+
+            i0_e = self.__Get_bins_ijk(min_e, xMin, h, nBins)
+            n_e = self.__Get_bins_ijk(max_e, xMin, h, nBins) - i0_e + 1
+            count_e = n_e.prod(1)
+
+            # bins intersected by each element bounding box
+            elements = np.repeat(np.arange(self.Ne), count_e)
+            local = np.arange(elements.size) - np.repeat(np.cumsum(count_e) - count_e, count_e)
+            nX = n_e[elements, 0]; nY = n_e[elements, 1]
+            i = i0_e[elements, 0] + local % nX
+            j = i0_e[elements, 1] + (local // nX) % nY
+            k = i0_e[elements, 2] + local // (nX * nY)
+            bins = np.ravel_multi_index((i, j, k), nBins)
+
+            order = np.argsort(bins, kind='stable')
+            indptr = np.zeros(nBins.prod()+1, dtype=int)
+            indptr[1:] = np.cumsum(np.bincount(bins, minlength=nBins.prod()))
+
+            self.__binGrid = (xMin, h, nBins, indptr, elements[order])
+
+        return self.__binGrid
+
+    @staticmethod
+    def __Get_bins_ijk(coordinates: np.ndarray, xMin: np.ndarray, h: float, nBins: np.ndarray) -> np.ndarray:
+        """Returns the (i, j, k) indexes of the bins containing the coordinates (n, 3)."""
+        ijk = np.floor((coordinates - xMin) / h).astype(int)
+        return np.clip(ijk, 0, nBins-1)
 
-            coordinates_n_i = coordinates_n[:, np.newaxis].repeat(nbFaces, 1)
+    def __Get_candidates(self, coordinates_n: np.ndarray, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the (node, element) pairs for which the node is in the bin of an element bounding box."""
 
-            v_f = coordinates_n_i - coord[p0_f]
+        xMin, h, nBins, indptr, elements = self._Get_binGrid()
 
-            t_f = np.einsum("nfi,fi->nf", v_f, n_f, optimize="optimal") >= -tol
+        # coordinates outside the grid can't be in an element
+        coordinates = coordinates_n[nodes]
+        inGrid = np.all((coordinates >= xMin) & (coordinates <= xMin + nBins * h), 1)
+        nodes = nodes[inGrid]
 
-            filtre = np.sum(t_f, 1)
+        bins = np.ravel_multi_index(self.__Get_bins_ijk(coordinates[inGrid], xMin, h, nBins).T, nBins)
+        count_n = indptr[bins+1] - indptr[bins]
 
-            idx = np.where(filtre == nbFaces)[0]
+        nodes_p = np.repeat(nodes, count_n)
+        local = np.arange(nodes_p.size) - np.repeat(np.cumsum(count_n) - count_n, count_n)
+        elements_p = elements[np.repeat(indptr[bins], count_n) + local]
 
-            return idx
+        return nodes_p, elements_p
+
+    @staticmethod
+    def __Get_image_shape(coordinates_n: np.ndarray) -> tuple[int, int]:
+        """Returns the (nY, nX) shape of the image if coordinates_n are the pixels of an image, otherwise returns None.\n
+        The pixels (x, y, 0) must be integers ordered as np.ravel_multi_index((y, x), (nY, nX))."""
+
+        if not np.issubdtype(coordinates_n.dtype, np.integer) or coordinates_n.shape[0] == 0:
+            return None
+
+        nX, nY, nZ = np.max(coordinates_n, 0) - np.min(coordinates_n, 0) + 1
+        if nZ != 1 or nX * nY != coordinates_n.shape[0] or np.any(np.min(coordinates_n, 0) != 0):
+            return None
+
+        pixels = np.arange(coordinates_n.shape[0])
+        if np.any(coordinates_n[:,0] != pixels % nX) or np.any(coordinates_n[:,1] != pixels // nX):
+            return None
+
+        return nY, nX
+
+    def __Get_candidates_image(self, imageShape: tuple[int, int], elements: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the (pixel, element) pairs for which the pixel is in the element bounding box.\n
+        The pixels are obtained directly from the element bounds, without using the bin grid."""
+
+        nY, nX = imageShape
+
+        coord_e = self.__coordGlob[self.__connect[elements]]
+        # pixels in [min, max] of each element
+        i0_e = np.clip(np.ceil(coord_e[:,:,:2].min(1)), 0, [nX, nY]).astype(int)
+        i1_e = np.clip(np.floor(coord_e[:,:,:2].max(1)), -1, [nX-1, nY-1]).astype(int)
+        n_e = np.maximum(i1_e - i0_e + 1, 0)
+        count_e = n_e.prod(1)
+
+        elements_p = np.repeat(elements, count_e)
+        local = np.arange(elements_p.size) - np.repeat(np.cumsum(count_e) - count_e, count_e)
+        nX_p = np.repeat(n_e[:,0], count_e)
+        x_p = np.repeat(i0_e[:,0], count_e) + local % nX_p
+        y_p = np.repeat(i0_e[:,1], count_e) + local // nX_p
+        nodes_p = np.ravel_multi_index((y_p, x_p), (nY, nX))
+
+        return nodes_p, elements_p
 
     def Get_Mapping(self, coordinates_n: np.ndarray, elements_e=None, needCoordinates=True):
         """Locates coordinates within elements.
@@ -1518,7 +1979,10 @@ class _GroupElem(ABC):
         return self.__Get_Mapping(coordinates_n, elements_e, needCoordinates)
 
     def __Get_Mapping(self, coordinates_n: np.ndarray, elements_e: np.ndarray, needCoordinates=True):
-        """Locates coordinates within elements.
+        """Locates coordinates within elements.\n
+        Candidate elements are found with the bin grid (see _Get_binGrid) before checking that the coordinates are in the elements.\n
+        If the coordinates are the pixels of an image, the candidate pixels are directly obtained from the element bounds.
+        If needCoordinates, the nodes whose inverse mapping does not converge (degenerated elements) are not detected.
 
         Returns
         -------
@@ -1532,166 +1996,204 @@ class _GroupElem(ABC):
         """
         
         dim = self.dim
-        connect = self.connect
-        coord = self.coord
+        elements_e = np.asarray(elements_e, dtype=int).ravel()
+
+        # elements are returned in the order of elements_e
+        rank_e = np.full(self.Ne, -1, dtype=int)
+        rank_e[elements_e] = np.arange(elements_e.size)
+
+        coord_e = self.__coordGlob[self.__connect]
+        min_e = coord_e.min(1)
+        max_e = coord_e.max(1)
+
+        # (node, element) pairs are processed by chunks to limit memory usage
+        chunk = 2**16
+        list_nodes_p: list[np.ndarray] = []
+        list_elements_p: list[np.ndarray] = []
+
+        imageShape = self.__Get_image_shape(coordinates_n)
+        if imageShape is None:
+            nodes_or_elements = np.arange(coordinates_n.shape[0])
+        else:
+            # the chunks contain elements (about chunk pixels for each chunk)
+            nodes_or_elements = elements_e
+            if elements_e.size > 0:
+                pixels_e = np.prod(max_e[elements_e,:2] - min_e[elements_e,:2] + 1, 1)
+                chunk = max(int(chunk / np.mean(pixels_e)), 1)
+
+        for start in range(0, nodes_or_elements.size, chunk):
+
+            if imageShape is None:
+                nodes = nodes_or_elements[start:start + chunk]
+                nodes_p, elements_p = self.__Get_candidates(coordinates_n, nodes)
+            else:
+                elements = nodes_or_elements[start:start + chunk]
+                nodes_p, elements_p = self.__Get_candidates_image(imageShape, elements)
+
+            # keep the selected elements whose bounds contain the coordinates
+            coordinates_p = coordinates_n[nodes_p]
+            filtre = (rank_e[elements_p] >= 0) & np.all((coordinates_p >= min_e[elements_p]) & (coordinates_p <= max_e[elements_p]), 1)
+            nodes_p, elements_p = nodes_p[filtre], elements_p[filtre]
+
+            inElem = self.__Get_pointsInElements(coordinates_n[nodes_p], elements_p)
+            list_nodes_p.append(nodes_p[inElem])
+            list_elements_p.append(elements_p[inElem])
+
+        nodes_p = np.concatenate(list_nodes_p) if len(list_nodes_p) > 0 else np.array([], dtype=int)
+        elements_p = np.concatenate(list_elements_p) if len(list_elements_p) > 0 else np.array([], dtype=int)
         
-        # Initialize lists
-        detectedNodes: list[int] = []
-        # Elements where nodes have been identified
-        detectedElements_e: list[int] = []
-        # connectivity matrix containing the nodes used by the elements
-        connect_e_n: list[list[int]] = []
-
-        # Calculate the number of times a coordinate appears
-        dims = np.max(coordinates_n, 0) - np.min(coordinates_n, 0) + 1
-        # here dims is a 3d array used in __Get_coordoNear to check if coordinates_n comes from an image/grid
-        # If the coordinates come from an image/grid, the _Get_coordoNear function will be faster.
+        # sort pairs by element (in elements_e order) and then by node
+        order = np.lexsort((nodes_p, rank_e[elements_p]))
+        nodes_p, elements_p = nodes_p[order], elements_p[order]
 
         if needCoordinates:
             # Here we want to know the coordinates of the nodes in
             # the reference element's (ξ,η) coordinate system.
             coordInElem_n = np.zeros_like(coordinates_n[:,:dim], dtype=float)
 
-            # get coordinates in the reference element
-            # get groupElem datas
-            inDim = self.inDim
-            sysCoord_e = self.sysCoord_e # basis transformation matrix for each element
-            # This matrix can be used to project points with (x, y, z) coordinates into the element's (i, j, k) coordinate system.
-            matrixType = MatrixType.mass
-            jacobian_e_pg = self.Get_jacobian_e_pg(matrixType, absoluteValues=False)
-            invF_e_pg = self.Get_invF_e_pg(matrixType)
-            dN_tild = self._dNtild()
-            xiOrigin = self.origin # origin of the reference element (ξ0,η0)
-            
-            # Check whether iterative resolution is required
-            # calculate the ratio between jacob max and min to detect if the element is distorted
-            diff_e = jacobian_e_pg.max(1) * 1/jacobian_e_pg.min(1)
-            error_e = np.abs(1 - diff_e) # a perfect element has an error max <= 1e-12
-            # A distorted element exhibits a maximum error greater than zero.
-            useIterative_e = error_e > 1e-12
+            # A node detected in several elements uses the last element in which it has been detected.
+            last = nodes_p.size - 1 - np.unique(nodes_p[::-1], return_index=True)[1]
+
+            coordInElem_p, converged_p = self.__Get_coordInElem(coordinates_n[nodes_p[last]], elements_p[last])
+            coordInElem_n[nodes_p[last]] = coordInElem_p
+
+            if not np.all(converged_p):
+                # the nodes whose inverse mapping did not converge are not detected
+                keep = ~np.isin(nodes_p, nodes_p[last][~converged_p])
+                nodes_p, elements_p = nodes_p[keep], elements_p[keep]
         else:
             coordInElem_n = None
 
-        def ResearchFunction(e: int):
-    
-            # get element's node coordinates (x, y, z)
-            coordElem: np.ndarray = coord[connect[e]]
-
-            # Retrieve indexes in coordinates_n that are within the element's bounds
-            idxNearElem = self.__Get_coordoNear(coordinates_n, coordElem, dims)
-
-            # Return the index of idxNearElem that satisfies all the specified conditions.
-            idxInElem = self.Get_pointsInElem(coordinates_n[idxNearElem], e)
-
-            if idxInElem.size == 0:
-                # here no nodes have been detected in the element
-                return
-                                
-            # Nodes contained within element e.
-            nodesInElement = idxNearElem[idxInElem]
-
-            # Save de detected nodes elements and connectivity matrix
-            detectedNodes.extend(nodesInElement)
-            connect_e_n.append(nodesInElement)
-            detectedElements_e.append(e)
-
-            if needCoordinates:
-                # Inverse mapping is required here,
-                # i.e., to determine the position in the reference element (ξ, η) from the physical coordinates (x, y).
-                # This is particularly relevant for elements with multiple integration points (e.g., QUAD4, TRI6, TRI10, ..),
-                # i.e., all elements that can be distorted and have a Jacobian ratio different from 1.
-
-                # Project (x, y, z) coordinates into the element's (i, j, k) coordinate system if dim != inDim.
-                # its the case when a 2D mesh is in 3D space
-                coordElemBase = coordElem.copy()
-                coordinatesBase_n: np.ndarray = coordinates_n[nodesInElement].copy()
-                if dim != inDim:
-                    coordElemBase = coordElemBase @ sysCoord_e[e]
-                    coordinatesBase_n = coordinatesBase_n @ sysCoord_e[e]
-                
-                # Origin of the element in (x, y, z) coordinates.
-                x0  = coordElemBase[0,:dim]
-                # Coordinates of the n points in (x, y, z).
-                xP_n = coordinatesBase_n[:,:dim]
-
-                if not useIterative_e[e]:
-                    # The fastest method, available only for undistorted meshes.
-                    xiP: np.ndarray = xiOrigin + (xP_n - x0) @ invF_e_pg[e,0]
-                         
-                else:
-                    # This is the most time-consuming method.
-                    # We need to construct the Jacobian matrices here.
-                    def Eval(xi: np.ndarray, xP):
-                        dN = _GroupElem._Evaluates_Functions(dN_tild, xi.reshape(1, -1))
-                        F = dN[0] @ coordElemBase[:,:dim] # jacobian matrix [J]                  
-                        J = x0 + (xi - xiOrigin) @ F - xP # cost function
-                        return J
-
-                    xiP = []
-                    for xP in xP_n:
-                        res = least_squares(Eval, 0*xP, args=(xP,))
-                        xiP.append(res.x)
-
-                    xiP = np.array(xiP)
-
-                # xiP are the n coordinates of the n points in (ξ,η,ζ).
-                coordInElem_n[nodesInElement,:] = xiP.copy()
-
-        [ResearchFunction(e) for e in elements_e]
-
-        assert len(detectedElements_e) == len(connect_e_n), "The number of detected elements must match the number of lines in connect_e_n."
-
-        ar_detectedNodes = np.asarray(detectedNodes,dtype=int)
-        ar_detectedElements_e = np.asarray(detectedElements_e,dtype=int)
-        ar_connect_e_n = np.asarray(connect_e_n,dtype=object)
+        # Save de detected nodes elements and connectivity matrix
+        ar_detectedNodes = np.asarray(nodes_p, dtype=int)
+        newElement = np.ones(elements_p.size, dtype=bool)
+        newElement[1:] = elements_p[1:] != elements_p[:-1]
+        ar_detectedElements_e = np.asarray(elements_p[newElement], dtype=int)
+        connect_e_n = np.split(ar_detectedNodes, np.where(newElement)[0][1:]) if nodes_p.size > 0 else []
+        ar_connect_e_n = np.asarray(connect_e_n, dtype=object)
+
+        assert ar_detectedElements_e.size == len(connect_e_n), "The number of detected elements must match the number of lines in connect_e_n."
 
         return ar_detectedNodes, ar_detectedElements_e, ar_connect_e_n, coordInElem_n
-    
-    def __Get_coordoNear(self, coordinates_n: np.ndarray, coordElem: np.ndarray, dims: np.ndarray) -> np.ndarray:
-        """Get indexes in coordinates_n that are within the coordElem's bounds.
+
+    def __Get_coordInElem(self, coordinates_p: np.ndarray, elements_p: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the coordinates in the reference element's (ξ,η,ζ) coordinate system (p, dim) and whether the inverse mapping converged (p).\n
+        The p-th coordinate is mapped with the p-th element."""
+
+        dim = self.dim
+        inDim = self.inDim
+
+        # get coordinates in the reference element
+        # get groupElem datas
+        matrixType = MatrixType.mass
+        jacobian_e_pg = self.Get_jacobian_e_pg(matrixType, absoluteValues=False)
+        invF_e_pg = self.Get_invF_e_pg(matrixType)
+        xiOrigin = self.origin # origin of the reference element (ξ0,η0)
+
+        # Check whether iterative resolution is required
+        # calculate the ratio between jacob max and min to detect if the element is distorted
+        diff_e = jacobian_e_pg.max(1) * 1/jacobian_e_pg.min(1)
+        error_e = np.abs(1 - diff_e) # a perfect element has an error max <= 1e-12
+        # A distorted element exhibits a maximum error greater than zero.
+        useIterative_p = error_e[elements_p] > 1e-12
+
+        # Inverse mapping is required here,
+        # i.e., to determine the position in the reference element (ξ, η) from the physical coordinates (x, y).
+        # This is particularly relevant for elements with multiple integration points (e.g., QUAD4, TRI6, TRI10, ..),
+        # i.e., all elements that can be distorted and have a Jacobian ratio different from 1.
+
+        # Project (x, y, z) coordinates into the element's (i, j, k) coordinate system if dim != inDim.
+        # its the case when a 2D mesh is in 3D space
+        coordElemBase_p = self.__coordGlob[self.__connect[elements_p]]
+        coordinatesBase_p = np.asarray(coordinates_p, dtype=float)
+        if dim != inDim:
+            sysCoord_p = self.sysCoord_e[elements_p] # basis transformation matrix for each element
+            coordElemBase_p = np.einsum("pni,pij->pnj", coordElemBase_p, sysCoord_p, optimize="optimal")
+            coordinatesBase_p = np.einsum("pi,pij->pj", coordinatesBase_p, sysCoord_p, optimize="optimal")
+
+        # Origin of the element in (x, y, z) coordinates.
+        x0_p = coordElemBase_p[:,0,:dim]
+        # Coordinates of the p points in (x, y, z).
+        xP_p = coordinatesBase_p[:,:dim]
+
+        # The fastest method, available only for undistorted meshes.
+        xiP_p = xiOrigin + np.einsum("pi,pij->pj", xP_p - x0_p, invF_e_pg[elements_p,0], optimize="optimal")
+
+        converged_p = np.ones(xiP_p.shape[0], dtype=bool)
+
+        # Distorted elements require an iterative resolution.
+        iterative = np.where(useIterative_p)[0]
+        if iterative.size > 0:
+            xiP_p[iterative], converged_p[iterative] = self.__Get_coordInElem_Newton(coordElemBase_p[iterative,:,:dim], xP_p[iterative], xiP_p[iterative])
+
+        # xiP are the p coordinates of the p points in (ξ,η,ζ).
+        return xiP_p, converged_p
+
+    def __Get_coordInElem_Newton(self, coordElem_p: np.ndarray, xP_p: np.ndarray, xi0_p: np.ndarray, maxIter=20, tol=1e-12) -> tuple[np.ndarray, np.ndarray]:
+        """Solves N(ξ) x_e = xP with a Newton method for all points at once.\n
+        The increment of a singular jacobian matrix (degenerated element) is computed with a least squares solution.
 
         Parameters
         ----------
-        coordinates_n : np.ndarray
-            coordinates to check
-        coordElem : np.ndarray
-            element's bounds
-        dims : np.ndarray
-            (nX, nY, nZ) = np.max(coordinates_n, 0) - np.min(coordinates_n, 0) + 1
+        coordElem_p : np.ndarray
+            element's nodes coordinates for each point (p, nPe, dim)
+        xP_p : np.ndarray
+            points coordinates (p, dim)
+        xi0_p : np.ndarray
+            initial coordinates in the reference element (p, dim)
+        maxIter : int, optional
+            maximum number of iterations, by default 20
+        tol : float, optional
+            tolerance on the increment, by default 1e-12
 
         Returns
         -------
-        np.ndarray
-            indexes in element's bounds. 
+        tuple[np.ndarray, np.ndarray]
+            coordinates in the reference element (p, dim) and whether the residual |N(ξ) x_e - xP| / element size <= 1e-8 (p)
         """
 
-        nX, nY, nZ = dims
-        
-        # If all the coordinates appear the same number of times and the coordinates are of type int, we are on a grid/image.
-        testShape = nX * nY - coordinates_n.shape[0] == 0
-        coordinatesInImage = coordinates_n.dtype==int and testShape and nZ == 1
+        xi_p = np.array(xi0_p, dtype=float)
+        # points that have not converged yet
+        active = np.arange(xi_p.shape[0])
 
-        if coordinatesInImage:
-            # here coordinates_n are pixels
+        def Get_residual_jacobian(xi_a: np.ndarray, coordElem_a: np.ndarray, xP_a: np.ndarray):
+            N_a = self._Evaluates_Polynomials("N", xi_a)[:,0] # (a, nPe)
+            dN_a = self._Evaluates_Polynomials("dN", xi_a) # (a, dim, nPe)
+            # residual and jacobian matrix [J] such that dx = dξ [J]
+            r_a = np.einsum("an,and->ad", N_a, coordElem_a, optimize="optimal") - xP_a
+            J_a = np.einsum("akn,and->akd", dN_a, coordElem_a, optimize="optimal")
+            return r_a, J_a
 
-            xe = np.arange(np.floor(coordElem[:,0].min()), np.ceil(coordElem[:,0].max()), dtype=int)
-            ye = np.arange(np.floor(coordElem[:,1].min()), np.ceil(coordElem[:,1].max()), dtype=int)
-            Xe, Ye = np.meshgrid(xe,ye)
+        for _ in range(maxIter):
 
-            grid_elements_coordinates = np.concatenate(([Ye.ravel()],[Xe.ravel()]))
-            idx = np.ravel_multi_index(grid_elements_coordinates, (nY, nX))
-            # if something goes wrong, check that the mesh is correctly positioned in the image
-            
-        else:
+            xi_a = xi_p[active]
+            r_a, J_a = Get_residual_jacobian(xi_a, coordElem_p[active], xP_p[active])
+            Jt_a = J_a.transpose((0,2,1))
 
-            xn, yn, zn = coordinates_n.T
-            xe, ye, ze = coordElem.T
-            
-            idx = np.where((xn >= np.min(xe)) & (xn <= np.max(xe)) &
-                            (yn >= np.min(ye)) & (yn <= np.max(ye)) & 
-                            (zn >= np.min(ze)) & (zn <= np.max(ze)))[0]
+            # singular jacobian matrices
+            scale_a = np.prod(np.linalg.norm(Jt_a, axis=2), axis=1)
+            singular = np.abs(np.linalg.det(Jt_a)) <= 1e-12 * scale_a
 
-        return idx
+            dxi_a = np.zeros_like(r_a)
+            regular = ~singular
+            if np.any(regular):
+                dxi_a[regular] = np.linalg.solve(Jt_a[regular], r_a[regular,:,np.newaxis])[:,:,0]
+            if np.any(singular):
+                dxi_a[singular] = np.einsum("aij,aj->ai", np.linalg.pinv(Jt_a[singular]), r_a[singular], optimize="optimal")
+            xi_p[active] = xi_a - dxi_a
+
+            converged = np.linalg.norm(dxi_a, axis=1) <= tol * (1 + np.linalg.norm(xi_a, axis=1))
+            active = active[~converged]
+
+            if active.size == 0:
+                break
+
+        # the residual of each point is checked
+        r_p = Get_residual_jacobian(xi_p, coordElem_p, xP_p)[0]
+        size_p = np.linalg.norm(coordElem_p.max(1) - coordElem_p.min(1), axis=1)
+        converged_p = np.linalg.norm(r_p, axis=1) <= 1e-8 * size_p
+
+        return xi_p, converged_p
     
     @property  
     @abstractmethod
@@ -13,8 +13,9 @@ A hexahedral mesh (HEXA8) uses :\n
 
 import numpy as np
 import scipy.sparse as sp
+from scipy.spatial import cKDTree
 import copy
-from typing import Callable
+from typing import Callable, Union
 
 # utilities
 from ..utilities import Display
@@ -23,6 +24,7 @@ from ..utilities._observers import Observable
 # fem
 from ._utils import ElemType, MatrixType
 from ._group_elems import _GroupElem
+from ._strain_operator import StrainOperator
 # others
 from ..Geoms import *
 
@@ -55,6 +57,9 @@ class Mesh(Observable):
         self.__verbosity = verbosity
         """the mesh can write in the terminal"""
 
+        self.__kdTree: cKDTree = None
+        """KD-tree used to select nodes, built when needed"""
+
         if self.__verbosity:
             print(self)
         
@@ -69,6 +74,7 @@ class Mesh(Observable):
     def _ResetMatrix(self) -> None:
         """Resets matrices for each groupElem"""
         [groupElem._InitMatrix() for groupElem in self.Get_list_groupElem()]
+        self.__kdTree = None
 
     def __str__(self) -> str:
         """Returns a string representation of the mesh."""
@@ -157,7 +163,8 @@ class Mesh(Observable):
         oldCoord = self.coordGlob
         newCoord = oldCoord + np.array([dx, dy, dz])
         for grp in self.dict_groupElem.values():
-            grp.coordGlob = newCoord        
+            grp.coordGlob = newCoord
+        self.__kdTree = None
         self._Notify('The mesh has been modified')
 
     
@@ -178,6 +185,7 @@ class Mesh(Observable):
         newCoord = Rotate_coord(oldCoord, theta, center, direction)
         for grp in self.dict_groupElem.values():
             grp.coordGlob = newCoord
+        self.__kdTree = None
         self._Notify('The mesh has been modified')
 
     def Symmetry(self, point=(0,0,0), n=(1,0,0)) -> None:
@@ -195,6 +203,7 @@ class Mesh(Observable):
         newCoord = Symmetry_coord(oldCoord, point, n)
         for grp in self.dict_groupElem.values():
             grp.coordGlob = newCoord
+        self.__kdTree = None
         self._Notify('The mesh has been modified')
 
     @property
@@ -213,6 +222,7 @@ class Mesh(Observable):
         if coordo.shape == self.coordGlob.shape:
             for grp in self.dict_groupElem.values():
                 grp.coordGlob = coordo
+            self.__kdTree = None
 
     @property
     def connect(self) -> np.ndarray:
@@ -224,6 +234,16 @@ class Mesh(Observable):
         """the mesh can write in the terminal"""
         return self.__verbosity
 
+    @property
+    def zeroCopy(self) -> bool:
+        """matrices stored in the element groups (dN_e_pg, B_e_pg, jacobian_e_pg ...) are returned as read-only views instead of copies."""
+        return self.groupElem.zeroCopy
+
+    @zeroCopy.setter
+    def zeroCopy(self, value: bool) -> None:
+        for grp in self.dict_groupElem.values():
+            grp.zeroCopy = value
+
     def Get_connect_n_e(self) -> sp.csr_matrix:
         """Sparse matrix (Nn, Ne) of zeros and ones with ones when the node has the element such that:\n
         values_n = connect_n_e * values_e\n
@@ -231,28 +251,41 @@ class Mesh(Observable):
         """
         return self.groupElem.Get_connect_n_e()
 
+    def Get_connect_e_e(self) -> sp.csr_matrix:
+        """Sparse matrix (Ne, Ne) of zeros and ones with ones when the elements share at least one node."""
+        return self.groupElem.Get_connect_e_e()
+
     @property
     def assembly_e(self) -> np.ndarray:
         """assembly matrix (Ne, nPe*dim)\n
-        Used to position the rigi matrix in the global matrix."""
+        Used to position the rigi matrix in the global matrix.\n
+        Read-only view if zeroCopy is enabled, otherwise a copy."""
         return self.groupElem.assembly_e
 
     def Get_assembly_e(self, dof_n: int) -> np.ndarray:
-        """Returns assembly matrix for specified dof_n (Ne, nPe*dof_n)"""
+        """Returns assembly matrix for specified dof_n (Ne, nPe*dof_n)\n
+        Read-only view if zeroCopy is enabled, otherwise a copy."""
         return self.groupElem.Get_assembly_e(dof_n)
 
+    @property
+    def useInt32Indexes(self) -> bool:
+        """assembly indexes (assembly_e, linesVector_e, columnsVector_e ...) are stored as int32 instead of int64 when Nn*dof_n < 2**31."""
+        return self.groupElem.useInt32Indexes
+
+    @useInt32Indexes.setter
+    def useInt32Indexes(self, value: bool) -> None:
+        for grp in self.dict_groupElem.values():
+            grp.useInt32Indexes = value
+
     @property
     def linesVector_e(self) -> np.ndarray:
         """lines to fill the assembly matrix in vector (e.g elastic problem)"""
         return self.Get_linesVector_e(self.__dim)
 
     def Get_linesVector_e(self, dof_n: int) -> np.ndarray:
-        """Returns lines to fill the assembly matrix in vector (e.g elastic problem)"""
-        assembly_e = self.Get_assembly_e(dof_n)
-        nPe = self.nPe
-        Ne = self.Ne
-        linesVector_e = np.repeat(assembly_e, nPe * dof_n).reshape((Ne, -1))
-        return linesVector_e
+        """Returns lines to fill the assembly matrix in vector (e.g elastic problem)\n
+        Read-only view if zeroCopy is enabled, otherwise a copy."""
+        return self.groupElem.Get_lines_e(dof_n)
 
     @property
     def columnsVector_e(self) -> np.ndarray:
@@ -260,28 +293,150 @@ class Mesh(Observable):
         return self.Get_columnsVector_e(self.__dim)
 
     def Get_columnsVector_e(self, dof_n: int) -> np.ndarray:
-        """Returns columns to fill the vector assembly matrix"""
+        """Returns columns to fill the vector assembly matrix\n
+        Read-only view if zeroCopy is enabled, otherwise a copy."""
+        return self.groupElem.Get_columns_e(dof_n)
+
+    def Get_sparsity_pattern(self, dof_n: int, symmetric=False) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the csr sparsity pattern of the matrices assembled with dof_n degrees of freedom per node.\n
+        returns indptr, indices, map_e\n
+        map_e gives the position in the csr data array of each value in the elementary matrices.\n
+        If symmetric, only the upper triangle is stored."""
+        return self.groupElem.Get_sparsity_pattern(dof_n, symmetric)
+
+    def Assemble_matrix(self, values_e: np.ndarray, dof_n: int, Ndof: int=None, symmetric=False) -> sp.csr_matrix:
+        """Assembles the elementary matrices in a csr matrix using the cached sparsity pattern.\n
+        Gives the same matrix as sp.csr_matrix((values_e.ravel(), (linesVector_e, columnsVector_e)), shape=(Ndof, Ndof)).\n
+        If symmetric, gives the upper triangle sp.triu() of this matrix.
+
+        Parameters
+        ----------
+        values_e : np.ndarray
+            elementary matrices (Ne, nPe*dof_n, nPe*dof_n)
+        dof_n : int
+            degree of freedom per node
+        Ndof : int, optional
+            size of the assembled matrix, by default Nn*dof_n\n
+            Additional lines and columns are empty (e.g lagrange multipliers).
+        symmetric : bool, optional
+            the elementary matrices are symmetric and only the upper triangle is assembled and stored, by default False
+
+        Returns
+        -------
+        sp.csr_matrix
+            the assembled matrix (Ndof, Ndof)
+        """
+        return self.Assemble_matrix_chunks(lambda elements: values_e, [slice(None)], dof_n, Ndof, symmetric)
+
+    def Assemble_matrix_chunks(self, Construct_e: Callable[[slice], Union[np.ndarray, tuple[np.ndarray, ...]]],
+                               chunks: list[slice], dof_n: int, Ndof: int=None, symmetric=False) -> Union[sp.csr_matrix, tuple[sp.csr_matrix, ...]]:
+        """Assembles the elementary matrices block by block directly in the csr data arrays.\n
+        Only the elementary matrices of one block of elements are stored at a time.
+
+        Parameters
+        ----------
+        Construct_e : Callable[[slice], np.ndarray | tuple[np.ndarray, ...]]
+            function returning the elementary matrices (len(elements), nPe*dof_n, nPe*dof_n) of the given elements\n
+            The function can return several elementary matrices (as a tuple) assembled with the same pattern.
+        chunks : list[slice]
+            blocks of elements (e.g. [slice(0, 1000), slice(1000, Ne)])\n
+            Each element must appear in one block only.
+        dof_n : int
+            degree of freedom per node
+        Ndof : int, optional
+            size of the assembled matrices, by default Nn*dof_n\n
+            Additional lines and columns are empty (e.g lagrange multipliers).
+        symmetric : bool, optional
+            the elementary matrices are symmetric and only the upper triangle is assembled and stored, by default False\n
+            Construct_e can return the full elementary matrices or only their upper triangle (len(elements), ndof_e*(ndof_e+1)/2) (see np.triu_indices(ndof_e)).
+
+        Returns
+        -------
+        sp.csr_matrix | tuple[sp.csr_matrix, ...]
+            the assembled matrix (Ndof, Ndof) or matrices if Construct_e returns a tuple
+        """
+
+        indptr, indices, map_e = self.Get_sparsity_pattern(dof_n, symmetric)
+
+        ndof_e = self.nPe * dof_n
+        triu = np.triu_indices(ndof_e) if symmetric else None
+
+        size = indptr.size - 1
+        if Ndof is None:
+            Ndof = size
+        assert Ndof >= size, f"Ndof must be >= {size}"
+
+        map_e = map_e.reshape(self.Ne, -1)
+
+        list_data: list[np.ndarray] = []
+        isTuple = False
+
+        for chunk in chunks:
+            positions = map_e[chunk].ravel()
+            if positions.size == 0: continue
+
+            values = Construct_e(chunk)
+            isTuple = isinstance(values, tuple)
+            values = values if isTuple else (values,)
+
+            if len(list_data) == 0:
+                list_data = [np.zeros(indices.size) for _ in values]
+
+            # range of the csr data array used by the block
+            first, last = positions.min(), positions.max() + 1
+            useBincount = last - first <= 4 * positions.size
+
+            for data, values_e in zip(list_data, values):
+                values_e = np.asarray(values_e, dtype=float)
+                if symmetric and values_e.size != positions.size:
+                    # upper triangle of the elementary matrices
+                    values_e = values_e.reshape(-1, ndof_e, ndof_e)[:, triu[0], triu[1]]
+                values_e = values_e.ravel()
+                assert values_e.size == positions.size, f"values_e must be of size {positions.size}"
+                if useBincount:
+                    data[first:last] += np.bincount(positions - first, weights=values_e, minlength=last-first)
+                else:
+                    # the block is scattered over the data array
+                    np.add.at(data, positions, values_e)
+
+        if len(list_data) == 0:
+            # no elements
+            list_data = [np.zeros(indices.size)]
+
+        if Ndof > size:
+            # empty lines
+            indptr = np.concatenate((indptr, np.full(Ndof-size, indptr[-1], dtype=indptr.dtype)))
+
+        matrices = tuple(sp.csr_matrix((data, indices, indptr), shape=(Ndof, Ndof)) for data in list_data)
+
+        return matrices if isTuple else matrices[0]
+
+    def Assemble_vector(self, values_e: np.ndarray, dof_n: int, Ndof: int=None) -> sp.csr_matrix:
+        """Assembles the elementary vectors (Ne, nPe*dof_n) in a csr vector (Ndof, 1)."""
+
         assembly_e = self.Get_assembly_e(dof_n)
-        nPe = self.nPe
-        Ne = self.Ne
-        columnsVector_e = np.repeat(assembly_e, nPe * dof_n, axis=0).reshape((Ne, -1))
-        return columnsVector_e
+
+        size = self.Nn * dof_n
+        if Ndof is None:
+            Ndof = size
+        assert Ndof >= size, f"Ndof must be >= {size}"
+
+        values_e = np.asarray(values_e, dtype=float).ravel()
+        values = np.bincount(assembly_e.ravel(), weights=values_e, minlength=Ndof)
+
+        return sp.csr_matrix(values.reshape(-1, 1))
 
     @property
     def linesScalar_e(self) -> np.ndarray:
-        """lines to fill the assembly matrix in scalar form (damage or thermal problems)"""
-        connect = self.connect
-        nPe = self.nPe
-        Ne = self.Ne
-        return np.repeat(connect, nPe).reshape((Ne, -1))
+        """lines to fill the assembly matrix in scalar form (damage or thermal problems)\n
+        Read-only view if zeroCopy is enabled, otherwise a copy."""
+        return self.groupElem.Get_lines_e(1)
 
     @property
     def columnsScalar_e(self) -> np.ndarray:
-        """columns to fill the assembly matrix in scalar form (damage or thermal problems)"""
-        connect = self.connect
-        nPe = self.nPe
-        Ne = self.Ne
-        return np.repeat(connect, nPe, axis=0).reshape((Ne, -1))
+        """columns to fill the assembly matrix in scalar form (damage or thermal problems)\n
+        Read-only view if zeroCopy is enabled, otherwise a copy."""
+        return self.groupElem.Get_columns_e(1)
 
     @property
     def length(self) -> float:
@@ -407,23 +562,33 @@ class Mesh(Observable):
         """
         return self.groupElem.Get_ddN_e_pg(matrixType)
 
-    def Get_B_e_pg(self, matrixType: MatrixType) -> np.ndarray:
+    def Get_strainOperator(self, matrixType: MatrixType, elements: np.ndarray=None) -> StrainOperator:
+        """Get the operator used to calculate deformations from displacements.\n
+        Only the stored dN_e_pg and jacobian_e_pg * weight_pg are used, the B_e_pg matrices are not built.\n
+        If elements are given, the operator is restricted to these elements.
+        """
+        return self.groupElem.Get_strainOperator(matrixType, elements)
+
+    def Get_B_e_pg(self, matrixType: MatrixType, elements: np.ndarray=None) -> np.ndarray:
         """Get the matrix used to calculate deformations from displacements.\n
         WARNING: Use Kelvin Mandel Notation\n
         [N1,x 0 N2,x 0 Nn,x 0\n
         0 N1,y 0 N2,y 0 Nn,y\n
         N1,y N1,x N2,y N2,x N3,y N3,x]\n
-        (e, pg, (3 or 6), nPe*dim)        
+        (e, pg, (3 or 6), nPe*dim)\n
+        If elements are given, the matrices are only computed for these elements and are not stored.\n
+        The matrices are mostly zeros, prefer Get_strainOperator() which does not build them.
         """
-        return self.groupElem.Get_B_e_pg(matrixType)
+        return self.groupElem.Get_B_e_pg(matrixType, elements)
 
-    def Get_leftDispPart(self, matrixType: MatrixType) -> np.ndarray:
+    def Get_leftDispPart(self, matrixType: MatrixType, elements: np.ndarray=None) -> np.ndarray:
         """Get the left side of local displacement matrices.\n
         Ku_e = jacobian_e_pg * weight_pg * B_e_pg' * c_e_pg * B_e_pg\n
 
-        Returns (epij) -> jacobian_e_pg * weight_pg * B_e_pg'.
+        Returns (epij) -> jacobian_e_pg * weight_pg * B_e_pg'.\n
+        If elements are given, the matrices are only computed for these elements and are not stored.
         """
-        return self.groupElem.Get_leftDispPart(matrixType)
+        return self.groupElem.Get_leftDispPart(matrixType, elements)
 
     def Get_ReactionPart_e_pg(self, matrixType: MatrixType) -> np.ndarray:
         """Get the part that builds the reaction term (scalar).\n
@@ -471,39 +636,177 @@ class Mesh(Observable):
         """
         return self.groupElem.Get_Nodes_Conditions(func)
     
+    def _Get_kdTree(self) -> cKDTree:
+        """Returns the KD-tree built on the nodes coordinates (mesh.coord).\n
+        The tree is built on the first call and reset when the coordinates are modified."""
+        if self.__kdTree is None:
+            self.__kdTree = cKDTree(self.coord)
+        return self.__kdTree
+
+    def __Get_nodes_in_ball(self, center: np.ndarray, radius: float) -> np.ndarray:
+        """Returns the indexes in mesh.coord of the nodes in the ball (sorted)."""
+        idx = self._Get_kdTree().query_ball_point(np.asarray(center, dtype=float), radius, return_sorted=True)
+        return np.asarray(idx, dtype=int)
+
+    def __Get_nodes_near_segment(self, p0: np.ndarray, p1: np.ndarray, radius: float) -> np.ndarray:
+        """Returns the indexes in mesh.coord of the nodes that may be closer than radius to the segment [p0, p1] (sorted).\n
+        The segment is covered by balls whose size is about the mean distance between nodes."""
+
+        tree = self._Get_kdTree()
+        p0 = np.asarray(p0, dtype=float)
+        p1 = np.asarray(p1, dtype=float)
+        length = np.linalg.norm(p1 - p0)
+
+        # mean distance between nodes
+        extent = tree.maxes - tree.mins
+        extent = extent[extent > 0]
+        h = (np.prod(extent) / tree.n) ** (1/extent.size) if extent.size > 0 else 1.0
+
+        nBalls = int(np.clip(np.ceil(length / max(h, radius)), 1, tree.n))
+        centers = p0 + np.outer((np.arange(nBalls) + 0.5) / nBalls, p1 - p0)
+        radiusBall = np.sqrt((length / nBalls / 2)**2 + radius**2) * (1 + 1e-12) + radius
+
+        idx = tree.query_ball_point(centers, radiusBall)
+        if nBalls == 1:
+            return np.asarray(sorted(idx[0]), dtype=int)
+        else:
+            return np.unique(np.concatenate([np.asarray(i, dtype=int) for i in idx]))
+
     def Nodes_Point(self, point: Point) -> np.ndarray:
         """Returns nodes on the point."""
-        return self.groupElem.Get_Nodes_Point(point)
-    
+
+        assert isinstance(point, Point)
+
+        # nodes close to the point with the relative tolerance used in groupElem.Get_Nodes_Point()
+        tree = self._Get_kdTree()
+        tolerance = 1e-3
+        dec = np.abs(tree.mins) + 10
+        radius = np.linalg.norm(tolerance * (tree.maxes + dec)) * (1 + 1e-12)
+        idx = self.__Get_nodes_in_ball(point.coord, radius)
+
+        return self.groupElem.Get_Nodes_Point(point, idx)
+
     def Nodes_Points(self, points: list[Point]) -> np.ndarray:
         """Returns nodes on points."""
-        nodes = set()
-        for point in points:
-            nodes = nodes.union(self.groupElem.Get_Nodes_Point(point))
-        return np.asarray(list(nodes))
+        list_nodes = [self.Nodes_Point(point) for point in points]
+        if len(list_nodes) == 0:
+            return np.array([], dtype=int)
+        return np.unique(np.concatenate(list_nodes))
+
+    def Nodes_Points_batch(self, points: Union[list[Point], np.ndarray]) -> np.ndarray:
+        """Returns the node on each point.
+
+        Parameters
+        ----------
+        points : list[Point] | np.ndarray
+            points or points coordinates (n, 3)
+
+        Returns
+        -------
+        np.ndarray
+            nodes (n), -1 if no node has been detected on the point.\n
+            If several nodes are on the point, the closest one is returned.
+        """
+
+        if isinstance(points, np.ndarray):
+            coordinates = np.asarray(points, dtype=float).reshape(-1, 3)
+        else:
+            coordinates = np.array([point.coord for point in points], dtype=float).reshape(-1, 3)
+
+        nodes = np.full(coordinates.shape[0], -1, dtype=int)
+        if coordinates.shape[0] == 0:
+            return nodes
+
+        # closest node for each point
+        idx = self._Get_kdTree().query(coordinates)[1]
+        coord = self.coord
+
+        # the previous condition may be too restrictive, use the relative tolerance of Nodes_Point
+        tolerance = 1e-3
+        dec = np.abs(coord.min(0)) + 10
+        error = np.abs((coord[idx] - coordinates) / (coord[idx] + dec))
+
+        detected = np.all(coord[idx] == coordinates, axis=1) | np.all(error <= tolerance, axis=1)
+        nodes[detected] = self.nodes[idx[detected]]
+
+        return nodes
 
     def Nodes_Line(self, line: Line) -> np.ndarray:
         """Returns the nodes on the line."""
-        return self.groupElem.Get_Nodes_Line(line)
+
+        assert isinstance(line, Line)
+
+        eps = 1e-12
+
+        # nodes close to the line
+        idx = self.__Get_nodes_near_segment(line.coord[0], line.coord[1], eps)
+
+        return self.groupElem.Get_Nodes_Line(line, idx)
 
     def Nodes_Domain(self, domain: Domain) -> np.ndarray:
         """Returns nodes in the domain."""
-        return self.groupElem.Get_Nodes_Domain(domain)
+
+        assert isinstance(domain, Domain)
+
+        eps = 1e-12
+
+        # nodes in the ball containing the domain
+        pt1, pt2 = domain.pt1.coord, domain.pt2.coord
+        idx = self.__Get_nodes_in_ball((pt1 + pt2)/2, np.linalg.norm(pt2 - pt1)/2 * (1 + 1e-12) + 2*eps)
+        
+        return self.groupElem.Get_Nodes_Domain(domain, idx)
 
     def Nodes_Circle(self, circle: Circle, onlyOnCircle=False) -> np.ndarray:
         """Returns the nodes in the circle."""
-        return self.groupElem.Get_Nodes_Circle(circle, onlyOnCircle)
+
+        assert isinstance(circle, Circle)
+
+        eps = 1e-12
+
+        # nodes in the ball
+        idx = self.__Get_nodes_in_ball(circle.center.coord, circle.diam/2 * (1 + 1e-12) + 2*eps)
+
+        return self.groupElem.Get_Nodes_Circle(circle, onlyOnCircle, idx)
 
     def Nodes_Cylinder(self, circle: Circle, direction=[0, 0, 1], onlyOnEdge=False) -> np.ndarray:
         """Returns the nodes in the cylinder."""
-        return self.groupElem.Get_Nodes_Cylinder(circle, direction, onlyOnEdge)
+
+        assert isinstance(circle, Circle)
+
+        R = circle.diam/2
+        eps = 1e-12
+
+        J = self.groupElem._Get_Cylinder_Jacobian(circle, direction)
+        # |cj| scales the cylinder radius in the j direction
+        cj = np.linalg.norm(J[:,1])
+
+        # nodes close to the cylinder axis in the mesh bounds
+        tree = self._Get_kdTree()
+        k = J[:,2]
+        corners = np.array(np.meshgrid(*zip(tree.mins, tree.maxes))).reshape(3,-1).T
+        t = (corners - circle.center.coord) @ k
+        p0 = circle.center.coord + t.min() * k
+        p1 = circle.center.coord + t.max() * k
+        idx = self.__Get_nodes_near_segment(p0, p1, (R+eps) * max(1, cj) * (1 + 1e-12) + eps)
+
+        return self.groupElem.Get_Nodes_Cylinder(circle, direction, onlyOnEdge, idx)
 
     def Elements_Nodes(self, nodes: np.ndarray, exclusively=True, neighborLayer:int=1):
         """Returns elements that exclusively or not use the specified nodes."""
         
+        groupElem = self.groupElem
+
         for i in range(neighborLayer):
-            elements = self.groupElem.Get_Elements_Nodes(nodes=nodes, exclusively=exclusively)
-            nodes = list(set(np.ravel(self.connect[elements])))
+
+            if i == 0:
+                elements = groupElem.Get_Elements_Nodes(nodes=nodes, exclusively=exclusively)
+            elif exclusively:
+                nodes = np.unique(self.connect[elements])
+                elements = groupElem.Get_Elements_Nodes(nodes=nodes, exclusively=exclusively)
+            else:
+                # elements sharing a node with the previous layer
+                if i == 1: connect_e_e = groupElem.Get_connect_e_e()
+                elements = np.unique(connect_e_e[elements].indices)
 
             if neighborLayer > 1 and elements.size == self.Ne:                
                 Display.MyPrint("All the neighbors have been found.")
@@ -653,23 +956,26 @@ class Mesh(Observable):
             else:
                 next_corner = corners[c+1]
 
+            eps=1e-12
+            # nodes close to the line
+            idx = self.__Get_nodes_near_segment(corner, next_corner, eps)
+
             line = next_corner - corner # constructs line between 2 corners
             lineLength = np.linalg.norm(line) # length of the line
             vect = Normalize_vect(line) # normalized vector between the edge corners
-            vect_i = coordo - corner # vector coordinates from the first corner of the edge
+            vect_i = coordo[idx] - corner # vector coordinates from the first corner of the edge
             scalarProduct = np.einsum('ni,i', vect_i, vect, optimize="optimal")
             crossProduct = np.cross(vect_i, vect)
             norm = np.linalg.norm(crossProduct, axis=1)
 
-            eps=1e-12
-            nodes = np.where((norm<eps) & (scalarProduct>=-eps) & (scalarProduct<=lineLength+eps))[0]
+            filtre = np.where((norm<eps) & (scalarProduct>=-eps) & (scalarProduct<=lineLength+eps))[0]
             # norm<eps : must be on the line formed by corner and next corner
             # scalarProduct>=-eps : points must belong to the line
             # scalarProduct<=lineLength+eps : points must belong to the line
 
             # sort the nodes along the lines and
             # remove the first and the last nodes with [1:-1]
-            nodes: np.ndarray = nodes[np.argsort(scalarProduct[nodes])][1:-1]
+            nodes: np.ndarray = idx[filtre[np.argsort(scalarProduct[filtre])]][1:-1]
 
             if c+1 > nEdges:
                 # reverses the nodes order
@@ -870,6 +1176,13 @@ def Calc_projector(oldMesh: Mesh, newMesh: Mesh) -> sp.csr_matrix:
     -------
     sp.csr_matrix
         projection matrix (newMesh.Nn, oldMesh.Nn)
+
+    Notes
+    -----
+    - A new node on an old node (same coordinates) takes the value of this old node.
+    The corners of the new mesh are linked in this way, so the corners must have the same coordinates in both meshes to be linked.\n
+    - A new node detected in several old elements (on a shared edge or face) is interpolated with the last detected element.\n
+    - A new node outside the old mesh takes the value of the closest old node.
     """
     assert oldMesh.dim == newMesh.dim, "Mesh dimensions must be the same."
 
@@ -889,77 +1202,69 @@ def Calc_projector(oldMesh: Mesh, newMesh: Mesh) -> sp.csr_matrix:
 
     tic.Tac("Mesh", "Mapping between meshes", False)
 
+    # flat (node, element) pairs
+    sizes = np.array([len(nodes) for nodes in connect_e_n], dtype=int)
+    nodes_p = np.asarray(detectedNodes, dtype=int)
+    elements_p = np.repeat(np.asarray(detectedElements_e, dtype=int), sizes)
+
+    # A node detected in several elements is interpolated with the last element, which is the one used for coordo_n.
+    # The fields are continuous between elements, so any element containing the node gives the same values.
+    last = nodes_p.size - 1 - np.unique(nodes_p[::-1], return_index=True)[1]
+    nodes, elements = nodes_p[last], elements_p[last]
+
     # Evaluation of shape functions
-    Ntild = oldMesh.groupElem._Ntild()        
     nPe = oldMesh.groupElem.nPe
-    phi_n_nPe = np.zeros((coordo_n.shape[0], nPe)) # functions evaluated at identified coordinates
-    for n in range(nPe):
-        # *coordo_n.T give a list for every direction *(xis, etas, ..)
-        phi_n_nPe[:,n] = Ntild[n,0](*coordo_n.T)
+    phi_n_nPe = oldMesh.groupElem._Evaluates_Polynomials("N", coordo_n[nodes])[:,0] # functions evaluated at identified coordinates
 
     # Check that the sum of the shape functions is 1  
-    testSum1 = (np.sum(phi_n_nPe) - phi_n_nPe.size)/phi_n_nPe.size <= 1e-12
+    testSum1 = (np.sum(phi_n_nPe) - phi_n_nPe.shape[0])/max(phi_n_nPe.size, 1) <= 1e-12
     assert testSum1
 
-    # Here we detect whether nodes appear more than once
-    #   I don't know how to modify this function because np.unique can take a long time.
-    counts = np.unique(detectedNodes, return_counts=True)[1]
-    nodesSup1 = np.where(counts > 1)[0]
-    # nodesSup1 are nodes that have been detected several times.
-    if nodesSup1.size > 0:
-        # divide the shape function values by the number of appearances.
-        # Its like doing an average on shapes functions
-        phi_n_nPe[nodesSup1] = np.einsum("ni,n->ni", phi_n_nPe[nodesSup1], 1/counts[nodesSup1], optimize="optimal")
+    # Here we'll impose the exact values of overlapping nodes (which have the same coordinate) on the nodes.
+    # nodesExact are nodes for which a shape function has detected 1 (nodes detected on an old mesh node).
+    isExact_n = np.any((phi_n_nPe >= 1-1e-12) & (phi_n_nPe <= 1+1e-12), axis=1)
+    # get back the corners to link nodes
+    newCorners = newMesh.Get_list_groupElem(0)[0].nodes
+    isCorner_n = np.isin(nodes, newCorners)
+
+    # coincident nodes are found with a single hashed lookup on the old coordinates
+    candidates = np.union1d(nodes[isExact_n | isCorner_n], newCorners)
+    oldCoord = oldMesh.coord
+    dict_oldNodes = {coord.tobytes(): node for node, coord in reversed(list(enumerate(oldCoord)))}
+    newCoord = newMesh.coord
+    oldNodes_c = np.array([dict_oldNodes.get(newCoord[node].tobytes(), -1) for node in candidates], dtype=int)
+
+    # nodes detected on an old node whose coordinates differ by rounding errors are linked with the element connectivity
+    isExact_c = np.isin(candidates, nodes[isExact_n])
+    idx = np.where(isExact_c & (oldNodes_c == -1))[0]
+    if idx.size > 0:
+        n = np.searchsorted(nodes, candidates[idx])
+        oldNodes_c[idx] = oldMesh.connect[elements[n], np.argmax(phi_n_nPe[n], axis=1)]
+
+    coincidentNodes = candidates[oldNodes_c >= 0]
+    oldNodes = oldNodes_c[oldNodes_c >= 0]
+
+    # nodes outside the old mesh are linked with the closest old node
+    undetectedNodes = np.setdiff1d(newMesh.nodes, np.union1d(nodes, coincidentNodes))
+    if undetectedNodes.size > 0:
+        Display.MyPrintError(f"Warning: {undetectedNodes.size} nodes have not been detected in the old mesh.\nThey take the values of the closest nodes.")
+        closestNodes = oldMesh.nodes[oldMesh._Get_kdTree().query(newMesh.coord[undetectedNodes])[1]]
+        coincidentNodes = np.concatenate((coincidentNodes, undetectedNodes))
+        oldNodes = np.concatenate((oldNodes, closestNodes))
 
     # Builds the projector
     # This projector is a hollow matrix of dimension (newMesh.Nn, oldMesh.Nn)
-    connect_e = oldMesh.connect
-    lines: list[int] = []
-    columns: list[int] = []
-    values: list[float] = []
-    def FuncExtend_Proj(element: int, nodes: np.ndarray):
-        values.extend(np.ravel(phi_n_nPe[nodes]))
-        lines.extend(np.repeat(nodes, nPe))
-        columns.extend(np.asarray(list(connect_e[element]) * nodes.size))
-
-    [FuncExtend_Proj(element, connect) for element, connect in zip(detectedElements_e, connect_e_n)]
+    interpolated = ~np.isin(nodes, coincidentNodes)
+    lines = np.concatenate((np.repeat(nodes[interpolated], nPe), coincidentNodes))
+    columns = np.concatenate((oldMesh.connect[elements[interpolated]].ravel(), oldNodes))
+    values = np.concatenate((phi_n_nPe[interpolated].ravel(), np.ones(coincidentNodes.size)))
 
     proj = sp.csr_matrix((values, (lines, columns)), (newMesh.Nn, oldMesh.Nn), dtype=float)
-
-    # Here we'll impose the exact values of overlapping nodes (which have the same coordinate) on the nodes.
-    proj = proj.tolil()
-    
-    # get back the corners to link nodes
-    # here we assume that the points are identical
-    newCorners = newMesh.Get_list_groupElem(0)[0].nodes
-    oldCorners = oldMesh.Get_list_groupElem(0)[0].nodes
-    # link nodes
-    for newNode, oldNode in zip(newCorners, oldCorners):
-        proj[newNode,:] = 0
-        proj[newNode, oldNode] = 1
-
-    nodesExact = np.where((phi_n_nPe >= 1-1e-12) & (phi_n_nPe <= 1+1e-12))[0]
-    # nodesExact nodes exact are nodes for which a shape function has detected 1.
-    #   (nodes detected in an mesh corner).
-
-    nodesExact = list(set(nodesExact) - set(newCorners))
-    for node in nodesExact:
-        oldNode = oldMesh.Nodes_Point(Point(*newMesh.coord[node]))
-        if oldNode.size == 0: continue
-        proj[node,:] = 0
-        proj[node, oldNode] = 1
-
-    # from EasyFEA import Display
-    # dim = oldMesh.dim
-    # ax = Display.Plot_Mesh(oldMesh)
-    # ax.scatter(*newMesh.coordo[nodesSup1,:dim].T,label='sup1')
-    # ax.scatter(*newMesh.coordo[newCorners,:dim].T,label='corners')
-    # ax.scatter(*newMesh.coordo[nodesExact,:dim].T,label='exact')
-    # ax.legend()
+    proj.eliminate_zeros()
 
     tic.Tac("Mesh", "Projector construction", False)
 
-    return proj.tocsr()
+    return proj
 
 def Mesh_Optim(DoMesh: Callable[[str], Mesh], folder: str, criteria:str='aspect', quality=.8, ratio: float=0.7, iterMax=20, coef:float=1/2) -> tuple[Mesh, float]:
     """Optimize the mesh using the given criterion.
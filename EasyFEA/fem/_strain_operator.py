@@ -0,0 +1,205 @@
+# Copyright (C) 2021-2024 Université Gustave Eiffel.
+# This file is part of the EasyFEA project.
+# EasyFEA is distributed under the terms of the GNU General Public License v3 or later, see LICENSE.txt and CREDITS.md for more information.
+
+"""Module containing the StrainOperator class used to compute strains from displacements without building the B_e_pg matrices."""
+
+import numpy as np
+
+# utilities
+from ..utilities import Numba_Interface
+
+class StrainOperator:
+
+    def __init__(self, dN_e_pg: np.ndarray, wJ_e_pg: np.ndarray):
+        """Creates a compact representation of the B_e_pg matrices used to calculate deformations from displacements.\n
+        WARNING: Use Kelvin Mandel Notation\n
+        2D : [Exx Eyy sqrt(2)*Exy]\n
+        3D : [Exx Eyy Ezz sqrt(2)*Eyz sqrt(2)*Exz sqrt(2)*Exy]\n
+        Only dN_e_pg and wJ_e_pg are stored. The dense B_e_pg (e, pg, (3 or 6), nPe*dim) matrices are mostly zeros and are never built.
+
+        Parameters
+        ----------
+        dN_e_pg : np.ndarray
+            shape functions derivatives in (x,y,z) coordinates (e, pg, dim, nPe)\n
+            or (e, 1, dim, nPe) for constant strain elements (TRI3, TETRA4), the strains are then computed on a single integration point.
+        wJ_e_pg : np.ndarray
+            jacobian_e_pg * weight_pg (e, pg)
+        """
+
+        assert dN_e_pg.ndim == 4, "dN_e_pg must be a (e, pg, dim, nPe) array."
+        assert dN_e_pg.shape[2] in [2, 3], "dN_e_pg must be computed in 2D or 3D."
+        assert wJ_e_pg.ndim == 2 and wJ_e_pg.shape[0] == dN_e_pg.shape[0], "wJ_e_pg must be a (e, pg) array."
+        assert dN_e_pg.shape[1] in [1, wJ_e_pg.shape[1]], "dN_e_pg must be given on 1 or pg integration points."
+
+        self.__dN_e_pg = dN_e_pg
+        self.__wJ_e_pg = wJ_e_pg
+        self.__op = StrainOperator.Get_operator(dN_e_pg.shape[2])
+
+    @property
+    def dN_e_pg(self) -> np.ndarray:
+        """shape functions derivatives in (x,y,z) coordinates (e, pg, dim, nPe)"""
+        return self.__dN_e_pg
+
+    @property
+    def wJ_e_pg(self) -> np.ndarray:
+        """jacobian_e_pg * weight_pg (e, pg)"""
+        return self.__wJ_e_pg
+
+    @property
+    def Ne(self) -> int:
+        """number of elements"""
+        return self.__dN_e_pg.shape[0]
+
+    @property
+    def nPg(self) -> int:
+        """number of integration points"""
+        return self.__wJ_e_pg.shape[1]
+
+    @property
+    def isConstant(self) -> bool:
+        """the strains are constant in each element (dN_e_pg is given on a single integration point)"""
+        return self.__dN_e_pg.shape[1] == 1 and self.nPg > 1
+
+    @property
+    def dim(self) -> int:
+        """dimension of the displacement field"""
+        return self.__dN_e_pg.shape[2]
+
+    @property
+    def nPe(self) -> int:
+        """nodes per element"""
+        return self.__dN_e_pg.shape[3]
+
+    @property
+    def nC(self) -> int:
+        """number of strain components (3 or 6)"""
+        return self.__op.shape[0]
+
+    @property
+    def ndof_e(self) -> int:
+        """dofs per element (nPe*dim)"""
+        return self.nPe * self.dim
+
+    @staticmethod
+    def Get_operator(dim: int) -> np.ndarray:
+        """Returns the operator (c, i, j) computing the strain from the displacement gradient du_i/dx_j.\n
+        2D : [Exx Eyy sqrt(2)*Exy]\n
+        3D : [Exx Eyy Ezz sqrt(2)*Eyz sqrt(2)*Exz sqrt(2)*Exy]"""
+
+        cM = 1/np.sqrt(2)
+
+        if dim == 2:
+            indexes = [[(0,0)], [(1,1)], [(0,1),(1,0)]]
+        else:
+            indexes = [[(0,0)], [(1,1)], [(2,2)], [(1,2),(2,1)], [(0,2),(2,0)], [(0,1),(1,0)]]
+
+        op = np.zeros((len(indexes), dim, dim))
+        for c, ij in enumerate(indexes):
+            for i, j in ij:
+                op[c,i,j] = 1 if len(ij) == 1 else cM
+
+        return op
+
+    def apply(self, u_e: np.ndarray) -> np.ndarray:
+        """Computes the strain field Epsilon_e_pg = B_e_pg * u_e.
+
+        Parameters
+        ----------
+        u_e : np.ndarray
+            displacement of the elements nodes (e, nPe*dim)
+
+        Returns
+        -------
+        np.ndarray
+            Epsilon_e_pg (e, pg, (3 or 6))
+        """
+
+        u_e = np.asarray(u_e).reshape(self.Ne, self.nPe, self.dim)
+        grad_e_pg = np.einsum('epjn,eni->epij', self.__dN_e_pg, u_e, optimize='optimal')
+        Epsilon_e_pg = np.einsum('cij,epij->epc', self.__op, grad_e_pg, optimize='optimal')
+
+        if self.isConstant:
+            Epsilon_e_pg = np.repeat(Epsilon_e_pg, self.nPg, axis=1)
+
+        return Epsilon_e_pg
+
+    def applyT(self, Sigma_e_pg: np.ndarray) -> np.ndarray:
+        """Computes the elementary vectors f_e = sum_p wJ_e_pg * B_e_pg' * Sigma_e_pg.
+
+        Parameters
+        ----------
+        Sigma_e_pg : np.ndarray
+            stress field (e, pg, (3 or 6))
+
+        Returns
+        -------
+        np.ndarray
+            f_e (e, nPe*dim)
+        """
+
+        wJ_e_pg = self.__wJ_e_pg
+        if self.isConstant:
+            # sum_p wJ_p B' Sigma_p = B' sum_p wJ_p Sigma_p
+            Sigma_e_pg = np.einsum('epc,ep->ec', Sigma_e_pg, wJ_e_pg, optimize='optimal')[:,np.newaxis]
+            wJ_e_pg = np.ones((self.Ne, 1))
+
+        T_e_pg = np.einsum('cij,epc,ep->epij', self.__op, Sigma_e_pg, wJ_e_pg, optimize='optimal')
+        f_e = np.einsum('epjn,epij->eni', self.__dN_e_pg, T_e_pg, optimize='optimal')
+
+        return f_e.reshape(self.Ne, -1)
+
+    def stiffness(self, c: np.ndarray, useNumba=False) -> np.ndarray:
+        """Computes the elementary stiffness matrices Ku_e = sum_p wJ_e_pg * B_e_pg' * c * B_e_pg.
+
+        Parameters
+        ----------
+        c : np.ndarray
+            stiffness matrix in Kelvin Mandel notation\n
+            homogeneous (c, c) or heterogeneous (e, c, c), (e, 1, c, c), (1, p, c, c) or (e, p, c, c)
+        useNumba : bool, optional
+            computes Ku_e element by element with numba, by default False
+
+        Returns
+        -------
+        np.ndarray
+            Ku_e (e, nPe*dim, nPe*dim)
+        """
+
+        nC = self.nC
+        assert c.shape[-2:] == (nC, nC), f"c must be a ({nC}, {nC}) matrix."
+        if c.ndim == 3:
+            c = c[:,np.newaxis]
+
+        wJ_e_pg = self.__wJ_e_pg
+        if self.isConstant:
+            # sum_p wJ_p B' c_p B = B' (sum_p wJ_p c_p) B
+            if c.ndim == 2 or c.shape[1] == 1:
+                wJ_e_pg = np.sum(wJ_e_pg, axis=1, keepdims=True)
+            else:
+                c = np.sum(c * wJ_e_pg[:,:,np.newaxis,np.newaxis], axis=1, keepdims=True)
+                wJ_e_pg = np.ones((self.Ne, 1))
+
+        if useNumba:
+            return Numba_Interface.Get_Ku_e(self.__dN_e_pg, wJ_e_pg, c)
+
+        # the B matrices are only built for the computation and are not stored
+        # the sum over the integration points is done in the matrix product (e, i, p*c) @ (e, p*c, j)
+        B_e_pg = self.__Get_B_e_pg()
+        cB_e_pg = (c @ B_e_pg) * wJ_e_pg[:,:,np.newaxis,np.newaxis]
+        Ne, ndof_e = self.Ne, self.ndof_e
+        Ku_e = B_e_pg.reshape(Ne, -1, ndof_e).transpose(0,2,1) @ cB_e_pg.reshape(Ne, -1, ndof_e)
+
+        return Ku_e
+
+    def __Get_B_e_pg(self) -> np.ndarray:
+        """Builds the B matrices on the integration points of dN_e_pg (e, 1 or pg, (3 or 6), nPe*dim)."""
+        B_e_pg = np.einsum('cij,epjn->epcni', self.__op, self.__dN_e_pg, optimize='optimal')
+        return B_e_pg.reshape(self.Ne, self.__dN_e_pg.shape[1], self.nC, -1)
+
+    def Get_B_e_pg(self) -> np.ndarray:
+        """Builds the dense B matrices (e, pg, (3 or 6), nPe*dim)."""
+        B_e_pg = self.__Get_B_e_pg()
+        if self.isConstant:
+            B_e_pg = np.repeat(B_e_pg, self.nPg, axis=1)
+        return B_e_pg
@@ -32,6 +32,10 @@ class TETRA4(_GroupElem):
 
         super().__init__(gmshId, connect, coordoGlob, nodes)
 
+    @property
+    def isConstantStrain(self) -> bool:
+        return True
+
     @property
     def origin(self) -> list[int]:
         return super().origin
@@ -24,6 +24,10 @@ class TRI3(_GroupElem):
 
         super().__init__(gmshId, connect, coordoGlob, nodes)
 
+    @property
+    def isConstantStrain(self) -> bool:
+        return True
+
     @property
     def origin(self) -> list[int]:
         return super().origin
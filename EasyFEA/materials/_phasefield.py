@@ -409,7 +409,7 @@ class PhaseField(_IModel):
         c_e_pg = Reshape_variable(c, Ne, nPg)
 
         cP_e_pg = c_e_pg
-        cM_e_pg = np.zeros_like(cP_e_pg)
+        cM_e_pg = np.broadcast_to(np.zeros(c.shape[-2:]), c_e_pg.shape)
         tic.Tac("Split",f"cP_e_pg and cM_e_pg", False)
 
         return cP_e_pg, cM_e_pg
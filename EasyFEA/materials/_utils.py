@@ -94,20 +94,20 @@ class _IModel(ABC, Observable):
 __erroDim = "Pay attention to the dimensions of the material constants.\nIf the material constants are in arrays, these arrays must have the same dimension."
 
 def Reshape_variable(variable: Union[int,float,np.ndarray], Ne: int, nPg: int):
-    """Resizes variable to (Ne, nPg) shape."""
+    """Resizes variable to (Ne, nPg) shape.\n
+    The repeated dimensions are broadcasted without copying the data.\n
+    WARNING: the returned array is a read-only view if the variable is repeated along e or p."""
 
     if isinstance(variable, (int,float)):
-        return np.ones((Ne, nPg)) * variable
+        return np.broadcast_to(float(variable), (Ne, nPg))
     
     elif isinstance(variable, np.ndarray):
         shape = variable.shape
         if len(shape) == 1:
             if shape[0] == Ne:
-                variable = variable[:,np.newaxis].repeat(nPg, axis=1)
-                return variable
+                return np.broadcast_to(variable[:,np.newaxis], (Ne, nPg))
             elif shape[0] == nPg:
-                variable = variable[np.newaxis].repeat(Ne, axis=0)
-                return variable
+                return np.broadcast_to(variable[np.newaxis], (Ne, nPg))
             else:
                 raise Exception("The variable entered must be of dimension (e) or (p)")
 
@@ -115,21 +115,19 @@ def Reshape_variable(variable: Union[int,float,np.ndarray], Ne: int, nPg: int):
             if shape == (Ne, nPg):
                 return variable
             else:
-                variable = variable[np.newaxis, np.newaxis]
-                variable = variable.repeat(Ne, axis=0)
-                variable = variable.repeat(nPg, axis=1)
-                return variable
+                return np.broadcast_to(variable[np.newaxis, np.newaxis], (Ne, nPg, *shape))
             
         elif len(shape) == 3:
             if shape[0] == Ne:
-                variable = variable[:, np.newaxis].repeat(nPg, axis=1)
-                return variable
+                return np.broadcast_to(variable[:, np.newaxis], (Ne, nPg, *shape[1:]))
             elif shape[0] == nPg:
-                variable = variable[np.newaxis].repeat(Ne, axis=0)
-                return variable
+                return np.broadcast_to(variable[np.newaxis], (Ne, nPg, *shape[1:]))
             else:
                 raise Exception("The variable entered must be of dimension (eij) or (pij)")
 
+        elif len(shape) == 4 and shape[:2] == (Ne, nPg):
+            return variable
+
 def Heterogeneous_Array(array: np.ndarray):
     """Builds a heterogeneous array."""
 
@@ -6,6 +6,7 @@
 
 import sys
 from enum import Enum
+from typing import Callable
 import numpy as np
 import scipy.sparse as sparse
 import scipy.optimize as optimize
@@ -15,7 +16,11 @@ import scipy.sparse.linalg as sla
 # utilities
 from ..utilities import Tic
 # fem
-from ..fem import LagrangeCondition
+from ..fem import LagrangeCondition, BoundaryCondition
+# materials
+from ..materials import ModelType
+# simu
+from ._amg import _SmoothedAggregation, _Get_rigid_body_modes
 
 try:
     import pypardiso
@@ -24,7 +29,7 @@ except ModuleNotFoundError:
     __canUsePypardiso = False
 
 try:
-    from sksparse.cholmod import cholesky, cholesky_AAt
+    from sksparse.cholmod import cholesky, cholesky_AAt, analyze, CholmodNotPositiveDefiniteError
     __canUseCholesky = True
 except ModuleNotFoundError:
     __canUseCholesky = False
@@ -43,12 +48,13 @@ except ModuleNotFoundError:
     __canUseMumps = False
 
 try:
-    import petsc4py    
+    import petsc4py
+    # must be called once before importing PETSc
+    petsc4py.init(sys.argv)
     from petsc4py import PETSc    
     from mpi4py import MPI
     
     __canUsePetsc = True
-    __pc_default = 'ilu'
 
 except ModuleNotFoundError:
     __canUsePetsc = False
@@ -78,24 +84,227 @@ class ResolType(str, Enum):
 def _Available_Solvers():
     """Available solvers."""
 
-    solvers = ["scipy", "BoundConstrain", "cg", "bicg", "gmres", "lgmres"]
+    solvers = ["scipy", "BoundConstrain", "cg", "cg-amg", "bicg", "gmres", "lgmres"]
     
     if __canUsePypardiso: solvers.insert(0, "pypardiso")
     if __canUsePetsc: solvers.insert(1, "petsc")
     if __canUseMumps: solvers.insert(2, "mumps")
     if __canUseUmfpack: solvers.insert(3, "umfpack")
+    if __canUseCholesky: solvers.insert(4, "cholmod")
 
     return solvers
 
+class _Factorizations:
+    """Factorizations of the matrix systems solved by a simulation.\n
+    A factorization is stored for each problem type and reused as long as the matrix version, the operator key (solver, algorithm parameters, ...) and the unknown dofs remain unchanged.\n
+    The matrix version of a problem type must be incremented (see `Update()`) each time its matrices are modified."""
+
+    def __init__(self) -> None:
+        self.__versions: dict[str, int] = {}
+        """matrix version for each problem type"""
+        self.__entries: dict[str, tuple] = {}
+        """(version, key, dofsUnknown, facto) for each problem type"""
+        self.__preconditioners: dict[str, tuple] = {}
+        """(dofsUnknown, preconditioner) for each problem type"""
+        self.__cholmodFactors: dict[str, tuple] = {}
+        """(dofsUnknown, indptr, indices, factor) for each problem type"""
+        self.__partitions: dict[str, _Partition] = {}
+        """extraction of Aii and Aic for each problem type"""
+        self.__petscContexts: dict[str, _PETScContext] = {}
+        """PETSc objects for each problem type"""
+        self.__hits = 0
+        self.__misses = 0
+
+    def Version(self, problemType: str) -> int:
+        """Returns the matrix version associated with the problem type."""
+        return self.__versions.get(problemType, 0)
+
+    def Update(self, problemType: str=None) -> None:
+        """Increments the matrix version and removes the stored factorization.\n
+        If problemType is None, all problem types are updated."""
+        if problemType is None:
+            problemTypes = list(self.__versions.keys())
+            self.__entries.clear()
+        else:
+            problemTypes = [problemType]
+            self.__entries.pop(problemType, None)
+        for problemType in problemTypes:
+            self.__versions[problemType] = self.Version(problemType) + 1
+
+    def Get(self, problemType: str, key: tuple, dofsUnknown: np.ndarray):
+        """Returns the stored factorization or None if it cannot be reused."""
+        self.__versions.setdefault(problemType, 0)
+        entry = self.__entries.get(problemType, None)
+        if entry is not None:
+            version, entryKey, entryDofs, facto = entry
+            if version == self.Version(problemType) and entryKey == key and np.array_equal(entryDofs, dofsUnknown):
+                self.__hits += 1
+                return facto
+        self.__misses += 1
+        return None
+
+    def Set(self, problemType: str, key: tuple, dofsUnknown: np.ndarray, facto) -> None:
+        """Stores the factorization for the current matrix version."""
+        self.__entries[problemType] = (self.Version(problemType), key, np.asarray(dofsUnknown).copy(), facto)
+
+    def Get_preconditioner(self, problemType: str, dofsUnknown: np.ndarray):
+        """Returns the stored preconditioner or None if it was built for other unknown dofs.\n
+        Unlike the factorizations, the preconditioners are kept when the matrix version changes, so that the parts depending on the sparsity pattern can be reused."""
+        entry = self.__preconditioners.get(problemType, None)
+        if entry is not None and np.array_equal(entry[0], dofsUnknown):
+            return entry[1]
+        return None
+
+    def Set_preconditioner(self, problemType: str, dofsUnknown: np.ndarray, preconditioner) -> None:
+        """Stores the preconditioner built for the unknown dofs."""
+        self.__preconditioners[problemType] = (np.asarray(dofsUnknown).copy(), preconditioner)
+
+    def Get_cholmod_factor(self, problemType: str, dofsUnknown: np.ndarray, A: sparse.csr_matrix):
+        """Returns the stored cholmod factor or None if it was analyzed for other unknown dofs or another sparsity pattern.\n
+        Like the preconditioners, the factors are kept when the matrix version changes, so that the symbolic analysis can be reused."""
+        entry = self.__cholmodFactors.get(problemType, None)
+        if entry is not None:
+            entryDofs, indptr, indices, factor = entry
+            if np.array_equal(entryDofs, dofsUnknown) and np.array_equal(indptr, A.indptr) and np.array_equal(indices, A.indices):
+                return factor
+        return None
+
+    def Set_cholmod_factor(self, problemType: str, dofsUnknown: np.ndarray, A: sparse.csr_matrix, factor) -> None:
+        """Stores the cholmod factor analyzed for the unknown dofs and the sparsity pattern of A."""
+        self.__cholmodFactors[problemType] = (np.asarray(dofsUnknown).copy(), A.indptr.copy(), A.indices.copy(), factor)
+
+    def Get_partition(self, problemType: str) -> '_Partition':
+        """Returns the stored partition of the matrix system or None."""
+        return self.__partitions.get(problemType, None)
+
+    def Set_partition(self, problemType: str, partition: '_Partition') -> None:
+        """Stores the partition of the matrix system."""
+        self.__partitions[problemType] = partition
+
+    def Get_PETSc_context(self, problemType: str) -> '_PETScContext':
+        """Returns the PETSc context of the problem type (created if needed).\n
+        Like the preconditioners, the contexts are kept when the matrix version changes."""
+        if problemType not in self.__petscContexts:
+            self.__petscContexts[problemType] = _PETScContext()
+        return self.__petscContexts[problemType]
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """number of hits and misses"""
+        return {"hits": self.__hits, "misses": self.__misses}
+
+    def __getstate__(self) -> dict:
+        # SuperLU, pypardiso and PETSc objects cannot be pickled
+        state = self.__dict__.copy()
+        state["_Factorizations__entries"] = {}
+        state["_Factorizations__preconditioners"] = {}
+        state["_Factorizations__cholmodFactors"] = {}
+        state["_Factorizations__petscContexts"] = {}
+        return state
+
+class _Partition:
+    """Extraction of Aii = A[unknown, unknown] and Aic = A[unknown, known] from a csr matrix A.\n
+    The positions of the Aii and Aic values in A.data are computed once so that the submatrices of a matrix with the same sparsity pattern are extracted with a gather.\n
+    If isUpper, only the upper triangle of A is stored and Aic also gathers the values of A[known, unknown]'."""
+
+    def __init__(self, A: sparse.csr_matrix, dofsKnown: np.ndarray, dofsUnknown: np.ndarray, isUpper=False) -> None:
+
+        A = sparse.csr_matrix(A)
+        Ndof = A.shape[0]
+        nKnown, nUnknown = len(dofsKnown), len(dofsUnknown)
+
+        self.__shape = A.shape
+        self.__indptr = A.indptr.copy()
+        self.__indices = A.indices.copy()
+        self.__dofsKnown = dofsKnown
+        self.__dofsUnknown = dofsUnknown
+        self.__isUpper = isUpper
+
+        # local indexes in the known and unknown dofs
+        localIndexes = np.empty(Ndof, dtype=int)
+        localIndexes[dofsUnknown] = np.arange(nUnknown)
+        localIndexes[dofsKnown] = np.arange(nKnown)
+        isUnknown = np.zeros(Ndof, dtype=bool)
+        isUnknown[dofsUnknown] = True
+
+        rows, positions = self.__Get_positions(A.indptr, dofsUnknown)
+        columns = A.indices[positions]
+        ii = isUnknown[columns]
+        ic = ~ii
+
+        self.__ii = self.__Get_csr_arrays(rows[ii], localIndexes[columns[ii]], positions[ii], nUnknown, A.indices.dtype)
+
+        rows_ic, columns_ic, positions_ic = rows[ic], localIndexes[columns[ic]], positions[ic]
+        if isUpper:
+            # values of A[known, unknown] stored in the upper triangle
+            rows_c, positions_c = self.__Get_positions(A.indptr, dofsKnown)
+            columns_c = A.indices[positions_c]
+            ci = isUnknown[columns_c]
+            rows_ic = np.concatenate([rows_ic, localIndexes[columns_c[ci]]])
+            columns_ic = np.concatenate([columns_ic, rows_c[ci]])
+            positions_ic = np.concatenate([positions_ic, positions_c[ci]])
+            order = np.lexsort((columns_ic, rows_ic))
+            rows_ic, columns_ic, positions_ic = rows_ic[order], columns_ic[order], positions_ic[order]
+
+        self.__ic = self.__Get_csr_arrays(rows_ic, columns_ic, positions_ic, nUnknown, A.indices.dtype)
+
+    @staticmethod
+    def __Get_positions(indptr: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the local row and the position in A.data of the values stored in the rows."""
+        starts = indptr[rows]
+        counts = indptr[rows+1] - starts
+        offsets = np.cumsum(counts) - counts
+        localRows = np.repeat(np.arange(rows.size), counts)
+        positions = np.arange(counts.sum()) + np.repeat(starts - offsets, counts)
+        return localRows, positions
+
+    @staticmethod
+    def __Get_csr_arrays(rows: np.ndarray, columns: np.ndarray, positions: np.ndarray, Nrows: int, dtype: np.dtype) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns (positions, indices, indptr) of a csr matrix whose rows are sorted."""
+        indptr = np.zeros(Nrows+1, dtype=dtype)
+        np.cumsum(np.bincount(rows, minlength=Nrows), out=indptr[1:])
+        return positions, columns.astype(dtype), indptr
+
+    def Is_valid(self, A: sparse.csr_matrix, dofsKnown: np.ndarray, dofsUnknown: np.ndarray, isUpper=False) -> bool:
+        """Checks whether the partition can be used to extract Aii and Aic from A."""
+        return A.shape == self.__shape and isUpper == self.__isUpper \
+            and (dofsKnown is self.__dofsKnown or np.array_equal(dofsKnown, self.__dofsKnown)) \
+            and (dofsUnknown is self.__dofsUnknown or np.array_equal(dofsUnknown, self.__dofsUnknown)) \
+            and np.array_equal(A.indptr, self.__indptr) and np.array_equal(A.indices, self.__indices)
+
+    def Get_Aii_Aic(self, A: sparse.csr_matrix) -> tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        """Returns Aii and Aic by gathering the values of A.data."""
+        nKnown, nUnknown = len(self.__dofsKnown), len(self.__dofsUnknown)
+        positions, indices, indptr = self.__ii
+        Aii = sparse.csr_matrix((A.data[positions], indices, indptr), shape=(nUnknown, nUnknown))
+        positions, indices, indptr = self.__ic
+        Aic = sparse.csr_matrix((A.data[positions], indices, indptr), shape=(nUnknown, nKnown))
+        return Aii, Aic
+
+def _Get_full_matrix(A: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Returns the full symmetric matrix from its upper triangle."""
+    return (A + sparse.triu(A, 1, format='csr').T).tocsr()
+
+def _Dot(A: sparse.csr_matrix, x, isUpper: bool):
+    """Computes A @ x.\n
+    If isUpper, only the upper triangle of the symmetric matrix A is stored and A @ x = U @ x + U' @ x - D @ x."""
+    if isUpper:
+        return A @ x + A.T @ x - sparse.diags(A.diagonal()) @ x
+    else:
+        return A @ x
+
 def __Cast_Simu(simu):
     """casts the simu as a Simulations.Simu"""
     from ._simu import _Simu
     if isinstance(simu, _Simu):
         return simu
 
+__iterativeSolvers = ["cg", "bicg", "gmres", "lgmres"]
+
 def _Solve_Axb(simu, problemType: str,
                A: sparse.csr_matrix, b: sparse.csr_matrix,
-               x0: np.ndarray, lb: np.ndarray, ub: np.ndarray) -> np.ndarray:
+               x0: np.ndarray, lb: np.ndarray, ub: np.ndarray,
+               dofsUnknown: np.ndarray=None, M: sla.LinearOperator=None, isUpper=False, isSymmetric: bool=None) -> np.ndarray:
     """Solves the linear system A x = b
 
     Parameters
@@ -105,25 +314,38 @@ def _Solve_Axb(simu, problemType: str,
     problemType : ModelType
         Specify the problemType because a simulation can have several physcal models (such as a damage simulation).
     A : sparse.csr_matrix
-        matrix A
+        matrix A\n
+        A can also be a sla.LinearOperator if an iterative solver is used (cg, bicg, gmres, lgmres).
     b : sparse.csr_matrix
-        vector b
+        vector b (N, 1) or several right-hand sides (N, Nrhs)
     x0 : np.ndarray
         initial solution for iterative solvers
     lb : np.ndarray
         lowerBoundary of the solution
     ub : np.ndarray
         upperBoundary of the solution
+    dofsUnknown : np.ndarray, optional
+        unknown dofs used to extract A, by default None\n
+        If given, the factorization of A is stored in the simulation and reused as long as the matrices and the unknown dofs remain unchanged.
+    M : sla.LinearOperator, optional
+        preconditioner used by the iterative solvers, by default None
+    isUpper : bool, optional
+        only the upper triangle of the symmetric positive definite matrix A is stored, by default False\n
+        pypardiso (mtype=2) and petsc (SBAIJ) use the upper triangle, the full matrix is rebuilt for the other solvers.
+    isSymmetric : bool, optional
+        A is symmetric, by default None\n
+        If None, the symmetry declared by the simulation is used (see `simu.Is_symmetric()`).
 
     Returns
     -------
     np.ndarray
-        comuted x solution of A x = b
+        comuted x solution of A x = b (N) or (N, Nrhs)
     """
 
     # checks types
     simu = __Cast_Simu(simu)
-    assert isinstance(A, sparse.csr_matrix)
+    isOperator = isinstance(A, sla.LinearOperator)
+    assert isinstance(A, sparse.csr_matrix) or isOperator
     assert isinstance(b, sparse.csr_matrix)
 
     # Choose the solver
@@ -140,26 +362,62 @@ def _Solve_Axb(simu, problemType: str,
     # plt.figure()
     # plt.spy(A, marker='.')
 
-    if not A.has_canonical_format:
-        # Using sla.norm(A) ensures that A has a cononic format. 
-        # Canonical Format means:
-        # - Within each row, indices are sorted by column.
-        # - There are no duplicate entries.
-        sla.norm(A)
+    if isOperator:
+        assert simu.solver in __iterativeSolvers and solver == simu.solver, f"A linear operator can only be solved with {__iterativeSolvers}."
+    else:
+        # int32 or int64 indices (see simu.useInt32Matrices)
+        # A is not modified, the indices are converted in a shallow copy
+        A = simu._Set_index_dtype(A)
+        if not A.has_canonical_format:
+            # Using sla.norm(A) ensures that A has a cononic format. 
+            # Canonical Format means:
+            # - Within each row, indices are sorted by column.
+            # - There are no duplicate entries.
+            sla.norm(A)
 
     solver = __Check_solverLibrary(solver)
 
+    # declared by the simulation (never computed)
+    isSymmetric, isDefinite = __Get_Matrix_Properties(simu, problemType, isSymmetric)
+
+    if solver == "cholmod" and not (isDefinite and simu.Is_symmetric(problemType)):
+        # the cholesky factorization requires a symmetric positive definite matrix
+        # the symmetry must be declared for the problem type (e.g. not for the mixed splits of the phase field)
+        solver = "scipy"
+
+    if isUpper and (solver not in ["pypardiso", "petsc"] or not isDefinite):
+        # the solver needs the full matrix
+        A = _Get_full_matrix(A)
+        isUpper = False
+
+    if b.shape[1] > 1 and solver not in ["pypardiso", "scipy", "cholmod"]:
+        # the solver cannot handle several right-hand sides at once
+        x = [_Solve_Axb(simu, problemType, A, b[:,i], x0, lb, ub, dofsUnknown, isUpper=isUpper, isSymmetric=isSymmetric) for i in range(b.shape[1])]
+        return np.asarray(x).T
+
     tic = Tic()
 
+    # get the stored factorization
+    factorizations = simu._factorizations
+    useFacto = dofsUnknown is not None and solver in ["pypardiso", "petsc", "scipy", "cg-amg", "cholmod"]
+    if useFacto:
+        key = __Get_Operator_Key(simu, solver, A)
+        facto = factorizations.Get(problemType, key, dofsUnknown)
+    else:
+        facto = None
+
     sla.use_solver(useUmfpack=__canUseUmfpack)
     
     if solver == "pypardiso":
-        x = pypardiso.spsolve(A, b.toarray())
+        if facto is None:
+            # real and symmetric positive definite (2) or real and nonsymmetric (11) matrix
+            facto = pypardiso.PyPardisoSolver(mtype=2 if isUpper else 11)
+            facto.factorize(A)
+        x = facto.solve(A, b.toarray())
 
     elif solver == "petsc":
-        global __pc_default
         # TODO find the best for damage problem
-        kspType = 'cg'
+        kspType = 'cg' if isDefinite else 'gmres'
         
         if simu.problemType == 'damage':
             if problemType == 'damage':
@@ -169,40 +427,64 @@ def _Solve_Axb(simu, problemType: str,
                 # ilu decomposition doesn't seem to work for the displacement problem in a damage simulation
                 
         else:
-            pcType = __pc_default # 'ilu' by default
+            pcType = 'ilu'
             # if mesh.dim = 3, errors may occurs if we use ilu
             # works faster on 2D and 3D
 
-        x, option, converg = _PETSc(A, b, x0, kspType, pcType)
+        if isUpper and pcType == 'ilu':
+            # ilu is not available for SBAIJ matrices
+            pcType = 'icc'
+
+        if facto is None:
+            # the values of A are updated in the matrix stored by the simulation
+            facto = simu._factorizations.Get_PETSc_context(problemType)
+            facto.Set_operator(A, kspType, pcType, isUpper)
+
+        x, option, converg = facto.Solve(b, x0)
 
-        if not converg:
-            print(f'\nWarning petsc did not converge with ksp:{kspType} and pc:{pcType} !')
-            print(f'Try out with  ksp:{kspType} and pc:none.\n')
-            __pc_default = 'none'
-            x, option, converg = _PETSc(A, b, x0, kspType, 'none')
-            assert converg, 'petsc didnt converge 2 times. check for kspType and pcType'
+        if not converg and facto.pcType != 'none':
+            print(f'\nWarning petsc did not converge with ksp:{facto.kspType} and pc:{facto.pcType} !')
+            print(f'Try out with  ksp:{facto.kspType} and pc:none for the {problemType} problem of this simulation.\n')
+            facto.Set_fallback('none')
+            x, option, converg = facto.Solve(b, x0)
+
+        assert converg, 'petsc didnt converge 2 times. check for kspType and pcType'
 
         solver += option
     
     elif solver == "scipy":
-        testSymetric = sla.norm(A-A.transpose())/sla.norm(A)
-        A_isSymetric = testSymetric <= 1e-12
-        x = _ScipyLinearDirect(A, b, A_isSymetric)
+        if facto is None:
+            x, facto = _ScipyLinearDirect(A, b, isSymmetric, isDefinite)
+        else:
+            x = facto.solve(b.toarray())
     
+    elif solver == "cholmod":
+        if facto is None:
+            facto = __Get_Cholmod(simu, problemType, A, dofsUnknown)
+        x = facto(b.toarray())
+
     elif solver == "BoundConstrain":
         x = _BoundConstrain(A, b , lb, ub)
 
     elif solver == "cg":
-        x, output = sla.cg(A, b.toarray(), x0, maxiter=None)
+        x, output = sla.cg(A, b.toarray(), x0, rtol=1e-10, maxiter=None, M=M)
+        assert output == 0, f"cg did not converge ({output} iterations)."
+
+    elif solver == "cg-amg":
+        if facto is None:
+            facto = __Get_AMG(simu, problemType, A, dofsUnknown)
+        x0 = x0 if len(x0) == A.shape[0] else None
+        x, output = sla.cg(A, b.toarray().ravel(), x0, rtol=1e-10, M=facto.Get_operator())
+        assert output == 0, f"cg-amg did not converge ({output} iterations)."
 
     elif solver == "bicg":
-        x, output = sla.bicg(A, b.toarray(), x0, maxiter=None)
+        x, output = sla.bicg(A, b.toarray(), x0, maxiter=None, M=M)
 
     elif solver == "gmres":
-        x, output = sla.gmres(A, b.toarray(), x0, maxiter=None)
+        x, output = sla.gmres(A, b.toarray(), x0, maxiter=None, M=M)
 
     elif solver == "lgmres":
-        x, output = sla.lgmres(A, b.toarray(), x0, maxiter=None)
+        x, output = sla.lgmres(A, b.toarray(), x0, maxiter=None, M=M)
         print(output)
 
     elif solver == "umfpack":
@@ -220,6 +502,9 @@ def _Solve_Axb(simu, problemType: str,
         # ctx.run(job=6) # Analysis + Factorization + Solve
         # ctx.destroy() # Cleanup
         x = mumps.spsolve(A,b)
+
+    if useFacto and facto is not None:
+        factorizations.Set(problemType, key, dofsUnknown, facto)
             
     tic.Tac("Solver",f"Solve {problemType} ({solver})", simu._verbosity)
 
@@ -227,7 +512,96 @@ def _Solve_Axb(simu, problemType: str,
     # residu = np.linalg.norm(A.dot(x)-b.toarray().ravel())
     # print(residu/np.linalg.norm(b.toarray().ravel()))
 
-    return np.array(x)
+    x = np.array(x)
+    if b.shape[1] == 1:
+        # (N, 1) -> (N)
+        x = x.ravel()
+
+    return x
+
+def __Get_Matrix_Properties(simu, problemType: str, isSymmetric: bool=None) -> tuple[bool, bool]:
+    """Returns whether the matrix system of the problem type is symmetric and positive definite.\n
+    The symmetry is declared by the simulation (see `simu.Is_symmetric()`) if isSymmetric is None.\n
+    The systems augmented with the lagrange multipliers of the problem type are symmetric indefinite."""
+    if isSymmetric is None:
+        isSymmetric = simu.Is_symmetric(problemType)
+    isDefinite = isSymmetric and BoundaryCondition.Get_nBc(problemType, simu.Bc_Lagrange) == 0
+    return isSymmetric, isDefinite
+
+def __Get_Operator_Key(simu, solver: str, A: sparse.csr_matrix) -> tuple:
+    """Returns the parameters used to build A in addition to the matrix version."""
+    algo = simu.algo
+    if algo == AlgoType.parabolic:
+        params = (simu.alpha, simu.dt)
+    elif algo == AlgoType.hyperbolic:
+        params = (simu.betha, simu.gamma, simu.dt)
+    else:
+        params = ()
+    return (solver, A.shape, A.nnz, algo, *params)
+
+def __Get_AMG(simu, problemType: str, A: sparse.csr_matrix, dofsUnknown: np.ndarray) -> _SmoothedAggregation:
+    """Returns the smoothed aggregation AMG preconditioner of A.\n
+    The stored preconditioner is updated with the values of A if A has the same sparsity pattern and the same unknown dofs.\n
+    If dofsUnknown is None (system that is not stored, e.g. the initial acceleration), the preconditioner is built without being stored."""
+
+    factorizations = simu._factorizations
+    amg = None if dofsUnknown is None else factorizations.Get_preconditioner(problemType, dofsUnknown)
+
+    if isinstance(amg, _SmoothedAggregation) and amg.Is_same_pattern(A):
+        amg.Update(A)
+    else:
+        B, blocks = __Get_near_nullspace(simu, problemType, A.shape[0], dofsUnknown)
+        amg = _SmoothedAggregation(A, B, blocks)
+        if dofsUnknown is not None:
+            factorizations.Set_preconditioner(problemType, dofsUnknown, amg)
+
+    return amg
+
+def __Get_Cholmod(simu, problemType: str, A: sparse.csr_matrix, dofsUnknown: np.ndarray):
+    """Returns the cholmod factorization of the symmetric positive definite matrix A (see `simu.Is_symmetric(problemType)`).\n
+    The symbolic analysis (fill-reducing ordering and structure of L) is stored and only the numerical factorization is computed again if A has the same sparsity pattern and the same unknown dofs."""
+
+    # A is symmetric so its transpose is the csc matrix sent to cholmod (no copy)
+    A_csc = A.T
+
+    factorizations = simu._factorizations
+    if dofsUnknown is None:
+        # the system is not stored by the simulation
+        factor = None
+    else:
+        factor = factorizations.Get_cholmod_factor(problemType, dofsUnknown, A)
+
+    if factor is None:
+        factor = analyze(A_csc)
+        if dofsUnknown is not None:
+            factorizations.Set_cholmod_factor(problemType, dofsUnknown, A, factor)
+
+    try:
+        factor.cholesky_inplace(A_csc)
+    except CholmodNotPositiveDefiniteError:
+        raise Exception(f"The {problemType} matrix is not positive definite, check the boundary conditions or use another solver.")
+
+    return factor
+
+def __Get_near_nullspace(simu, problemType: str, size: int, dofsUnknown: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the near null space B and the node of each unknown dof used to build the AMG preconditioner.\n
+    Rigid body modes are used for elastic problems and constant fields for each direction otherwise."""
+
+    mesh = simu.mesh
+    dof_n = simu.Get_dof_n(problemType)
+
+    if dofsUnknown is None:
+        if size != mesh.Nn * dof_n:
+            # the dofs are unknown
+            return None, None
+        dofsUnknown = np.arange(size)
+
+    if problemType == ModelType.elastic and dof_n in [2, 3] and mesh.inDim >= dof_n:
+        B = _Get_rigid_body_modes(mesh.coord, dof_n)
+    else:
+        B = np.kron(np.ones((mesh.Nn, 1)), np.eye(dof_n))
+
+    return B[dofsUnknown], dofsUnknown // dof_n
 
 def __Check_solverLibrary(solver: str) -> str:
     """Checks whether the selected solver library is available
@@ -241,6 +615,8 @@ def __Check_solverLibrary(solver: str) -> str:
         return solver if __canUseMumps else solveurDeBase
     elif solver == "petsc":
         return solver if __canUsePetsc else solveurDeBase
+    elif solver == "cholmod":
+        return solver if __canUseCholesky else solveurDeBase
     else:
         return solver
 
@@ -253,6 +629,91 @@ def _Solve(simu, problemType: str, resol: ResolType):
     elif resol == ResolType.r3:
         return __Solver_3(simu, problemType)
 
+def _Solve_multiple(simu, problemType: str, list_Bc: list[Callable[[], None]]) -> np.ndarray:
+    """Solves the problem for several sets of boundary conditions sharing the same matrix system.\n
+    The matrix system is built and factorized once and the right-hand sides are solved as one block.
+
+    Parameters
+    ----------
+    simu : Simu
+        Simulation
+    problemType : ModelType
+        problem type
+    list_Bc : list[Callable[[], None]]
+        functions applying each set of boundary conditions (simu.Bc_Init() is called before each function)
+
+    Returns
+    -------
+    np.ndarray
+        solutions (Nbc, Ndof)
+    """
+
+    simu = __Cast_Simu(simu)
+    assert simu.algo == AlgoType.elliptic, "Only available for elliptic problems."
+    assert len(list_Bc) > 0, "list_Bc must contain at least one set of boundary conditions."
+
+    size = simu.mesh.Nn * simu.Get_dof_n(problemType)
+
+    list_b: list[sparse.csr_matrix] = []
+    list_x: list[np.ndarray] = []
+
+    for i, apply_Bc in enumerate(list_Bc):
+
+        simu.Bc_Init()
+        apply_Bc()
+
+        config = __Get_Matrix_Config(simu, problemType)
+        if i == 0:
+            config_0 = config
+            resolution = ResolType.r2 if len(simu.Bc_Lagrange) > 0 else ResolType.r1
+        else:
+            assert __Is_Same_Config(config_0, config), "The sets of boundary conditions must share the same dofs and lagrange coefficients."
+            # the matrices built with the first set remain valid
+            simu.Need_Update(False)
+
+        b = simu._Solver_Apply_Neumann(problemType)
+        A, x = simu._Solver_Apply_Dirichlet(problemType, b, resolution)
+
+        if resolution == ResolType.r1:
+            if i == 0:
+                dofsKnown, dofsUnknown = simu.Bc_dofs_known_unknow(problemType)
+                Aii, Aic = __Get_Aii_Aic(simu, problemType, A, dofsKnown, dofsUnknown)
+            list_b.append(b[dofsUnknown,0] - Aic @ x[dofsKnown,0])
+            list_x.append(x.toarray().ravel())
+        else:
+            if i == 0:
+                alpha = A.data.max()
+                Aii = __Solver_2_Matrix(simu, problemType, A, alpha)
+                dofsUnknown = None
+            list_b.append(__Solver_2_Vector(simu, problemType, b, alpha))
+
+    B = sparse.hstack(list_b, format="csr")
+    x0 = np.zeros(Aii.shape[0])
+
+    isUpper = simu._Use_symmetric_storage(problemType) and resolution == ResolType.r1
+    X = _Solve_Axb(simu, problemType, Aii, B, x0, [], [], dofsUnknown, isUpper=isUpper)
+    X = X.reshape(Aii.shape[0], -1)
+
+    if resolution == ResolType.r1:
+        x = np.asarray(list_x)
+        x[:, dofsUnknown] = X.T
+    else:
+        # We don't send back reaction forces
+        x = X[:size].T
+
+    return x
+
+def __Get_Matrix_Config(simu, problemType: str) -> list[np.ndarray]:
+    """Returns the dofs and coefficients defining the matrix system to solve."""
+    config = [np.asarray(simu.Bc_dofs_Dirichlet(problemType))]
+    for lagrangeBc in simu.Bc_Lagrange:
+        config.extend([lagrangeBc.dofs, lagrangeBc.lagrangeCoefs])
+    return config
+
+def __Is_Same_Config(config1: list[np.ndarray], config2: list[np.ndarray]) -> bool:
+    """Checks whether the two matrix configurations are identical."""
+    return len(config1) == len(config2) and all(np.array_equal(a1, a2) for a1, a2 in zip(config1, config2))
+
 def __Solver_1(simu, problemType: str) -> np.ndarray:
     # --       --  --  --   --  --
     # | Aii Aic |  | xi |   | bi |    
@@ -262,6 +723,9 @@ def __Solver_1(simu, problemType: str) -> np.ndarray:
 
     simu = __Cast_Simu(simu)
 
+    if __Use_MatrixFree(simu, problemType):
+        return __Solver_1_MatrixFree(simu, problemType)
+
     # Build the matrix system
     b = simu._Solver_Apply_Neumann(problemType)
     A, x = simu._Solver_Apply_Dirichlet(problemType, b, ResolType.r1)
@@ -272,9 +736,7 @@ def __Solver_1(simu, problemType: str) -> np.ndarray:
     tic = Tic()
     # split of the matrix system into known and unknown dofs
     # Solve : Aii * xi = bi - Aic * xc
-    Ai = A[dofsUnknown, :].tocsc()
-    Aii = Ai[:, dofsUnknown].tocsr()
-    Aic = Ai[:, dofsKnown].tocsr()
+    Aii, Aic = __Get_Aii_Aic(simu, problemType, A, dofsKnown, dofsUnknown)
     bi = b[dofsUnknown,0]
     xc = x[dofsKnown,0]
 
@@ -287,7 +749,7 @@ def __Solver_1(simu, problemType: str) -> np.ndarray:
 
     lb, ub = simu.Get_lb_ub(problemType)
 
-    xi = _Solve_Axb(simu, problemType, Aii, bi-bDirichlet, x0, lb, ub)
+    xi = _Solve_Axb(simu, problemType, Aii, bi-bDirichlet, x0, lb, ub, dofsUnknown, isUpper=simu._Use_symmetric_storage(problemType))
 
     # apply result to global vector
     x = x.toarray().reshape(x.shape[0])
@@ -295,6 +757,66 @@ def __Solver_1(simu, problemType: str) -> np.ndarray:
 
     return x
 
+def __Get_Aii_Aic(simu, problemType: str, A: sparse.csr_matrix, dofsKnown: np.ndarray, dofsUnknown: np.ndarray) -> tuple[sparse.csr_matrix, sparse.csr_matrix]:
+    """Extracts Aii and Aic from A.\n
+    If simu._Use_symmetric_storage(problemType), A and Aii are upper triangular and Aic = A[unknown, known] + A[known, unknown]'.\n
+    The partition is reused as long as the dofs and the sparsity pattern of A remain unchanged."""
+    A = sparse.csr_matrix(A)
+    isUpper = simu._Use_symmetric_storage(problemType)
+    factorizations: _Factorizations = simu._factorizations
+    partition = factorizations.Get_partition(problemType)
+    if partition is None or not partition.Is_valid(A, dofsKnown, dofsUnknown, isUpper):
+        partition = _Partition(A, dofsKnown, dofsUnknown, isUpper)
+        factorizations.Set_partition(problemType, partition)
+    return partition.Get_Aii_Aic(A)
+
+def __Use_MatrixFree(simu, problemType: str) -> bool:
+    """Checks whether the system can be solved without assembling A (see ElasticSimu.matrixFree)."""
+    from ._elastic import ElasticSimu
+    if not isinstance(simu, ElasticSimu) or not simu.matrixFree:
+        return False
+    assert simu.solver in __iterativeSolvers, f"The matrix-free resolution requires an iterative solver {__iterativeSolvers}."
+    return simu.algo == AlgoType.elliptic \
+        and len(simu.Bc_Lagrange) == 0 \
+        and len(simu.Get_lb_ub(problemType)[0]) == 0
+
+def __Solver_1_MatrixFree(simu, problemType: str) -> np.ndarray:
+    # Same as __Solver_1 but A is applied with simu.Get_K_operator() and never assembled.
+    # xi = inv(Aii) * (bi - (A xc)i) with a block jacobi preconditioner
+
+    size = simu.mesh.Nn * simu.Get_dof_n(problemType)
+
+    tic = Tic()
+
+    # Neumann (there is no volumetric force in Fu)
+    dofs = BoundaryCondition.Get_dofs(problemType, simu.Bc_Neuman)
+    values = BoundaryCondition.Get_values(problemType, simu.Bc_Neuman)
+    b = np.bincount(np.asarray(dofs, dtype=int), values, minlength=size)
+
+    # Dirichlet
+    dofs = simu.Bc_dofs_Dirichlet(problemType)
+    values = simu.Bc_values_Dirichlet(problemType)
+    x = np.bincount(np.asarray(dofs, dtype=int), values, minlength=size)
+
+    dofsKnown, dofsUnknown = simu.Bc_dofs_known_unknow(problemType)
+
+    Aii = simu.Get_K_operator(dofsUnknown)
+    M = simu.Get_K_preconditioner(dofsUnknown)
+    bDirichlet = simu.Get_K_operator() @ x
+    bi = sparse.csr_matrix((b - bDirichlet)[dofsUnknown].reshape(-1, 1))
+
+    tic.Tac("Solver",f"Operator-built ({problemType})", simu._verbosity)
+
+    x0 = simu.Get_x0(problemType)
+    x0 = x0[dofsUnknown]
+
+    xi = _Solve_Axb(simu, problemType, Aii, bi, x0, [], [], M=M)
+
+    # apply result to global vector
+    x[dofsUnknown] = xi
+
+    return x
+
 def __Solver_2(simu, problemType: str):
     # Lagrange multiplier method
 
@@ -306,57 +828,80 @@ def __Solver_2(simu, problemType: str):
     A, x = simu._Solver_Apply_Dirichlet(problemType, b, ResolType.r2)
     alpha = A.data.max()
 
+    A = __Solver_2_Matrix(simu, problemType, A, alpha)
+    b = __Solver_2_Vector(simu, problemType, b, alpha)
+
+    nLagrange = len(simu.Bc_Lagrange)
+    nDirichlet = len(simu.Bc_dofs_Dirichlet(problemType))
+    x0 = simu.Get_x0(problemType)
+    x0 = np.append(x0, np.zeros(nLagrange + nDirichlet))
+
+    x = _Solve_Axb(simu, problemType, A, b, x0, [], [])
+
+    # We don't send back reaction forces
+    sol = x[:size]
+    lagrange = x[size:]
+
+    return sol, lagrange
+
+def __Solver_2_Matrix(simu, problemType: str, A: sparse.csr_matrix, alpha: float) -> sparse.csr_matrix:
+    """Adds the Dirichlet and Lagrange conditions to the matrix A."""
+
     tic = Tic()
 
+    size = simu.mesh.Nn * simu.Get_dof_n(problemType)
+
+    if simu._Use_symmetric_storage(problemType):
+        # the lagrange multipliers are added to the full matrix
+        A = _Get_full_matrix(A)
+
     # set to lil matrix because its faster
     A = A.tolil()
-    b = b.tolil()
 
     dofs_Dirichlet = np.asarray(simu.Bc_dofs_Dirichlet(problemType))
-    values_Dirichlet = np.asarray(simu.Bc_values_Dirichlet(problemType))
-    
-    list_Bc_Lagrange = simu.Bc_Lagrange
-
-    nLagrange = len(list_Bc_Lagrange)
     nDirichlet = len(dofs_Dirichlet)
-    nCol = nLagrange + nDirichlet
-
-    x0 = simu.Get_x0(problemType)
-    x0 = np.append(x0, np.zeros(nCol))
 
     linesDirichlet = np.arange(size, size+nDirichlet)
     
     # apply lagrange multiplier
     A[linesDirichlet, dofs_Dirichlet] = alpha
     A[dofs_Dirichlet, linesDirichlet] = alpha
-    b[linesDirichlet] = values_Dirichlet * alpha
-
-    tic.Tac("Solver",f"Lagrange ({problemType}) Dirichlet", simu._verbosity)
 
     # For each lagrange condition we will add a coef to the matrix
-    if len(list_Bc_Lagrange) > 0:
+    start = size + nDirichlet
+    for i, lagrangeBc in enumerate(simu.Bc_Lagrange, start):
+        dofs = lagrangeBc.dofs
+        coefs = lagrangeBc.lagrangeCoefs * alpha
+        A[dofs,i] = coefs
+        A[i,dofs] = coefs
+    
+    tic.Tac("Solver",f"Lagrange ({problemType}) Matrix", simu._verbosity)
 
-        def __apply_lagrange(i: int, lagrangeBc: LagrangeCondition):
-            dofs = lagrangeBc.dofs
-            values = lagrangeBc.dofsValues * alpha
-            coefs = lagrangeBc.lagrangeCoefs * alpha
+    return A.tocsr()
 
-            A[dofs,i] = coefs
-            A[i,dofs] = coefs
-            b[i] = values[0]
-        
-        start = size + nDirichlet
-        [__apply_lagrange(i, lagrangeBc) for i, lagrangeBc in enumerate(list_Bc_Lagrange, start)]
-    
-    tic.Tac("Solver",f"Lagrange ({problemType}) Coupling", simu._verbosity)
+def __Solver_2_Vector(simu, problemType: str, b: sparse.csr_matrix, alpha: float) -> sparse.csr_matrix:
+    """Adds the Dirichlet and Lagrange values to the vector b."""
 
-    x = _Solve_Axb(simu, problemType, A.tocsr(), b.tocsr(), x0, [], [])
+    tic = Tic()
 
-    # We don't send back reaction forces
-    sol = x[:size]
-    lagrange = x[size:]
+    size = simu.mesh.Nn * simu.Get_dof_n(problemType)
 
-    return sol, lagrange
+    b = b.tolil()
+
+    values_Dirichlet = np.asarray(simu.Bc_values_Dirichlet(problemType))
+    nDirichlet = len(values_Dirichlet)
+
+    linesDirichlet = np.arange(size, size+nDirichlet)
+    b[linesDirichlet] = values_Dirichlet * alpha
+
+    start = size + nDirichlet
+    for i, lagrangeBc in enumerate(simu.Bc_Lagrange, start):
+        values = lagrangeBc.dofsValues * alpha
+        b[i] = values[0]
+
+    tic.Tac("Solver",f"Lagrange ({problemType}) Vector", simu._verbosity)
+
+    return b.tocsr()
 
 def __Solver_3(simu, problemType: str):
     # Resolution using the penalty method
@@ -373,11 +918,149 @@ def __Solver_3(simu, problemType: str):
     A, x = simu._Solver_Apply_Dirichlet(problemType, b, ResolType.r3)
 
     # Solving the penalized matrix system
-    x = _Solve_Axb(simu, problemType, A, b, [], [], [])
+    # the rows of the known dofs are replaced but not the columns, the penalized matrix is not symmetric
+    x = _Solve_Axb(simu, problemType, A, b, [], [], [], isSymmetric=False)
 
     return x
 
-def _PETSc(A: sparse.csr_matrix, b: sparse.csr_matrix, x0: np.ndarray, kspType='cg', pcType='ilu') -> np.ndarray:
+class _PETScContext:
+    """PETSc objects (matrix, Krylov solver and preconditioner) used to solve the systems of a problem type.\n
+    The matrix is kept and its values are updated in place (setValuesCSR) as long as the sparsity pattern is unchanged.
+    The preconditioner is then reused (setReusePreconditioner) and built again only if the solver does not converge or needs more than twice the iterations obtained with the last preconditioner.\n
+    The number of iterations and the residual norm of each solve are recorded."""
+
+    def __init__(self) -> None:
+        self.__ksp = None
+        self.__csr: tuple[np.ndarray, np.ndarray] = None
+        self.__isUpper = False
+        self.__isNewPC = True
+        self.__refIterations = 0
+        self.__pcFallback: str = None
+        self.iterations: list[int] = []
+        """number of iterations of each solve"""
+        self.residuals: list[float] = []
+        """residual norm of each solve"""
+
+    @property
+    def kspType(self) -> str:
+        """PETSc Krylov method"""
+        return self.__ksp.getType()
+
+    @property
+    def pcType(self) -> str:
+        """PETSc preconditioner"""
+        return self.__ksp.getPC().getType()
+
+    @property
+    def pcFallback(self) -> str:
+        """preconditioner used instead of the default one after a convergence failure (None if no failure)"""
+        return self.__pcFallback
+
+    def Set_operator(self, A: sparse.csr_matrix, kspType='cg', pcType='ilu', isUpper=False) -> None:
+        """Sets the values of A.\n
+        The PETSc objects are created again only if the sparsity pattern, the storage or the methods change."""
+
+        if self.__pcFallback is not None:
+            pcType = self.__pcFallback
+
+        ksp = self.__ksp
+
+        if ksp is not None and isUpper == self.__isUpper \
+            and ksp.getType() == kspType and ksp.getPC().getType() == pcType \
+            and np.array_equal(self.__csr[0], A.indptr) and np.array_equal(self.__csr[1], A.indices):
+            matrix, _ = ksp.getOperators()
+            matrix.setValuesCSR(*self.__csr, A.data)
+            matrix.assemble()
+            ksp.setReusePreconditioner(True)
+            self.__isNewPC = False
+        else:
+            if ksp is not None:
+                ksp.getOperators()[0].destroy()
+                ksp.destroy()
+            self.__ksp = _PETSc_KSP(A, kspType, pcType, isUpper)
+            self.__csr = (A.indptr.astype(PETSc.IntType), A.indices.astype(PETSc.IntType))
+            self.__isUpper = isUpper
+            self.__isNewPC = True
+
+    def Set_fallback(self, pcType='none') -> None:
+        """Replaces the preconditioner of this context."""
+        self.__pcFallback = pcType
+        self.__ksp.getPC().setType(pcType)
+        self.__ksp.setReusePreconditioner(False)
+        self.__isNewPC = True
+
+    def Solve(self, b: sparse.csr_matrix, x0: np.ndarray) -> tuple[np.ndarray, str, bool]:
+        """Solves A x = b and returns x, the solver description and whether the solver converged."""
+
+        ksp = self.__ksp
+
+        x, option, converg = _PETSc(None, b, x0, self.kspType, self.pcType, ksp)
+
+        if not self.__isNewPC and (not converg or ksp.getIterationNumber() > 2 * self.__refIterations):
+            # A has changed too much since the preconditioner was built
+            ksp.setReusePreconditioner(False)
+            self.__isNewPC = True
+            x, option, converg = _PETSc(None, b, x0, self.kspType, self.pcType, ksp)
+
+        if self.__isNewPC:
+            self.__refIterations = ksp.getIterationNumber()
+
+        self.iterations.append(ksp.getIterationNumber())
+        self.residuals.append(ksp.getResidualNorm())
+
+        return x, option, converg
+
+def _PETSc_KSP(A: sparse.csr_matrix, kspType='cg', pcType='ilu', isUpper=False):
+    """Creates the PETSc Krylov solver associated with the matrix A.
+
+    Parameters
+    ----------
+    A : sparse.csr_matrix
+        sparse matrix (N, N)
+    kspType : str, optional
+        PETSc Krylov method, by default 'cg'
+    pcType : str, optional
+        preconditioner, by default 'ilu'
+    isUpper : bool, optional
+        only the upper triangle of the symmetric matrix A is stored, by default False\n
+        A SBAIJ matrix is then created instead of an AIJ matrix.
+
+    Returns
+    -------
+    PETSc.KSP
+        Krylov solver whose preconditioner is built during the first solve and reused afterwards.
+    """
+
+    # # TODO make it work with mpi
+    # __comm = MPI.COMM_WORLD
+    # nprocs = __comm.Get_size()
+    # rank   = __comm.Get_rank()
+
+    __comm = None
+
+    dimI = A.shape[0]
+    dimJ = A.shape[1]    
+
+    matrix = PETSc.Mat()
+    # PETSc uses its own integer type (int32 or int64 depending on the build)
+    csr = (A.indptr.astype(PETSc.IntType, copy=False), A.indices.astype(PETSc.IntType, copy=False), A.data)
+    if isUpper:
+        matrix.createSBAIJ([dimI, dimJ], 1, comm=__comm, csr=csr)
+    else:
+        matrix.createAIJ([dimI, dimJ], comm=__comm, csr=csr)
+
+    ksp = PETSc.KSP().create()
+    ksp.setOperators(matrix)
+    ksp.setType(kspType)
+    
+    pc = ksp.getPC()    
+    pc.setType(pcType)
+
+    # pc.setFactorSolverType("superlu") #"mumps"
+
+    return ksp
+
+def _PETSc(A: sparse.csr_matrix, b: sparse.csr_matrix, x0: np.ndarray, kspType='cg', pcType='ilu', ksp=None) -> np.ndarray:
     """PETSc insterface to solve the linear system A x = b
 
     Parameters
@@ -398,6 +1081,8 @@ def _PETSc(A: sparse.csr_matrix, b: sparse.csr_matrix, x0: np.ndarray, kspType='
         # TODO iluk ?
         more -> https://petsc.org/release/manualpages/PC/PCType/\n
         remark : The ilu preconditioner does not seem to work for systems using HEXA20 elements.
+    ksp : PETSc.KSP, optional
+        Krylov solver created with _PETSc_KSP(A, kspType, pcType), by default None
 
     Returns
     -------
@@ -405,23 +1090,13 @@ def _PETSc(A: sparse.csr_matrix, b: sparse.csr_matrix, x0: np.ndarray, kspType='
         x solution to A x = b
     """
 
-    # # TODO make it work with mpi
-    # __comm = MPI.COMM_WORLD
-    # nprocs = __comm.Get_size()
-    # rank   = __comm.Get_rank()
-
     # TODO add bound constrain
     # https://petsc.org/release/petsc4py/reference/petsc4py.PETSc.SNES.html ?
-    
-    __comm = None
-    petsc4py.init(sys.argv, comm=__comm)
 
-    dimI = A.shape[0]
-    dimJ = A.shape[1]    
+    if ksp is None:
+        ksp = _PETSc_KSP(A, kspType, pcType)
 
-    matrix = PETSc.Mat()
-    csr = (A.indptr, A.indices, A.data)
-    matrix.createAIJ([dimI, dimJ], comm=__comm, csr=csr)
+    matrix, _ = ksp.getOperators()
 
     vectb = matrix.createVecLeft()
 
@@ -433,15 +1108,6 @@ def _PETSc(A: sparse.csr_matrix, b: sparse.csr_matrix, x0: np.ndarray, kspType='
     if len(x0) > 0:
         x.array[:] = x0
 
-    ksp = PETSc.KSP().create()
-    ksp.setOperators(matrix)
-    ksp.setType(kspType)
-    
-    pc = ksp.getPC()    
-    pc.setType(pcType)
-
-    # pc.setFactorSolverType("superlu") #"mumps"
-
     ksp.solve(vectb, x)
     x = x.array
 
@@ -454,32 +1120,36 @@ def _PETSc(A: sparse.csr_matrix, b: sparse.csr_matrix, x0: np.ndarray, kspType='
     return x, option, converg
     
 
-def _ScipyLinearDirect(A: sparse.csr_matrix, b: sparse.csr_matrix, A_isSymetric: bool):
+def _ScipyLinearDirect(A: sparse.csr_matrix, b: sparse.csr_matrix, isSymmetric: bool, isDefinite=False) -> tuple[np.ndarray, sla.SuperLU]:
+    """Solves A x = b with SuperLU and returns x and the LU decomposition (None if hidden).\n
+    Symmetric matrices are ordered with the minimum degree on A'+A and factorized in SymmetricMode (the same ordering is applied to the rows and the columns), non-symmetric ones are ordered with COLAMD.\n
+    The diagonal pivots of symmetric positive definite matrices are preferred (as in a Cholesky factorization) whereas symmetric indefinite matrices keep the partial pivoting."""
     # https://docs.scipy.org/doc/scipy/reference/sparse.linalg.html#solving-linear-problems
     # LU decomposition behind https://caam37830.github.io/book/02_linear_algebra/sparse_linalg.html
 
     hideFacto = False # Hide decomposition
     # permute = "MMD_AT_PLUS_A", "MMD_ATA", "COLAMD", "NATURAL"
-    
-    # if A_isSymetric:
-    #     permute="MMD_AT_PLUS_A"
-    # else:
-    #     permute="COLAMD"
-    #     # permute="NATURAL"
+    permute = "MMD_AT_PLUS_A" if isSymmetric else "COLAMD"
 
-    permute = "MMD_AT_PLUS_A"
+    if isSymmetric:
+        options = {"options": {"SymmetricMode": True}}
+        if isDefinite:
+            options["diag_pivot_thresh"] = 0.01
+    else:
+        options = {}
 
     if hideFacto:                   
         x = sla.spsolve(A, b, permc_spec=permute)
+        lu = None
         # x = sla.spsolve(A, b)
         
     else:
         # superlu : https://portal.nersc.gov/project/sparse/superlu/
         # Users' Guide : https://portal.nersc.gov/project/sparse/superlu/ug.pdf
-        lu = sla.splu(A.tocsc(), permc_spec=permute)
-        x = lu.solve(b.toarray()).ravel()
+        lu = sla.splu(A.tocsc(), permc_spec=permute, **options)
+        x = lu.solve(b.toarray())
 
-    return x
+    return x, lu
 
 def _BoundConstrain(A, b, lb: np.ndarray, ub: np.ndarray):
 
@@ -0,0 +1,333 @@
+# Copyright (C) 2021-2024 Université Gustave Eiffel.
+# This file is part of the EasyFEA project.
+# EasyFEA is distributed under the terms of the GNU General Public License v3 or later, see LICENSE.txt and CREDITS.md for more information.
+
+"""Module containing a smoothed aggregation algebraic multigrid (AMG) preconditioner built with scipy.sparse only."""
+
+import numpy as np
+import scipy.sparse as sparse
+import scipy.sparse.linalg as sla
+
+def _Get_rigid_body_modes(coord: np.ndarray, dim: int) -> np.ndarray:
+    """Returns the rigid body modes (Nn*dim, 3 or 6) of an elastic problem.\n
+    2D : [ux, uy, rz]\n
+    3D : [ux, uy, uz, rx, ry, rz]
+
+    Parameters
+    ----------
+    coord : np.ndarray
+        nodes coordinates (Nn, 3)
+    dim : int
+        dimension of the displacement field (2 or 3)
+    """
+
+    assert dim in [2, 3], "dim must be 2 or 3."
+
+    # centered and scaled coordinates
+    coord = np.asarray(coord, dtype=float)[:, :dim]
+    coord = coord - coord.mean(axis=0)
+    scale = np.abs(coord).max()
+    if scale > 0:
+        coord = coord / scale
+
+    Nn = coord.shape[0]
+    nModes = 3 if dim == 2 else 6
+    modes = np.zeros((Nn, dim, nModes))
+
+    # translations
+    for d in range(dim):
+        modes[:, d, d] = 1
+
+    # rotations
+    x, y = coord[:,0], coord[:,1]
+    if dim == 2:
+        modes[:,0,2], modes[:,1,2] = -y, x
+    else:
+        z = coord[:,2]
+        modes[:,1,3], modes[:,2,3] = -z, y
+        modes[:,0,4], modes[:,2,4] = z, -x
+        modes[:,0,5], modes[:,1,5] = -y, x
+
+    return modes.reshape(Nn*dim, nModes)
+
+class _SmoothedAggregation:
+
+    def __init__(self, A: sparse.csr_matrix, B: np.ndarray=None, blocks: np.ndarray=None,
+                 theta=0.0, maxCoarse=500, maxLevels=10, degree=2):
+        """Creates a smoothed aggregation AMG hierarchy used as a preconditioner for symmetric positive definite matrices.\n
+        The nodes are aggregated with a maximal independent set of distance 2 on the strength graph.\n
+        The tentative prolongators interpolate exactly the near null space B (rigid body modes for elasticity) and are smoothed with a damped Jacobi iteration.\n
+        Each level is smoothed with a Chebyshev polynomial of D^-1 A, so the V-cycle is symmetric and can be used with cg.
+
+        Parameters
+        ----------
+        A : sparse.csr_matrix
+            symmetric positive definite matrix (N, N)
+        B : np.ndarray, optional
+            near null space (N, k), by default np.ones((N, 1))\n
+            Use _Get_rigid_body_modes() for elasticity.
+        blocks : np.ndarray, optional
+            node of each dof (N), by default np.arange(N)\n
+            The dofs of a node are aggregated together.
+        theta : float, optional
+            strength of connection threshold, by default 0.0\n
+            nodes i and j are connected if |a_ij| >= theta * sqrt(|a_ii a_jj|)
+        maxCoarse : int, optional
+            maximum size of the coarsest matrix, by default 500
+        maxLevels : int, optional
+            maximum number of levels, by default 10
+        degree : int, optional
+            degree of the Chebyshev smoothers, by default 2
+        """
+
+        A = sparse.csr_matrix(A)
+        N = A.shape[0]
+        assert A.shape == (N, N), "A must be a square matrix."
+
+        B = np.ones((N, 1)) if B is None else np.asarray(B, dtype=float).reshape(N, -1)
+        blocks = np.arange(N) if blocks is None else np.asarray(blocks, dtype=int).ravel()
+        assert blocks.size == N, "blocks must be of size N."
+
+        self.__degree = degree
+        self.__indptr = A.indptr.copy()
+        self.__indices = A.indices.copy()
+
+        # tentative prolongators
+        self.__list_T: list[sparse.csr_matrix] = []
+        self.__Init_levels(A)
+
+        while self.levels < maxLevels and A.shape[0] > maxCoarse:
+            aggregates = _SmoothedAggregation.__Aggregate(A, blocks, theta)
+            T, B, blocks = _SmoothedAggregation.__Get_tentative_prolongator(aggregates, B)
+            if T.shape[1] == 0 or T.shape[1] >= 0.9 * A.shape[0]:
+                # the coarsening stagnates
+                break
+            self.__list_T.append(T)
+            A = self.__Add_level(T)
+
+        # direct solver on the coarsest level
+        self.__coarseSolver = sla.splu(A.tocsc())
+
+    @property
+    def levels(self) -> int:
+        """number of levels"""
+        return len(self.__list_A)
+
+    @property
+    def complexity(self) -> float:
+        """operator complexity (sum of the nonzeros of all the levels / nonzeros of A)"""
+        return sum(A.nnz for A in self.__list_A) / self.__list_A[0].nnz
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """shape of A"""
+        return self.__list_A[0].shape
+
+    def Is_same_pattern(self, A: sparse.csr_matrix) -> bool:
+        """Checks whether A has the same sparsity pattern as the matrix used to build the aggregates."""
+        return isinstance(A, sparse.csr_matrix) and A.shape == self.shape\
+            and np.array_equal(A.indptr, self.__indptr) and np.array_equal(A.indices, self.__indices)
+
+    def Update(self, A: sparse.csr_matrix) -> None:
+        """Updates the hierarchy with the values of A.\n
+        The aggregates and the tentative prolongators are reused, A must have the same sparsity pattern."""
+
+        A = sparse.csr_matrix(A)
+        assert A.shape == self.shape, f"A must be a {self.shape} matrix."
+
+        self.__Init_levels(A)
+        for T in self.__list_T:
+            A = self.__Add_level(T)
+
+        # direct solver on the coarsest level
+        self.__coarseSolver = sla.splu(A.tocsc())
+
+    def __Init_levels(self, A: sparse.csr_matrix) -> None:
+        """Initializes the levels with the fine matrix A."""
+        self.__list_A: list[sparse.csr_matrix] = [A]
+        self.__list_P: list[sparse.csr_matrix] = []
+        self.__list_R: list[sparse.csr_matrix] = []
+        self.__list_Dinv: list[np.ndarray] = []
+        self.__list_bounds: list[tuple[float, float]] = []
+
+    def __Add_level(self, T: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Adds a coarse level with the tentative prolongator T and returns the coarse matrix Ac = P' A P.\n
+        P = (I - 4/3/rho D^-1 A) T where rho is the spectral radius of D^-1 A."""
+        A = self.__list_A[-1]
+        Dinv = _SmoothedAggregation.__Get_Dinv(A)
+        rho = _SmoothedAggregation.__Get_spectral_radius(A, Dinv)
+        P = (T - sparse.diags(4/3/rho * Dinv) @ (A @ T)).tocsr()
+        R = P.T.tocsr()
+        Ac = (R @ (A @ P)).tocsr()
+        # Ac is symmetric up to rounding errors
+        Ac = ((Ac + Ac.T) / 2).tocsr()
+
+        self.__list_P.append(P)
+        self.__list_R.append(R)
+        self.__list_Dinv.append(Dinv)
+        self.__list_bounds.append((rho/30, 1.1*rho))
+        self.__list_A.append(Ac)
+
+        return Ac
+
+    @staticmethod
+    def __Get_Dinv(A: sparse.csr_matrix) -> np.ndarray:
+        """Returns the inverse of the diagonal of A (zeros for null diagonal values)."""
+        diag = A.diagonal()
+        Dinv = np.zeros_like(diag)
+        nonZero = diag != 0
+        Dinv[nonZero] = 1 / diag[nonZero]
+        return Dinv
+
+    @staticmethod
+    def __Get_spectral_radius(A: sparse.csr_matrix, Dinv: np.ndarray, iterations=15) -> float:
+        """Estimates the spectral radius of D^-1 A with power iterations."""
+        x = np.random.default_rng(0).random(A.shape[0])
+        rho = 1.0
+        for _ in range(iterations):
+            y = Dinv * (A @ x)
+            norm = np.linalg.norm(y)
+            if norm == 0:
+                break
+            rho = norm / np.linalg.norm(x)
+            x = y / norm
+        return rho
+
+    @staticmethod
+    def __Aggregate(A: sparse.csr_matrix, blocks: np.ndarray, theta: float) -> np.ndarray:
+        """Returns the aggregate of each dof.\n
+        The roots are a maximal independent set of distance 2 of the strength graph between the nodes (Luby's algorithm).\n
+        The aggregates are formed by the roots and their neighbors, the remaining nodes join a neighboring aggregate."""
+
+        N = A.shape[0]
+        Nn = blocks.max() + 1
+
+        # strength of connection between the nodes
+        connect_dof_n = sparse.csr_matrix((np.ones(N), (np.arange(N), blocks)), shape=(N, Nn))
+        C = (connect_dof_n.T @ abs(A) @ connect_dof_n).tocoo()
+        diag = np.zeros(Nn)
+        np.add.at(diag, C.row[C.row == C.col], C.data[C.row == C.col])
+        strong = (C.row != C.col) & (C.data >= theta * np.sqrt(diag[C.row] * diag[C.col]))
+        S = sparse.csr_matrix((np.ones(strong.sum()), (C.row[strong], C.col[strong])), shape=(Nn, Nn))
+
+        # distance 2 graph
+        G = (S @ S + S).tocsr()
+        G.setdiag(0)
+        G.eliminate_zeros()
+
+        # roots (Luby's algorithm)
+        weights = np.random.default_rng(0).random(Nn)
+        states = np.zeros(Nn, dtype=np.int8) # 0 undecided, 1 root, -1 not a root
+        while np.any(states == 0):
+            undecided = states == 0
+            neighbors = np.where(undecided, weights, -1.0)
+            maxNeighbors = _SmoothedAggregation.__Rows_max(G, neighbors[G.indices])
+            newRoots = undecided & (weights > maxNeighbors)
+            states[newRoots] = 1
+            states[(states == 0) & (G @ newRoots.astype(float) > 0)] = -1
+
+        roots = np.where(states == 1)[0]
+        aggregates = -np.ones(Nn, dtype=int)
+        aggregates[roots] = np.arange(roots.size)
+
+        # the nodes join the aggregate of a neighbor
+        while np.any(aggregates < 0):
+            values = _SmoothedAggregation.__Rows_max(S, aggregates[S.indices])
+            newNodes = (aggregates < 0) & (values >= 0)
+            if not np.any(newNodes):
+                # isolated nodes
+                isolated = np.where(aggregates < 0)[0]
+                aggregates[isolated] = aggregates.max() + 1 + np.arange(isolated.size)
+                break
+            aggregates[newNodes] = values[newNodes]
+
+        return aggregates[blocks]
+
+    @staticmethod
+    def __Rows_max(M: sparse.csr_matrix, data: np.ndarray) -> np.ndarray:
+        """Returns the maximum of data on each row of M (-inf for empty rows)."""
+        values = np.full(M.shape[0], -np.inf)
+        nonEmpty = np.diff(M.indptr) > 0
+        if data.size > 0:
+            values[nonEmpty] = np.maximum.reduceat(data, M.indptr[:-1][nonEmpty])
+        return values
+
+    @staticmethod
+    def __Get_tentative_prolongator(aggregates: np.ndarray, B: np.ndarray) -> tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+        """Returns the tentative prolongator T, the coarse near null space Bc and the coarse blocks such that T Bc = B and T' T = I.\n
+        B is orthonormalized on each aggregate with the eigen decomposition of the Gram matrices B_a' B_a = V W V'.\n
+        T_a = B_a V W^-1/2 and Bc_a = W^1/2 V' (the linearly dependent modes are removed)."""
+
+        N, k = B.shape
+        nAgg = aggregates.max() + 1
+
+        # Gram matrices
+        gram = np.zeros((nAgg, k, k))
+        for i in range(k):
+            for j in range(i, k):
+                gram[:,i,j] = gram[:,j,i] = np.bincount(aggregates, B[:,i]*B[:,j], minlength=nAgg)
+
+        w, V = np.linalg.eigh(gram)
+        kept = w > 1e-10 * w.max(axis=1, keepdims=True)
+        w = np.where(kept, w, 1.0)
+
+        # coarse dofs
+        columns = -np.ones((nAgg, k), dtype=int)
+        columns[kept] = np.arange(kept.sum())
+        Nc = kept.sum()
+
+        # T_a = B_a V W^-1/2
+        scaled = V / np.sqrt(w)[:,np.newaxis,:]
+        lines, cols, values = [], [], []
+        for j in range(k):
+            keptDofs = kept[aggregates, j]
+            Q_j = np.einsum('ik,ik->i', B[keptDofs], scaled[aggregates[keptDofs], :, j])
+            lines.append(np.where(keptDofs)[0])
+            cols.append(columns[aggregates[keptDofs], j])
+            values.append(Q_j)
+        T = sparse.csr_matrix((np.concatenate(values), (np.concatenate(lines), np.concatenate(cols))), shape=(N, Nc))
+
+        # Bc_a = W^1/2 V'
+        Bc = (np.sqrt(w)[:,:,np.newaxis] * V.transpose(0,2,1))[kept]
+        blocksc = np.repeat(np.arange(nAgg), kept.sum(axis=1))
+
+        return T, Bc, blocksc
+
+    def __Smooth(self, level: int, x: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Chebyshev smoother of D^-1 A with the eigen values bounds of the level."""
+        A, Dinv = self.__list_A[level], self.__list_Dinv[level]
+        lower, upper = self.__list_bounds[level]
+        theta, delta = (upper + lower) / 2, (upper - lower) / 2
+        sigma = theta / delta
+        rho = 1 / sigma
+        r = b - A @ x
+        d = Dinv * r / theta
+        for _ in range(self.__degree):
+            x = x + d
+            r = r - A @ d
+            rho_new = 1 / (2*sigma - rho)
+            d = rho_new * rho * d + 2 * rho_new / delta * (Dinv * r)
+            rho = rho_new
+        return x
+
+    def __Cycle(self, level: int, b: np.ndarray) -> np.ndarray:
+        """V-cycle starting from x = 0."""
+        if level == self.levels - 1:
+            return self.__coarseSolver.solve(b)
+        A = self.__list_A[level]
+        x = self.__Smooth(level, np.zeros_like(b), b)
+        r = b - A @ x
+        x = x + self.__list_P[level] @ self.__Cycle(level+1, self.__list_R[level] @ r)
+        x = self.__Smooth(level, x, b)
+        return x
+
+    def Solve(self, b: np.ndarray) -> np.ndarray:
+        """Applies one V-cycle to b (approximation of A^-1 b)."""
+        b = np.asarray(b, dtype=float)
+        if b.ndim == 2:
+            return np.column_stack([self.__Cycle(0, b[:,i]) for i in range(b.shape[1])])
+        return self.__Cycle(0, b)
+
+    def Get_operator(self) -> sla.LinearOperator:
+        """Returns the V-cycle as a linear operator used as a preconditioner (M)."""
+        return sla.LinearOperator(self.shape, matvec=self.Solve, dtype=float)
@@ -68,6 +68,10 @@ class BeamSimu(_Simu):
     def Get_problemTypes(self) -> list[ModelType]:
         return [ModelType.beam]
 
+    def Is_symmetric(self, problemType=None) -> bool:
+        # the beam stiffness matrix is symmetric
+        return True
+
     @property
     def structure(self) -> Materials.BeamStructure:
         """Beam structure."""
@@ -498,11 +502,8 @@ class BeamSimu(_Simu):
         
         tic = Tic()
 
-        linesVector_e = mesh.Get_linesVector_e(model.dof_n).ravel()
-        columnsVector_e = mesh.Get_columnsVector_e(model.dof_n).ravel()
-
         # Assembly
-        self.__Kbeam = sparse.csr_matrix((Ku_beam.ravel(), (linesVector_e, columnsVector_e)), shape=(nDof, nDof))
+        self.__Kbeam = mesh.Assemble_matrix(Ku_beam, model.dof_n, nDof, self._Use_symmetric_storage(ModelType.beam))
         """Kglob matrix for beam problem (nDof, nDof)"""
 
         self.__Fbeam = sparse.csr_matrix((nDof, 1))
@@ -521,7 +522,7 @@ class BeamSimu(_Simu):
             self.Need_Update(False)
         size = self.__Kbeam.shape[0]
         initcsr = sparse.csr_matrix((size, size))
-        return self.__Kbeam.copy(), initcsr.copy(), initcsr.copy(), self.__Fbeam.copy()
+        return self._Get_matrix(self.__Kbeam), initcsr.copy(), initcsr.copy(), self._Get_matrix(self.__Fbeam)
 
     def Get_x0(self, problemType=None):
         if self.displacement.size != self.mesh.Nn*self.Get_dof_n(problemType):
@@ -610,7 +611,7 @@ class BeamSimu(_Simu):
         
             Kbeam = self.Get_K_C_M_F()[0]
             Kglob = Kbeam.tocsr()[:dofs].tocsc()[:,:dofs]
-            force = Kglob @ self.displacement
+            force = self._Dot(ModelType.beam, Kglob, self.displacement)
 
             force_n = force.reshape(self.mesh.Nn, -1)
             index = self.__indexResult(result)
@@ -204,7 +204,6 @@ class DIC(_IObserver):
 
         connectPixel = self.__connectPixel
         coordInElem = self.__coordPixelInElem
-        Ntild = mesh.groupElem._Ntild()
 
         # ----------------------------------------------
         # Build the shape function matrix for pixels (N)
@@ -215,8 +214,7 @@ class DIC(_IObserver):
         values_phi = []
 
         # Evaluate shape functions for each pixels' coordinates
-        x_p, y_p = coordInElem[:,0], coordInElem[:,1]
-        phi_n_pixels = np.array([np.reshape([Ntild[n,0](x_p, y_p)], -1) for n in range(mesh.nPe)])
+        phi_n_pixels = mesh.groupElem._Evaluates_Polynomials("N", coordInElem[:,:2])[:,0].T
          
         tic = Tic()
         
@@ -5,11 +5,12 @@
 from typing import Union, Callable
 import numpy as np
 from scipy import sparse
+import scipy.sparse.linalg as sla
 
 # utilities
 from ..utilities import Folder, Display, Tic
 # fem
-from ..fem import Mesh, MatrixType, Mesher
+from ..fem import Mesh, MatrixType, Mesher, StrainOperator
 # materials
 from .. import Materials
 from ..materials import ModelType, Reshape_variable, Result_in_Strain_or_Stress_field
@@ -42,6 +43,7 @@ class ElasticSimu(_Simu):
         # init
         self.Set_Rayleigh_Damping_Coefs()
         self.Solver_Set_Elliptic_Algorithm()    
+        self.__matrixFree = False
 
     def Results_nodesField_elementsField(self, details=False) -> tuple[list[str], list[str]]:
         nodesField = ["displacement_matrix"]
@@ -61,6 +63,10 @@ class ElasticSimu(_Simu):
     
     def Get_problemTypes(self) -> list[ModelType]:
         return [ModelType.elastic]
+
+    def Is_symmetric(self, problemType=None) -> bool:
+        # Ku, Mu and the Rayleigh damping Cu are symmetric
+        return True
         
     def Get_dof_n(self, problemType=None) -> int:
         return self.dim
@@ -91,42 +97,42 @@ class ElasticSimu(_Simu):
         3D [axi, ayi, azi, ...]"""
         return self._Get_a_n(self.problemType)
 
-    def __Construct_Local_Matrix(self) -> tuple[np.ndarray, np.ndarray]:
-        """Computes the elementary stiffness matrices for the elastic problem."""
+    def __Construct_Local_Matrix(self, elements: slice, jacobian_e_pg: np.ndarray, rho_e_pg: Union[float, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        """Computes the elementary stiffness and mass matrices of the elements for the elastic problem.\n
+        Ku_e is computed with the strain operator of the elements, without building the B matrices (with numba if useNumba)."""
 
         matrixType=MatrixType.rigi
         
-        mesh = self.mesh; Ne = mesh.Ne
-        jacobian_e_pg = mesh.Get_jacobian_e_pg(matrixType)
+        mesh = self.mesh
         weight_pg = mesh.Get_weight_pg(matrixType)
-        nPg = weight_pg.size
-
         N_pg = mesh.Get_N_vector_pg(matrixType)
-        rho = self.rho
-        
-        B_dep_e_pg = mesh.Get_B_e_pg(matrixType)
-        leftDepPart = mesh.Get_leftDispPart(matrixType) # -> jacobian_e_pg * weight_pg * B_dep_e_pg'
-
-        mat = self.material
-
-        tic = Tic()
-        
-        matC = mat.C
 
         # Stifness
-        matC = Reshape_variable(matC, Ne, nPg)
-        Ku_e = np.sum(leftDepPart @ matC @ B_dep_e_pg, axis=1)
+        # c is broadcasted over the elements and integration points instead of being repeated
+        # the layout is given by the dimensions before the trailing (c, c)
+        matC = self.material.C
+        leading = matC.shape[:-2]
+        if len(leading) == 1 and leading[0] == mesh.Ne:
+            matC = matC[elements, np.newaxis] # (e, 1, c, c)
+        elif len(leading) == 1:
+            matC = matC[np.newaxis] # (1, p, c, c)
+        elif len(leading) == 2:
+            matC = matC[elements] # (e, p, c, c)
+
+        strainOp = mesh.Get_strainOperator(matrixType, None if elements == slice(None) else elements)
+        Ku_e = strainOp.stiffness(matC, self.useNumba)
         
         # Mass
-        rho_e_pg = Reshape_variable(rho, Ne, nPg)
-        Mu_e = np.einsum(f'ep,p,pdi,ep,pdj->eij', jacobian_e_pg, weight_pg, N_pg, rho_e_pg, N_pg, optimize="optimal")
+        if np.ndim(rho_e_pg) == 0:
+            # homogeneous density is factored out instead of being repeated on (e, p)
+            Mu_e = rho_e_pg * np.einsum(f'ep,p,pdi,pdj->eij', jacobian_e_pg[elements], weight_pg, N_pg, N_pg, optimize="optimal")
+        else:
+            Mu_e = np.einsum(f'ep,p,pdi,ep,pdj->eij', jacobian_e_pg[elements], weight_pg, N_pg, rho_e_pg[elements], N_pg, optimize="optimal")
 
         if self.dim == 2:
             thickness = self.material.thickness
             Ku_e *= thickness
             Mu_e *= thickness
-        
-        tic.Tac("Matrix","Construct Ku_e and Mu_e", self._verbosity)
 
         return Ku_e, Mu_e
 
@@ -135,9 +141,9 @@ class ElasticSimu(_Simu):
             self.Assembly()
             self.Need_Update(False)
 
-        Cu = self.__coefK * self.__Ku + self.__coefM * self.__Mu
+        Cu = self._Set_index_dtype(self.__coefK * self.__Ku + self.__coefM * self.__Mu)
         
-        return self.__Ku.copy(), Cu, self.__Mu.copy(), self.__Fu.copy()
+        return self._Get_matrix(self.__Ku), Cu, self._Get_matrix(self.__Mu), self._Get_matrix(self.__Fu)
  
     def Assembly(self) -> None:
 
@@ -147,17 +153,28 @@ class ElasticSimu(_Simu):
 
         # Additional dimension linked to the use of lagrange coefficients
         Ndof += self._Bc_Lagrange_dim(self.problemType)
-                        
-        Ku_e, Mu_e = self.__Construct_Local_Matrix()
-        
-        tic = Tic()
 
-        linesVector_e = mesh.linesVector_e.ravel()
-        columnsVector_e = mesh.columnsVector_e.ravel()
+        matrixType = MatrixType.rigi
+        jacobian_e_pg = mesh.Get_jacobian_e_pg(matrixType)
+        nPg = mesh.Get_nPg(matrixType)
+        rho = self.rho
+        rho_e_pg = float(rho) if np.ndim(rho) == 0 else Reshape_variable(rho, mesh.Ne, nPg)
+
+        # memory used per element: Ku_e, Mu_e, B_e_pg and c @ B_e_pg (the B matrices are not stored in the mesh)
+        ndof_e = mesh.nPe*self.dim
+        nC = 3 if self.dim == 2 else 6
+        bytes_e = 8 * (2*ndof_e**2 + 2*nPg*nC*ndof_e)
+        chunks = self._Get_assembly_chunks(bytes_e)
+
+        tic = Tic()
 
         # Assembly
-        self.__Ku = sparse.csr_matrix((Ku_e.ravel(), (linesVector_e, columnsVector_e)), shape=(Ndof, Ndof))
-        """Kglob matrix for the displacement problem (Ndof, Ndof)"""
+        Construct_e = lambda elements: self.__Construct_Local_Matrix(elements, jacobian_e_pg, rho_e_pg)
+        if len(chunks) == 1:
+            # all the elements are assembled at once
+            chunks = [slice(None)]
+        self.__Ku, self.__Mu = mesh.Assemble_matrix_chunks(Construct_e, chunks, self.dim, Ndof, self._Use_symmetric_storage(ModelType.elastic))
+        """Kglob and Mglob matrices for the displacement problem (Ndof, Ndof)"""
 
         # Here I'm initializing Fu because I'd have to calculate the volumetric forces in __Construct_Local_Matrix.
         self.__Fu = sparse.csr_matrix((Ndof, 1))
@@ -168,10 +185,169 @@ class ElasticSimu(_Simu):
         # plt.spy(self.__Ku)
         # plt.show()
 
-        self.__Mu = sparse.csr_matrix((Mu_e.ravel(), (linesVector_e, columnsVector_e)), shape=(Ndof, Ndof))
-        """Mglob matrix for the displacement problem (Ndof, Ndof)"""
+        tic.Tac("Matrix","Construct and assemble Ku, Mu and Fu", self._verbosity)
+
+    @property
+    def matrixFree(self) -> bool:
+        """The stiffness matrix is not assembled and the system is solved with an iterative solver (cg, bicg, gmres, lgmres).\n
+        Ku is then applied element by element with Get_K_operator() and preconditioned with its block diagonal (see Get_K_diagonal()).\n
+        Only available for the elliptic algorithm without lagrange conditions, otherwise Ku is assembled."""
+        return self.__matrixFree
+
+    @matrixFree.setter
+    def matrixFree(self, value: bool) -> None:
+        self.__matrixFree = bool(value)
+
+    def __Get_MatrixFree_Data(self) -> tuple[StrainOperator, np.ndarray]:
+        """Returns the strain operator and C used to apply Ku without assembling it.\n
+        In 2D, wJ_e_pg of the strain operator is multiplied by the thickness.\n
+        C is kept as a (c, c) matrix when the material is homogeneous, otherwise (Ne, nPg, c, c)."""
+
+        matrixType = MatrixType.rigi
+
+        mesh = self.mesh
+        strainOp = mesh.Get_strainOperator(matrixType)
+        if self.dim == 2:
+            strainOp = StrainOperator(strainOp.dN_e_pg, strainOp.wJ_e_pg * self.material.thickness)
+
+        C = self.material.C
+        if C.ndim > 2:
+            C = Reshape_variable(C, mesh.Ne, strainOp.nPg)
+
+        return strainOp, C
+
+    def Get_K_operator(self, dofsUnknown: np.ndarray=None) -> sla.LinearOperator:
+        """Returns Ku as a linear operator without assembling it.\n
+        Ku u = sum_e int_Oe B_e' C B_e u_e dOe
+
+        Parameters
+        ----------
+        dofsUnknown : np.ndarray, optional
+            unknown dofs, by default None\n
+            If given, the operator is restricted to the unknown dofs (the known dofs are set to 0).
+
+        Returns
+        -------
+        sla.LinearOperator
+            (Ndof, Ndof) or (len(dofsUnknown), len(dofsUnknown)) operator
+        """
+
+        mesh = self.mesh
+        Ndof = mesh.Nn * self.dim
+        assembly_e = mesh.assembly_e
+        rows = assembly_e.ravel()
+
+        strainOp, C = self.__Get_MatrixFree_Data()
+        subC = 'cd' if C.ndim == 2 else 'epcd'
+
+        def K_dot(u: np.ndarray) -> np.ndarray:
+            Eps_e_pg = strainOp.apply(u.ravel()[assembly_e])
+            Sig_e_pg = np.einsum(f'{subC},epd->epc', C, Eps_e_pg, optimize='optimal')
+            F_e = strainOp.applyT(Sig_e_pg)
+            return np.bincount(rows, F_e.ravel(), minlength=Ndof)
+
+        if dofsUnknown is None:
+            matvec = K_dot
+            size = Ndof
+        else:
+            dofsUnknown = np.asarray(dofsUnknown, dtype=int)
+            size = dofsUnknown.size
+            def matvec(ui: np.ndarray) -> np.ndarray:
+                u = np.zeros(Ndof)
+                u[dofsUnknown] = ui.ravel()
+                return K_dot(u)[dofsUnknown]
+
+        # Ku is symmetric
+        return sla.LinearOperator((size, size), matvec=matvec, rmatvec=matvec, dtype=float)
+
+    def Get_K_diagonal(self, block=False) -> np.ndarray:
+        """Returns the diagonal of Ku without assembling it.
+
+        Parameters
+        ----------
+        block : bool, optional
+            returns the (dim, dim) diagonal blocks of each node, by default False
+
+        Returns
+        -------
+        np.ndarray
+            (Ndof) diagonal or (Nn, dim, dim) diagonal blocks
+        """
+
+        mesh = self.mesh
+        Nn, nPe, dim = mesh.Nn, mesh.nPe, self.dim
+        connect = mesh.connect
+
+        strainOp, C = self.__Get_MatrixFree_Data()
+        dN_e_pg, wJ_e_pg = strainOp.dN_e_pg, strainOp.wJ_e_pg
+        op = StrainOperator.Get_operator(dim)
+        subC = 'cd' if C.ndim == 2 else 'epcd'
+
+        blocks_e = np.zeros((mesh.Ne, nPe, dim, dim))
+        for n in range(nPe):
+            B_e_pg = np.einsum('cij,epj->epci', op, dN_e_pg[:,:,:,n], optimize='optimal')
+            blocks_e[:,n] = np.einsum(f'epci,{subC},epdk,ep->eik', B_e_pg, C, B_e_pg, wJ_e_pg, optimize='optimal')
+
+        indexes = connect[:,:,np.newaxis] * dim**2 + np.arange(dim**2)
+        blocks = np.bincount(indexes.ravel(), blocks_e.ravel(), minlength=Nn*dim**2).reshape(Nn, dim, dim)
+
+        if block:
+            return blocks
+        else:
+            d = np.arange(dim)
+            return blocks[:,d,d].ravel()
+
+    def Get_K_preconditioner(self, dofsUnknown: np.ndarray=None, block=True) -> sla.LinearOperator:
+        """Returns the (block) Jacobi preconditioner of Ku computed without assembling Ku.
+
+        Parameters
+        ----------
+        dofsUnknown : np.ndarray, optional
+            unknown dofs, by default None\n
+            If given, the preconditioner is restricted to the unknown dofs.
+        block : bool, optional
+            uses the inverse of the (dim, dim) nodal blocks instead of the diagonal, by default True
+
+        Returns
+        -------
+        sla.LinearOperator
+            approximation of inv(Ku)
+        """
+
+        Nn, dim = self.mesh.Nn, self.dim
+        Ndof = Nn * dim
+
+        if dofsUnknown is None:
+            dofsUnknown = np.arange(Ndof)
+        else:
+            dofsUnknown = np.asarray(dofsUnknown, dtype=int)
+        size = dofsUnknown.size
+
+        blocks = self.Get_K_diagonal(block=True)
+
+        # removes the known dofs from the blocks
+        isUnknown = np.zeros(Ndof, dtype=bool)
+        isUnknown[dofsUnknown] = True
+        isUnknown = isUnknown.reshape(Nn, dim)
+        blocks *= isUnknown[:,:,np.newaxis] & isUnknown[:,np.newaxis]
+        d = np.arange(dim)
+        diag = blocks[:,d,d]
+        diag[diag == 0] = 1 # known dofs and nodes not used by the elements
+        blocks[:,d,d] = diag
+
+        if block:
+            invBlocks = np.linalg.inv(blocks)
+            def matvec(ri: np.ndarray) -> np.ndarray:
+                r = np.zeros(Ndof)
+                r[dofsUnknown] = ri.ravel()
+                z = np.einsum('nij,nj->ni', invBlocks, r.reshape(Nn, dim), optimize='optimal')
+                return z.ravel()[dofsUnknown]
+        else:
+            invDiag = 1 / diag.ravel()[dofsUnknown]
+            def matvec(ri: np.ndarray) -> np.ndarray:
+                return invDiag * ri.ravel()
 
-        tic.Tac("Matrix","Assembly Ku, Mu and Fu", self._verbosity)
+        return sla.LinearOperator((size, size), matvec=matvec, rmatvec=matvec, dtype=float)
 
     def Set_Rayleigh_Damping_Coefs(self, coefM=0.0, coefK=0.0):
         """Sets damping coefficients."""
@@ -419,8 +595,7 @@ class ElasticSimu(_Simu):
 
         tic = Tic()        
         u_e = u[self.mesh.assembly_e]
-        B_dep_e_pg = self.mesh.Get_B_e_pg(matrixType)
-        Epsilon_e_pg: np.ndarray = np.einsum('epij,ej->epi', B_dep_e_pg, u_e, optimize='optimal')
+        Epsilon_e_pg = self.mesh.Get_strainOperator(matrixType).apply(u_e)
         
         tic.Tac("Matrix", "Epsilon_e_pg", False)
 
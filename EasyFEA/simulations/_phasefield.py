@@ -41,6 +41,8 @@ class PhaseFieldSimu(_Simu):
         super().__init__(mesh, model, verbosity, useNumba, useIterativeSolvers)
         
         # Init internal variable
+        self.__Ku: sparse.csr_matrix = None
+        self.__Kd: sparse.csr_matrix = None
         self.__psiP_e_pg = []
         self.__old_psiP_e_pg = [] # old positive elastic energy density psiPlus(e, pg, 1) to use the miehe history field
         self.Solver_Set_Elliptic_Algorithm()
@@ -73,6 +75,14 @@ class PhaseFieldSimu(_Simu):
     def Get_problemTypes(self) -> list[ModelType]:
         return [ModelType.damage, ModelType.elastic]
 
+    def Is_symmetric(self, problemType=None) -> bool:
+        if problemType in [ModelType.elastic, None]:
+            # the degraded stiffness Ku = g(d) * cP + cM is not symmetric if cP and cM mix the positive and negative parts
+            SplitType = Materials.PhaseField.SplitType
+            return self.phaseFieldModel.split not in [SplitType.Zhang, SplitType.AnisotStress_PM, SplitType.AnisotStress_MP, SplitType.AnisotStrain_PM, SplitType.AnisotStrain_MP]
+        # the damage matrix Kd (reaction + diffusion) is symmetric
+        return True
+
     def Get_lb_ub(self, problemType: ModelType) -> tuple[np.ndarray, np.ndarray]:
         
         if problemType == ModelType.damage:
@@ -142,14 +152,14 @@ class PhaseFieldSimu(_Simu):
                 self.__updatedDisplacement = True
             size = self.__Ku.shape[0]
             initcsr = sparse.csr_matrix((size, size))
-            return self.__Ku.copy(), initcsr, initcsr, self.__Fu.copy()
+            return self._Get_matrix(self.__Ku), initcsr, initcsr, self._Get_matrix(self.__Fu)
         else:
             if not self.__updatedDamage:
                 self.__Assembly_damage()
                 self.__updatedDamage = True
             size = self.__Kd.shape[0]
             initcsr = sparse.csr_matrix((size, size))
-            return self.__Kd.copy(), initcsr, initcsr, self.__Fd.copy()
+            return self._Get_matrix(self.__Kd), initcsr, initcsr, self._Get_matrix(self.__Fd)
 
     def _Update(self, observable: Observable, event: str) -> None:
         if isinstance(observable, _IModel):
@@ -172,6 +182,17 @@ class PhaseFieldSimu(_Simu):
         """The matrix system associated with the damage problem is updated."""
         self.__updatedDisplacement = not value
         """The matrix system associated with the displacement problem is updated."""
+        if value:
+            self._factorizations.Update()
+
+    def __Update_Factorizations(self, problemType: ModelType, oldK: sparse.csr_matrix, newK: sparse.csr_matrix) -> None:
+        """Removes the stored factorization if the new matrix differs from the old one."""
+        if isinstance(oldK, sparse.csr_matrix) and oldK.shape == newK.shape\
+            and np.array_equal(oldK.indptr, newK.indptr) and np.array_equal(oldK.indices, newK.indices)\
+            and np.array_equal(oldK.data, newK.data):
+            # same matrix, the factorization can be reused
+            return
+        self._factorizations.Update(problemType)
 
     def Get_x0(self, problemType=None):
         
@@ -319,43 +340,35 @@ class PhaseFieldSimu(_Simu):
 
     # ------------------------------------------- Elastic problem -------------------------------------------
 
-    def __Construct_Elastic_Matrix(self) -> np.ndarray:
-        """Computes the elementary stiffness matrices for the elastic problem."""
+    def __Construct_Elastic_Matrix(self, elements: slice, g_e_pg: np.ndarray) -> np.ndarray:
+        """Computes the elementary stiffness matrices of the elements for the elastic problem.\n
+        Ku_e is computed with the strain operator of the elements, without building the B matrices (with numba if useNumba)."""
 
         matrixType=MatrixType.rigi
 
         # Data
         mesh = self.mesh
-        
-        B_dep_e_pg = mesh.Get_B_e_pg(matrixType)
-        leftDepPart = mesh.Get_leftDispPart(matrixType) # -> jacobian_e_pg * weight_pg * B_dep_e_pg'
-
-        d = self.damage
         u = self.displacement
+        strainOp = mesh.Get_strainOperator(matrixType, None if elements == slice(None) else elements)
 
-        phaseFieldModel = self.phaseFieldModel
-        
         # compute strain field
-        Epsilon_e_pg = self._Calc_Epsilon_e_pg(u, matrixType)
+        Epsilon_e_pg = strainOp.apply(u[mesh.assembly_e[elements]])
+
+        phaseFieldModel = self.phaseFieldModel
 
         # compute the splited stifness matrices for the given strain field.
         cP_e_pg, cM_e_pg = phaseFieldModel.Calc_C(Epsilon_e_pg)
-
-        tic = Tic()
         
         # compute c such that: c = g(d) * cP + cM
-        g_e_pg = phaseFieldModel.Get_g_e_pg(d, mesh, matrixType)
-        cP_e_pg = np.einsum('ep,epij->epij', g_e_pg, cP_e_pg, optimize='optimal')
+        cP_e_pg = np.einsum('ep,epij->epij', g_e_pg[elements], cP_e_pg, optimize='optimal')
         c_e_pg = cP_e_pg + cM_e_pg
         
         # stiffness matrix for each element
-        Ku_e = np.sum(leftDepPart @ c_e_pg @ B_dep_e_pg, axis=1)
+        Ku_e = strainOp.stiffness(c_e_pg, self.useNumba)
 
         if self.dim == 2:
             thickness = self.phaseFieldModel.thickness
             Ku_e *= thickness
-        
-        tic.Tac("Matrix","Construction Ku_e", self._verbosity)
 
         return Ku_e
  
@@ -368,16 +381,28 @@ class PhaseFieldSimu(_Simu):
         
         Ndof += self._Bc_Lagrange_dim(ModelType.elastic)
 
-        Ku_e = self.__Construct_Elastic_Matrix()
+        matrixType = MatrixType.rigi
+        g_e_pg = self.phaseFieldModel.Get_g_e_pg(self.damage, mesh, matrixType)
 
-        tic = Tic()
+        # memory used per element: Ku_e, B_e_pg, c @ B_e_pg, cP_e_pg, cM_e_pg and c_e_pg (the B matrices are not stored in the mesh)
+        nPg = mesh.Get_nPg(matrixType)
+        ndof_e = mesh.nPe*self.dim
+        nC = 3 if self.dim == 2 else 6
+        bytes_e = 8 * (ndof_e**2 + 2*nPg*nC*ndof_e + 3*nPg*nC**2)
+        chunks = self._Get_assembly_chunks(bytes_e)
+        if len(chunks) == 1 or self.phaseFieldModel.material.isHeterogeneous:
+            # all the elements are assembled at once
+            # the split of heterogeneous materials needs all the elements
+            chunks = [slice(None)]
 
-        linesVector_e = mesh.linesVector_e.ravel()
-        columnsVector_e = mesh.columnsVector_e.ravel()
+        tic = Tic()
 
-        # Assembly
-        self.__Ku = sparse.csr_matrix((Ku_e.ravel(), (linesVector_e, columnsVector_e)), shape=(Ndof, Ndof))
+        # Construction and assembly
+        oldKu = self.__Ku
+        Construct_e = lambda elements: self.__Construct_Elastic_Matrix(elements, g_e_pg)
+        self.__Ku = mesh.Assemble_matrix_chunks(Construct_e, chunks, self.dim, Ndof, self._Use_symmetric_storage(ModelType.elastic))
         """Kglob matrix for the displacement problem (Ndof, Ndof)"""
+        self.__Update_Factorizations(ModelType.elastic, oldKu, self.__Ku)
         
         self.__Fu = sparse.csr_matrix((Ndof, 1))
         """Fglob vector for the displacement problem (Ndof, 1)"""
@@ -387,7 +412,7 @@ class PhaseFieldSimu(_Simu):
         # plt.spy(self.__Ku)
         # plt.show()        
 
-        tic.Tac("Matrix","Assembly Ku and Fu", self._verbosity)
+        tic.Tac("Matrix","Construct and assemble Ku and Fu", self._verbosity)
         # We ensure the matrices are always updated with the latest damage or displacement results.
         # Therefore, we don't specify that the matrices have been updated.
         return self.__Ku
@@ -468,7 +493,6 @@ class PhaseFieldSimu(_Simu):
 
         # K * Laplacien(d) + r * d = F        
         ReactionPart_e_pg = mesh.Get_ReactionPart_e_pg(matrixType) # -> jacobian_e_pg * weight_pg * N_pg' * N_pg
-        DiffusePart_e_pg = mesh.Get_DiffusePart_e_pg(matrixType) # -> jacobian_e_pg * weight_pg * dN_e_pg'
         SourcePart_e_pg = mesh.Get_SourcePart_e_pg(matrixType) # -> jacobian_e_pg, weight_pg, N_pg'
         
         tic = Tic()
@@ -477,8 +501,22 @@ class PhaseFieldSimu(_Simu):
         K_r_e = np.einsum('ep,epij->eij', r_e_pg, ReactionPart_e_pg, optimize='optimal')
 
         # The part that involves diffusion K -> k_e_pg * jacobian_e_pg * weight_pg * dN_e_pg' * A * dN_e_pg
-        k_e_pg = Reshape_variable(k, Ne, nPg)
-        K_K_e = np.einsum('ep,epij,jk,epkl->eil', k_e_pg, DiffusePart_e_pg, A, dN_e_pg, optimize='optimal')
+        if mesh.groupElem.isConstantStrain:
+            # dN_e_pg is constant in the elements (TRI3, TETRA4) and is only multiplied once
+            # sum_p k_p * wJ_p * dN' * A * dN = (sum_p k_p * wJ_p) * dN' * A * dN
+            wJ_e_pg = mesh.Get_jacobian_e_pg(matrixType) * mesh.Get_weight_pg(matrixType)
+            k_e_pg = k if isinstance(k, (int,float)) else Reshape_variable(k, Ne, nPg)
+            kwJ_e = np.sum(k_e_pg * wJ_e_pg, axis=1)
+            dN_e = dN_e_pg[:,0]
+            K_K_e = np.einsum('e,eji,jk,ekl->eil', kwJ_e, dN_e, A, dN_e, optimize='optimal')
+        elif isinstance(k, (int,float)):
+            DiffusePart_e_pg = mesh.Get_DiffusePart_e_pg(matrixType) # -> jacobian_e_pg * weight_pg * dN_e_pg'
+            # homogeneous k is factored out instead of being repeated on (e, p)
+            K_K_e = k * np.einsum('epij,jk,epkl->eil', DiffusePart_e_pg, A, dN_e_pg, optimize='optimal')
+        else:
+            DiffusePart_e_pg = mesh.Get_DiffusePart_e_pg(matrixType)
+            k_e_pg = Reshape_variable(k, Ne, nPg)
+            K_K_e = np.einsum('ep,epij,jk,epkl->eil', k_e_pg, DiffusePart_e_pg, A, dN_e_pg, optimize='optimal')
         
         # Source part Fd_e -> f_e_pg * jacobian_e_pg, weight_pg, N_pg'
         Fd_e = np.einsum('ep,epij->eij', f_e_pg, SourcePart_e_pg, optimize='optimal')
@@ -500,8 +538,6 @@ class PhaseFieldSimu(_Simu):
         # Data
         mesh = self.mesh
         Ndof = mesh.Nn
-        linesScalar_e = mesh.linesScalar_e.ravel()
-        columnsScalar_e = mesh.columnsScalar_e.ravel()
 
         # Additional dimension linked to the use of lagrange coefficients        
         Ndof += self._Bc_Lagrange_dim(ModelType.damage)
@@ -512,11 +548,12 @@ class PhaseFieldSimu(_Simu):
         # Assembly
         tic = Tic()        
 
-        self.__Kd = sparse.csr_matrix((Kd_e.ravel(), (linesScalar_e, columnsScalar_e)), shape = (Ndof, Ndof))
+        oldKd = self.__Kd
+        self.__Kd = mesh.Assemble_matrix(Kd_e, 1, Ndof, self._Use_symmetric_storage(ModelType.damage))
         """Kglob for damage problem (Ndof, Ndof)"""
+        self.__Update_Factorizations(ModelType.damage, oldKd, self.__Kd)
         
-        lignes = mesh.connect.ravel()
-        self.__Fd = sparse.csr_matrix((Fd_e.ravel(), (lignes, np.zeros(len(lignes)))), shape = (Ndof, 1))
+        self.__Fd = mesh.Assemble_vector(Fd_e, 1, Ndof)
         """Fglob for damage problem (Ndof, 1)"""        
 
         tic.Tac("Matrix","Assembly Kd and Fd", self._verbosity)
@@ -688,7 +725,7 @@ class PhaseFieldSimu(_Simu):
         tic = Tic()
 
         u = self.displacement.reshape(-1,1)
-        Psi_Elas = 1/2 * float(u.T @ Ku @ u)
+        Psi_Elas = 1/2 * float(u.T @ self._Dot(ModelType.elastic, Ku, u))
 
         tic.Tac("PostProcessing", "Calc Psi Elas", False)
         
@@ -702,7 +739,7 @@ class PhaseFieldSimu(_Simu):
         tic = Tic()
 
         d = self.damage.reshape(-1,1)
-        Psi_Crack = 1/2 * float(d.T @ Kd @ d)
+        Psi_Crack = 1/2 * float(d.T @ self._Dot(ModelType.damage, Kd, d))
 
         tic.Tac("PostProcessing", "Calc Psi Crack", False)
 
@@ -726,8 +763,7 @@ class PhaseFieldSimu(_Simu):
         
         tic = Tic()        
         u_e = sol[self.mesh.assembly_e]
-        B_dep_e_pg = self.mesh.Get_B_e_pg(matrixType)
-        Epsilon_e_pg = np.einsum('epij,ej->epi', B_dep_e_pg, u_e, optimize='optimal')            
+        Epsilon_e_pg = self.mesh.Get_strainOperator(matrixType).apply(u_e)
         
         tic.Tac("Matrix", "Epsilon_e_pg", False)
 
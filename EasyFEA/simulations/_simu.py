@@ -4,8 +4,9 @@
 
 from abc import ABC, abstractmethod
 import pickle
+import copy
 from datetime import datetime
-from typing import Union
+from typing import Union, Callable
 import numpy as np
 from scipy import sparse
 import textwrap
@@ -19,7 +20,7 @@ from ..fem import Mesh, MatrixType, BoundaryCondition, LagrangeCondition
 # materials
 from ..materials import ModelType, _IModel, Reshape_variable
 # simu
-from .Solvers import _Solve, _Solve_Axb, _Available_Solvers, ResolType, AlgoType
+from .Solvers import _Solve, _Solve_Axb, _Solve_multiple, _Available_Solvers, _Factorizations, _Dot, _Get_full_matrix, ResolType, AlgoType
 
 # ----------------------------------------------
 # _Simu
@@ -107,6 +108,13 @@ class _Simu(_IObserver, ABC):
         """Returns the degrees of freedom per node."""
         pass
 
+    @abstractmethod
+    def Is_symmetric(self, problemType=None) -> bool:
+        """Returns whether the matrices (K, C, M) of the problem type are symmetric.\n
+        Symmetry is a property of the physical model and is never checked numerically.\n
+        Symmetric matrices become positive definite once the Dirichlet conditions are applied, the systems augmented with lagrange multipliers remain symmetric but are indefinite."""
+        pass
+
     # Solvers
     @abstractmethod
     def Get_K_C_M_F(self, problemType=None) -> tuple[sparse.csr_matrix, sparse.csr_matrix, sparse.csr_matrix, sparse.csr_matrix]:
@@ -260,6 +268,30 @@ class _Simu(_IObserver, ABC):
 
         self.__model: _IModel = model
 
+        self._factorizations = _Factorizations()
+        """Factorizations reused while the matrices and the unknown dofs remain unchanged."""
+
+        self.__Bc_version = 0
+        """Incremented each time the Dirichlet conditions are modified."""
+
+        self.__dict_dofs_known_unknown: dict[str, tuple] = {}
+        """(Bc_version, nDof, dofsKnown, dofsUnknown) for each problem type"""
+
+        self.__zeroCopy = False
+        """Assembled matrices are returned as read-only views instead of copies."""
+
+        self.__useInt32Matrices = True
+        """Assembled matrices use int32 indices whenever their size allows it."""
+
+        self.__useSymmetricStorage = False
+        """Only the upper triangle of the symmetric matrices is assembled and stored."""
+
+        self.__assemblyChunkSize: int = None
+        """Maximum number of elements assembled at once."""
+
+        self.__assemblyMaxMemory: float = None
+        """Memory (MB) used by the elementary matrices of one assembly block."""
+
         self.__dim: int = model.dim
         """Simulation dimension."""
 
@@ -497,6 +529,133 @@ class _Simu(_IObserver, ABC):
         self.__model.useNumba = value
         self.__useNumba = value
 
+    @property
+    def zeroCopy(self) -> bool:
+        """Get_K_C_M_F returns the assembled matrices as read-only views instead of copies.\n
+        Use mesh.zeroCopy to do the same with the matrices stored in the mesh."""
+        return self.__zeroCopy
+
+    @zeroCopy.setter
+    def zeroCopy(self, value: bool) -> None:
+        self.__zeroCopy = bool(value)
+
+    @property
+    def useInt32Matrices(self) -> bool:
+        """The assembled matrices and the matrices sent to the solvers use int32 indices (indptr and indices) whenever nnz and the size of the matrix are < 2**31.\n
+        Halves the memory used by the indices. Otherwise int64 indices are used.\n
+        The assembly indexes stored in the mesh are set with mesh.useInt32Indexes."""
+        return self.__useInt32Matrices
+
+    @useInt32Matrices.setter
+    def useInt32Matrices(self, value: bool) -> None:
+        value = bool(value)
+        if value != self.useInt32Matrices:
+            self.__useInt32Matrices = value
+            self.Need_Update()
+
+    def _Get_index_dtype(self, matrix: sparse.csr_matrix) -> type:
+        """Returns the integer type of the indices used by the matrix (np.int32 or np.int64)."""
+        maxValue = max(*matrix.shape, matrix.nnz)
+        if self.useInt32Matrices and maxValue < np.iinfo(np.int32).max:
+            return np.int32
+        else:
+            return np.int64
+
+    def _Set_index_dtype(self, matrix: sparse.csr_matrix, inPlace=False) -> sparse.csr_matrix:
+        """Converts the indices of the csr matrix (indptr and indices) according to useInt32Matrices.\n
+        If inPlace, the matrix is modified and returned, otherwise a shallow copy sharing the data of the matrix is returned.\n
+        The indices are not copied if they already have the right type."""
+        dtype = self._Get_index_dtype(matrix)
+        if matrix.indices.dtype == dtype and matrix.indptr.dtype == dtype:
+            return matrix
+        if not inPlace:
+            matrix = copy.copy(matrix)
+        matrix.indices = matrix.indices.astype(dtype)
+        matrix.indptr = matrix.indptr.astype(dtype)
+        return matrix
+
+    @property
+    def useSymmetricStorage(self) -> bool:
+        """Only the upper triangle of the symmetric matrices (K, C, M) is assembled and stored.\n
+        Get_K_C_M_F then returns upper triangular matrices and the systems are solved with the symmetric modes of the solvers (pypardiso mtype=2, PETSc SBAIJ).\n
+        The matrices of the non-symmetric problem types are always stored in full (see `_Use_symmetric_storage()`).\n
+        The full matrices are rebuilt for the systems with lagrange multipliers and for the other solvers."""
+        return self.__useSymmetricStorage
+
+    @useSymmetricStorage.setter
+    def useSymmetricStorage(self, value: bool) -> None:
+        value = bool(value)
+        if value != self.useSymmetricStorage:
+            assert not value or any(self.Is_symmetric(problemType) for problemType in self.Get_problemTypes()), "The matrices must be symmetric."
+            self.__useSymmetricStorage = value
+            self.Need_Update()
+
+    def _Use_symmetric_storage(self, problemType: ModelType) -> bool:
+        """Returns whether only the upper triangle of the matrices of the problem type is stored (useSymmetricStorage and symmetric matrices)."""
+        return self.useSymmetricStorage and self.Is_symmetric(problemType)
+
+    def _Dot(self, problemType: ModelType, matrix: sparse.csr_matrix, x: Union[np.ndarray, sparse.csr_matrix]) -> Union[np.ndarray, sparse.csr_matrix]:
+        """Computes matrix @ x for a matrix returned by Get_K_C_M_F (full or upper triangular, see _Use_symmetric_storage())."""
+        return _Dot(matrix, x, self._Use_symmetric_storage(problemType))
+
+    def _Get_matrix(self, matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Returns the assembled matrix as a read-only view if zeroCopy is enabled, otherwise returns a copy.\n
+        The indices of the matrix follow useInt32Matrices."""
+        # the stored matrix is converted once
+        matrix = self._Set_index_dtype(matrix, inPlace=True)
+        if self.zeroCopy:
+            for array in [matrix.data, matrix.indices, matrix.indptr]:
+                array.flags.writeable = False
+            return matrix
+        else:
+            # scipy may downcast the indices of the copy
+            return self._Set_index_dtype(matrix.copy(), inPlace=True)
+
+    @property
+    def assemblyChunkSize(self) -> Union[int, None]:
+        """Maximum number of elements assembled at once (None -> all the elements).\n
+        The elementary matrices are then computed and added to the csr matrices block by block, which bounds the memory used during the assembly."""
+        return self.__assemblyChunkSize
+
+    @assemblyChunkSize.setter
+    def assemblyChunkSize(self, value: Union[int, None]) -> None:
+        assert value is None or (isinstance(value, (int, np.integer)) and value > 0), "assemblyChunkSize must be None or an integer > 0."
+        self.__assemblyChunkSize = None if value is None else int(value)
+
+    @property
+    def assemblyMaxMemory(self) -> Union[float, None]:
+        """Memory (in MB) allowed for the elementary matrices and the intermediate arrays of one assembly block (None -> no limit).\n
+        The number of elements assembled at once is deduced from this budget (see assemblyChunkSize)."""
+        return self.__assemblyMaxMemory
+
+    @assemblyMaxMemory.setter
+    def assemblyMaxMemory(self, value: Union[float, None]) -> None:
+        assert value is None or value > 0, "assemblyMaxMemory must be None or > 0."
+        self.__assemblyMaxMemory = None if value is None else float(value)
+
+    def _Get_assembly_chunks(self, bytes_e: int) -> list[slice]:
+        """Returns the blocks of elements assembled at once according to assemblyChunkSize and assemblyMaxMemory.
+
+        Parameters
+        ----------
+        bytes_e : int
+            memory used per element to build the elementary matrices
+
+        Returns
+        -------
+        list[slice]
+            blocks of elements (a single block if no limit is set)
+        """
+        Ne = self.mesh.Ne
+        chunkSize = max(Ne, 1)
+
+        if self.assemblyChunkSize is not None:
+            chunkSize = min(chunkSize, self.assemblyChunkSize)
+        if self.assemblyMaxMemory is not None:
+            chunkSize = min(chunkSize, max(int(self.assemblyMaxMemory * 2**20 // bytes_e), 1))
+
+        return [slice(start, min(start + chunkSize, Ne)) for start in range(0, max(Ne, 1), chunkSize)]
+
     def __Update_mesh(self, iter: int) -> None:
         """Updates the mesh for the specified iteration.
 
@@ -528,6 +687,9 @@ class _Simu(_IObserver, ABC):
     def Need_Update(self, value=True) -> None:
         """Sets whether the simulation needs to reconstruct matrices K, C, M and F."""
         self.__needUpdate = value
+        if value:
+            # the matrices will be modified, the stored factorizations are no longer valid
+            self._factorizations.Update()
 
     # ----------------------------------------------
     # Solver
@@ -557,6 +719,11 @@ class _Simu(_IObserver, ABC):
         else:
             Display.MyPrintError(f"The solver {value} cannot be used. The solver must be in {solvers}")
 
+    @property
+    def factorizationStats(self) -> dict[str, int]:
+        """Number of solves that reused (hits) or computed (misses) a stored factorization."""
+        return self._factorizations.stats
+
     def Solver_Set_Elliptic_Algorithm(self) -> None:
         """Sets the algorithm's resolution properties for an elliptic problem.
 
@@ -621,6 +788,31 @@ class _Simu(_IObserver, ABC):
 
         return self._Get_u_n(self.problemType)
 
+    def Solve_multiple(self, list_Bc: list[Callable[[], None]]) -> np.ndarray:
+        """Computes the solution fields for several sets of boundary conditions sharing the same matrix system.\n
+        The matrix system is built and factorized once and all right-hand sides are solved as one block.\n
+        Only available for the elliptic algorithm. At the end, the last set of boundary conditions and its solution are kept in the simulation.
+
+        Parameters
+        ----------
+        list_Bc : list[Callable[[], None]]
+            Functions applying each set of boundary conditions (add_dirichlet, add_neumann, _Bc_Add_Lagrange, ...).\n
+            Bc_Init() is called before each function. All sets must use the same dofs and lagrange coefficients, only the values can change.
+
+        Returns
+        -------
+        np.ndarray
+            The solutions of the simulation (Nbc, Ndof).
+        """
+
+        problemType = self.problemType
+
+        x = _Solve_multiple(self, problemType, list_Bc)
+
+        self._Set_u_n(problemType, x[-1].copy())
+
+        return x
+
     def _Solver_Solve(self, problemType: ModelType) -> None:
         """Solves the problem."""
 
@@ -723,7 +915,7 @@ class _Simu(_IObserver, ABC):
             v_Tild_np1 = u_n + (1 - alpha) * dt * v_n
             v_Tild_np1 = sparse.csr_matrix(v_Tild_np1.reshape(-1, 1))
 
-            b = b + C.dot(v_Tild_np1 / (alpha * dt))
+            b = b + self._Dot(problemType, C, v_Tild_np1 / (alpha * dt))
 
         elif algo == AlgoType.hyperbolic:
             # Accel formulation
@@ -733,15 +925,15 @@ class _Simu(_IObserver, ABC):
                 __, dofsUnknown = self.Bc_dofs_known_unknow(problemType)
 
                 # don't change
-                bb = b - K.dot(sparse.csr_matrix(u_n.reshape(-1, 1)))
-                bb -= C.dot(sparse.csr_matrix(v_n.reshape(-1, 1)))                
+                bb = b - self._Dot(problemType, K, sparse.csr_matrix(u_n.reshape(-1, 1)))
+                bb -= self._Dot(problemType, C, sparse.csr_matrix(v_n.reshape(-1, 1)))
 
                 bbi = bb[dofsUnknown]
                 Aii = M[dofsUnknown, :].tocsc()[:, dofsUnknown].tocsr()
 
                 x0 = a_n[dofsUnknown]
 
-                ai_n = _Solve_Axb(self, problemType, Aii, bbi, x0, [], [])
+                ai_n = _Solve_Axb(self, problemType, Aii, bbi, x0, [], [], isUpper=self._Use_symmetric_storage(problemType))
 
                 a_n[dofsUnknown] = ai_n
 
@@ -757,8 +949,8 @@ class _Simu(_IObserver, ABC):
             vTild_np1 = v_n + (1 - gamma) * dt * a_n
 
             # dont change
-            b -= K.dot(uTild_np1.reshape(-1, 1))
-            b -= C.dot(vTild_np1.reshape(-1, 1))
+            b -= self._Dot(problemType, K, uTild_np1.reshape(-1, 1))
+            b -= self._Dot(problemType, C, vTild_np1.reshape(-1, 1))
             b = sparse.csr_matrix(b)
 
         tic.Tac("Solver", f"Neumann ({problemType}, {algo})", self._verbosity)
@@ -859,6 +1051,10 @@ class _Simu(_IObserver, ABC):
         elif resolution == ResolType.r3:
             # Penalization
 
+            if self._Use_symmetric_storage(problemType):
+                # the penalized matrix is not symmetric
+                A = _Get_full_matrix(A)
+
             A = A.tolil()
             b = b.tolil()
 
@@ -889,6 +1085,7 @@ class _Simu(_IObserver, ABC):
         """Lagrange conditions list[BoundaryCondition]"""
         self.__Bc_Display = []
         """Boundary conditions for display list[BoundaryCondition]"""
+        self.__Bc_version += 1
 
     @property
     def Bc_Dirichlet(self) -> list[BoundaryCondition]:
@@ -941,24 +1138,36 @@ class _Simu(_IObserver, ABC):
         return BoundaryCondition.Get_values(problemType, self.__Bc_Dirichlet)
 
     def Bc_dofs_known_unknow(self, problemType: ModelType) -> tuple[np.ndarray, np.ndarray]:
-        """Returns known and unknown dofs."""
+        """Returns known and unknown dofs (sorted).\n
+        The partition is stored for each problem type and rebuilt only when the Dirichlet dofs or the number of dofs change.\n
+        The returned arrays are the stored ones and are read-only, copy them before modifying them."""
         tic = Tic()
 
-        # Build known dofs
-        dofsKnown = []
+        nDof = self.mesh.Nn * self.Get_dof_n(problemType)
+        version = self.__Bc_version
 
-        dofsKnown = set(self.Bc_dofs_Dirichlet(problemType))
+        dict_partition = self.__dict_dofs_known_unknown
 
-        # Build unknown dofs
-        nDof = self.mesh.Nn * self.Get_dof_n(problemType)
+        entry = dict_partition.get(problemType, None)
+        if entry is not None and entry[:2] == (version, nDof):
+            return entry[2], entry[3]
 
-        dofsUnknown = set(range(nDof)) - dofsKnown
+        # Build known dofs
+        dofsKnown = np.unique(np.asarray(self.Bc_dofs_Dirichlet(problemType), dtype=int))
 
-        dofsKnown = np.asarray(list(dofsKnown), dtype=int)
-        dofsUnknown = np.asarray(list(dofsUnknown), dtype=int)
-        
-        test = dofsKnown.size + dofsUnknown.size
-        assert test == nDof, f"Problem under conditions dofsKnown + dofsUnknown - nDof = {test-nDof}"
+        if entry is not None and entry[1] == nDof and np.array_equal(entry[2], dofsKnown):
+            # same Dirichlet dofs with other values
+            dofsKnown, dofsUnknown = entry[2], entry[3]
+        else:
+            assert dofsKnown.size == 0 or (dofsKnown[0] >= 0 and dofsKnown[-1] < nDof), "Dirichlet dofs must be in [0, nDof["
+            # Build unknown dofs
+            isUnknown = np.ones(nDof, dtype=bool)
+            isUnknown[dofsKnown] = False
+            dofsUnknown = np.flatnonzero(isUnknown)
+            dofsKnown.flags.writeable = False
+            dofsUnknown.flags.writeable = False
+
+        dict_partition[problemType] = (version, nDof, dofsKnown, dofsUnknown)
 
         tic.Tac("Solver",f"Get dofs ({problemType})", self._verbosity)
 
@@ -1403,6 +1612,7 @@ class _Simu(_IObserver, ABC):
         new_Bc = BoundaryCondition(problemType, nodes, dofs, directions, dofsValues, f'Dirichlet {description}')
 
         self.__Bc_Dirichlet.append(new_Bc)
+        self.__Bc_version += 1
 
         tic.Tac("Boundary Conditions","Add Dirichlet condition", self._verbosity)
     
@@ -56,6 +56,10 @@ class ThermalSimu(_Simu):
     def Get_problemTypes(self) -> list[ModelType]:
         return [ModelType.thermal]
 
+    def Is_symmetric(self, problemType=None) -> bool:
+        # Kt (diffusion) and Ct (capacity) are symmetric
+        return True
+
     @property
     def thermalModel(self) -> Materials.Thermal:
         """Thermal simulation model."""
@@ -85,7 +89,7 @@ class ThermalSimu(_Simu):
             self.Need_Update(False)
         size = self.__Kt.shape[0]
         initcsr = sparse.csr_matrix((size, size))
-        return self.__Kt.copy(), self.__Ct.copy(), initcsr, self.__Ft.copy()
+        return self._Get_matrix(self.__Kt), self._Get_matrix(self.__Ct), initcsr, self._Get_matrix(self.__Ft)
 
     def __Construct_Thermal_Matrix(self) -> tuple[np.ndarray, np.ndarray]:
 
@@ -107,14 +111,19 @@ class ThermalSimu(_Simu):
         Ne = mesh.Ne
         nPg = weight_pg.size
 
-        k_e_pg = Reshape_variable(k, Ne, nPg)
-
-        Kt_e = np.einsum('ep,p,epji,ep,epjk->eik', jacobian_e_pg, weight_pg, D_e_pg, k_e_pg, D_e_pg, optimize="optimal")
-
-        rho_e_pg = Reshape_variable(rho, Ne, nPg)
-        c_e_pg = Reshape_variable(c, Ne, nPg)
+        # homogeneous properties are factored out instead of being repeated on (e, p)
+        if isinstance(k, (int,float)):
+            Kt_e = k * np.einsum('ep,p,epji,epjk->eik', jacobian_e_pg, weight_pg, D_e_pg, D_e_pg, optimize="optimal")
+        else:
+            k_e_pg = Reshape_variable(k, Ne, nPg)
+            Kt_e = np.einsum('ep,p,epji,ep,epjk->eik', jacobian_e_pg, weight_pg, D_e_pg, k_e_pg, D_e_pg, optimize="optimal")
 
-        Ct_e = np.einsum('ep,p,pji,ep,ep,pjk->eik', jacobian_e_pg, weight_pg, N_e_pg, rho_e_pg, c_e_pg, N_e_pg, optimize="optimal")
+        if isinstance(rho, (int,float)) and isinstance(c, (int,float)):
+            Ct_e = rho * c * np.einsum('ep,p,pji,pjk->eik', jacobian_e_pg, weight_pg, N_e_pg, N_e_pg, optimize="optimal")
+        else:
+            rho_e_pg = Reshape_variable(rho, Ne, nPg)
+            c_e_pg = Reshape_variable(c, Ne, nPg)
+            Ct_e = np.einsum('ep,p,pji,ep,ep,pjk->eik', jacobian_e_pg, weight_pg, N_e_pg, rho_e_pg, c_e_pg, N_e_pg, optimize="optimal")
 
         if self.dim == 2:
             thickness = thermalModel.thickness
@@ -129,8 +138,6 @@ class ThermalSimu(_Simu):
         # Data
         mesh = self.mesh
         Ndof = mesh.Nn
-        linesScalar_e = mesh.linesScalar_e.ravel()
-        columnsScalar_e = mesh.columnsScalar_e.ravel()
 
         # Additional dimension linked to the use of lagrange coefficients
         Ndof += self._Bc_Lagrange_dim(self.problemType)
@@ -140,13 +147,13 @@ class ThermalSimu(_Simu):
         
         tic = Tic()
 
-        self.__Kt = sparse.csr_matrix((Kt_e.ravel(), (linesScalar_e, columnsScalar_e)), shape = (Ndof, Ndof))
+        self.__Kt = mesh.Assemble_matrix(Kt_e, 1, Ndof, self._Use_symmetric_storage(ModelType.thermal))
         """Kglob for thermal problem (Ndof, Ndof)"""
         
         self.__Ft = sparse.csr_matrix((Ndof, 1))
         """Fglob vector for thermal problem (Ndof, 1)."""
 
-        self.__Ct = sparse.csr_matrix((Ct_e.ravel(), (linesScalar_e, columnsScalar_e)), shape = (Ndof, Ndof))
+        self.__Ct = mesh.Assemble_matrix(Ct_e, 1, Ndof, self._Use_symmetric_storage(ModelType.thermal))
         """Mglob for thermal problem (Ndof, Ndof)"""
 
         tic.Tac("Matrix","Assembly Kt, Mt and Ft", self._verbosity)
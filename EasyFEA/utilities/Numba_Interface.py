@@ -209,4 +209,121 @@ def Get_Cp_Cm_Stress(c: np.ndarray, sP_e_pg: np.ndarray, sM_e_pg: np.ndarray) ->
                             cP_e_pg[e,p,i,l] += c[j,i] * sP_e_pg[e,p,j,k] * c[k,l]
                             cM_e_pg[e,p,i,l] += c[j,i] * sM_e_pg[e,p,j,k] * c[k,l]
 
-    return cP_e_pg, cM_e_pg
\ No newline at end of file
+    return cP_e_pg, cM_e_pg
+
+
+def __Get_B_pattern(dim: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the non-zero values of the columns of B in Kelvin Mandel notation.\n
+    For the direction d of a node n: B[rows[d,m], n*dim+d] = coefs[d,m] * dN[derivs[d,m], n]"""
+    cM = 1/np.sqrt(2)
+    if dim == 2:
+        rows = np.array([[0,2],[1,2]])
+        derivs = np.array([[0,1],[1,0]])
+        coefs = np.array([[1,cM],[1,cM]])
+    else:
+        rows = np.array([[0,4,5],[1,3,5],[2,3,4]])
+        derivs = np.array([[0,2,1],[1,2,0],[2,1,0]])
+        coefs = np.array([[1,cM,cM],[1,cM,cM],[1,cM,cM]])
+    return rows, derivs, coefs
+
+@njit(cache=__USE_CACHE, fastmath=__USE_FASTMATH)
+def __Add_BtCB(dN: np.ndarray, c: np.ndarray, wJ: float, rows: np.ndarray, derivs: np.ndarray, coefs: np.ndarray, Bv: np.ndarray, CB: np.ndarray, Ke: np.ndarray, isSymmetric: bool) -> None:
+    """Ke += wJ * B' c B with B built from dN (dim, nPe) (only the upper part of Ke is computed if c is symmetric)."""
+
+    dim, nPe = dN.shape
+    dimC = c.shape[0]
+    ndof = nPe*dim
+
+    # non-zero values of B
+    for n in range(nPe):
+        for d in range(dim):
+            for m in range(dim):
+                Bv[n*dim+d,m] = coefs[d,m] * dN[derivs[d,m],n]
+
+    # CB = wJ c B
+    for j in range(ndof):
+        d = j % dim
+        for k in range(dimC):
+            value = 0.0
+            for m in range(dim):
+                value += c[k,rows[d,m]] * Bv[j,m]
+            CB[k,j] = wJ * value
+
+    # Ke += B' CB
+    for i in range(ndof):
+        d = i % dim
+        for j in range(i if isSymmetric else 0, ndof):
+            value = 0.0
+            for m in range(dim):
+                value += Bv[i,m] * CB[rows[d,m],j]
+            Ke[i,j] += value
+
+@njit(cache=__USE_CACHE, parallel=__USE_PARALLEL, fastmath=__USE_FASTMATH)
+def __Get_Ku_e(dN_e_pg: np.ndarray, wJ_e_pg: np.ndarray, c_e_pg: np.ndarray, rows: np.ndarray, derivs: np.ndarray, coefs: np.ndarray, isSymmetric: bool) -> np.ndarray:
+
+    if __USE_PARALLEL:
+        range = prange
+    else:
+        range = np.arange
+
+    Ne, nPg, dim, nPe = dN_e_pg.shape
+    dimC = c_e_pg.shape[-1]
+    ndof = nPe*dim
+
+    Ku_e = np.zeros((Ne, ndof, ndof))
+
+    # c_e_pg can be broadcasted along e or p (shape 1)
+    se = 1 if c_e_pg.shape[0] > 1 else 0
+    sp = 1 if c_e_pg.shape[1] > 1 else 0
+
+    for e in range(Ne):
+        Bv = np.empty((ndof, dim))
+        CB = np.empty((dimC, ndof))
+        Ke = Ku_e[e]
+        for p in np.arange(nPg):
+            c = c_e_pg[e*se, p*sp]
+            __Add_BtCB(dN_e_pg[e,p], c, wJ_e_pg[e,p], rows, derivs, coefs, Bv, CB, Ke, isSymmetric)
+        if isSymmetric:
+            # symmetric part
+            for i in np.arange(ndof):
+                for j in np.arange(i):
+                    Ke[i,j] = Ke[j,i]
+
+    return Ku_e
+
+def Get_Ku_e(dN_e_pg: np.ndarray, wJ_e_pg: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Computes the elementary stiffness matrices Ku_e = sum_p wJ_e_pg B_e_pg' c B_e_pg element by element without intermediate arrays.
+
+    Parameters
+    ----------
+    dN_e_pg : np.ndarray
+        shape functions derivatives (e, p, dim, nPe)
+    wJ_e_pg : np.ndarray
+        jacobian_e_pg * weight_pg (e, p)
+    c : np.ndarray
+        stiffness matrix in Kelvin Mandel notation\n
+        only the upper part of Ku_e is computed if c is symmetric (e.g. not for the anisotropic splits of the phase field)\n
+        homogeneous (3 or 6, 3 or 6) or heterogeneous (e, 3 or 6, 3 or 6) or (e, p, 3 or 6, 3 or 6)
+
+    Returns
+    -------
+    np.ndarray
+        Ku_e (e, nPe*dim, nPe*dim)
+    """
+    
+    Ne = dN_e_pg.shape[0]
+    dimC = c.shape[-1]
+    if c.ndim == 2:
+        c_e_pg = c.reshape(1, 1, dimC, dimC)
+    elif c.ndim == 3:
+        assert c.shape[0] == Ne, "c must be a (e, i, j) array."
+        c_e_pg = c.reshape(Ne, 1, dimC, dimC)
+    else:
+        c_e_pg = c
+
+    rows, derivs, coefs = __Get_B_pattern(dN_e_pg.shape[2])
+
+    # the matrices are cheap to check compared to the computation of Ku_e
+    isSymmetric = np.allclose(c_e_pg, c_e_pg.transpose(0,1,3,2), rtol=1e-12, atol=1e-12*np.abs(c_e_pg).max())
+
+    return __Get_Ku_e(dN_e_pg, wJ_e_pg, c_e_pg, rows, derivs, coefs, isSymmetric)
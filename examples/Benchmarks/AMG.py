@@ -0,0 +1,85 @@
+# Copyright (C) 2021-2024 Université Gustave Eiffel.
+# This file is part of the EasyFEA project.
+# EasyFEA is distributed under the terms of the GNU General Public License v3 or later, see LICENSE.txt and CREDITS.md for more information.
+
+"""Time used to solve linear elastic problems with cg preconditioned by the smoothed aggregation AMG (cg-amg), splu (scipy) and pypardiso."""
+
+from EasyFEA import Display, Tic, Mesher, ElemType, Materials, Simulations, plt, np
+from EasyFEA.Geoms import Domain, Point
+from EasyFEA.simulations.Solvers import _Available_Solvers, _Factorizations
+
+if __name__ == '__main__':
+
+    Display.Clear()
+
+    # ----------------------------------------------
+    # Configuration
+    # ----------------------------------------------
+    L = 1
+    # from 1e4 to 1e6 dofs
+    meshSizes2D = [L/70, L/140, L/280, L/560]
+    meshSizes3D = [L/12, L/20, L/30, L/50]
+    solvers = ["cg-amg", "scipy", "pypardiso"]
+    maxDofs = {"scipy": {2: 2e4, 3: 1e4}} # splu is too slow on large problems
+
+    for dim, meshSizes in zip([2, 3], [meshSizes2D, meshSizes3D]):
+
+        results: dict[str, list[tuple[int, float]]] = {solver: [] for solver in solvers}
+
+        for meshSize in meshSizes:
+
+            domain = Domain(Point(), Point(L,L), meshSize)
+            if dim == 2:
+                mesh = Mesher().Mesh_2D(domain, [], ElemType.TRI3)
+            else:
+                mesh = Mesher().Mesh_Extrude(domain, [], [0,0,L], [int(L/meshSize)], ElemType.TETRA4)
+
+            nodesX0 = mesh.Nodes_Conditions(lambda x,y,z: x==0)
+            nodesXL = mesh.Nodes_Conditions(lambda x,y,z: x==L)
+            directions = ["x","y","z"][:dim]
+
+            simu = Simulations.ElasticSimu(mesh, Materials.Elas_Isot(dim), verbosity=False)
+            simu.add_dirichlet(nodesX0, [0]*dim, directions)
+            simu.add_surfLoad(nodesXL, [-1], ["y"])
+            simu.Assembly()
+            simu.Need_Update(False)
+
+            Ndof = mesh.Nn * dim
+            u_ref = None
+
+            for solver in solvers:
+
+                if Ndof > maxDofs.get(solver, {}).get(dim, np.inf) or solver not in _Available_Solvers():
+                    continue
+
+                simu.solver = solver
+                # the factorizations and the preconditioners are not reused between the solvers
+                simu._factorizations = _Factorizations()
+
+                tic = Tic()
+                u = simu.Solve()
+                time = tic.Tac("Benchmark", solver, False)
+
+                if u_ref is None:
+                    u_ref = u
+                error = np.abs(u - u_ref).max() / np.abs(u_ref).max()
+
+                results[solver].append((Ndof, time))
+
+                print(f"{dim}D Ndof = {Ndof:>8}: {solver:>10} {time:.3f} s (error {error:.1e})")
+
+        # ----------------------------------------------
+        # Display
+        # ----------------------------------------------
+        ax = Display.Init_Axes()
+        for solver, values in results.items():
+            if len(values) == 0: continue
+            Ndofs, times = np.asarray(values).T
+            ax.loglog(Ndofs, times, '.-', label=solver)
+        ax.set_xlabel("Ndof")
+        ax.set_ylabel("time [s]")
+        ax.set_title(f"{dim}D elasticity")
+        ax.legend()
+        ax.grid()
+
+    plt.show()
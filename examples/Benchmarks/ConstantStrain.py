@@ -0,0 +1,97 @@
+# Copyright (C) 2021-2024 Université Gustave Eiffel.
+# This file is part of the EasyFEA project.
+# EasyFEA is distributed under the terms of the GNU General Public License v3 or later, see LICENSE.txt and CREDITS.md for more information.
+
+"""Memory and time used by the constant strain elements (TRI3, TETRA4) whose gradients are stored on a single integration point per element."""
+
+import tracemalloc
+
+from EasyFEA import Display, Tic, Mesher, ElemType, Materials, Simulations, plt, np
+from EasyFEA.fem import MatrixType
+from EasyFEA.Geoms import Domain, Point
+
+def Measure(func) -> tuple[float, float]:
+    """Returns the time (s) and the memory (MB) still allocated after func."""
+    tracemalloc.start()
+    tic = Tic()
+    func()
+    time = tic.Tac("Benchmark", func.__name__, False)
+    memory = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    return time, memory
+
+if __name__ == '__main__':
+
+    Display.Clear()
+
+    # ----------------------------------------------
+    # Configuration
+    # ----------------------------------------------
+    L = 1
+    meshSizes2D = [L/50, L/100, L/200, L/400]
+    meshSizes3D = [L/10, L/15, L/20, L/30]
+    matrixTypes = [MatrixType.rigi, MatrixType.mass]
+
+    for elemType, meshSizes in zip([ElemType.TRI3, ElemType.TETRA4], [meshSizes2D, meshSizes3D]):
+
+        results = []
+
+        for meshSize in meshSizes:
+
+            if elemType == ElemType.TRI3:
+                mesh = Mesher().Mesh_2D(Domain(Point(), Point(L,L), meshSize), [], elemType)
+            else:
+                domain = Domain(Point(), Point(L,L), meshSize)
+                mesh = Mesher().Mesh_Extrude(domain, [], [0,0,L], [int(L/meshSize)], elemType)
+            mesh.zeroCopy = True # avoids copying the matrices stored in the mesh
+
+            # ----------------------------------------------
+            # Gradients stored in the mesh
+            # ----------------------------------------------
+            groupElem = mesh.groupElem
+            def gradients():
+                return [(groupElem.Get_F_e_pg(matrixType), groupElem.Get_invF_e_pg(matrixType), groupElem.Get_jacobian_e_pg(matrixType, False), groupElem.Get_dN_e_pg(matrixType))
+                        for matrixType in matrixTypes]
+            time_g, stored = Measure(gradients)
+            # memory used if the gradients were stored on each integration point
+            repeated = sum(array.nbytes for arrays in gradients() for array in arrays) / 2**20
+
+            # ----------------------------------------------
+            # Assembly and strain evaluation
+            # ----------------------------------------------
+            simu = Simulations.ElasticSimu(mesh, Materials.Elas_Isot(mesh.dim), verbosity=False)
+            u = np.random.rand(mesh.Nn*mesh.dim)
+
+            def assembly():
+                simu.Assembly()
+            time_a = Measure(assembly)[0]
+
+            def strain():
+                for matrixType in matrixTypes:
+                    simu._Calc_Epsilon_e_pg(u, matrixType)
+            time_s = Measure(strain)[0]
+
+            results.append((mesh.Ne, stored, repeated, time_g, time_a, time_s))
+
+            print(f"{elemType:>8} Ne = {mesh.Ne:>7}: gradients {stored:.1f} MB instead of {repeated:.1f} MB ({time_g:.3f} s), assembly {time_a:.3f} s, strains {time_s:.3f} s")
+
+        # ----------------------------------------------
+        # Display
+        # ----------------------------------------------
+        Ne = [result[0] for result in results]
+
+        axMemory, axTime = plt.subplots(1, 2, figsize=(12,5))[1]
+        axMemory.loglog(Ne, [result[1] for result in results], '.-', label="single integration point")
+        axMemory.loglog(Ne, [result[2] for result in results], '.--', label="each integration point")
+        axMemory.set_ylabel("memory [MB]")
+        axTime.loglog(Ne, [result[3] for result in results], '.-', label="gradients")
+        axTime.loglog(Ne, [result[4] for result in results], '.-', label="assembly")
+        axTime.loglog(Ne, [result[5] for result in results], '.-', label="strains")
+        axTime.set_ylabel("time [s]")
+        for ax in [axMemory, axTime]:
+            ax.set_xlabel("Ne")
+            ax.set_title(elemType)
+            ax.legend()
+            ax.grid()
+
+    plt.show()
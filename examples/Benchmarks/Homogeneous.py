@@ -0,0 +1,101 @@
+# Copyright (C) 2021-2024 Université Gustave Eiffel.
+# This file is part of the EasyFEA project.
+# EasyFEA is distributed under the terms of the GNU General Public License v3 or later, see LICENSE.txt and CREDITS.md for more information.
+
+"""Memory and time saved by contracting homogeneous material properties against a single shared tensor instead of repeating them on (Ne, nPg)."""
+
+import tracemalloc
+
+from EasyFEA import Display, Tic, Mesher, ElemType, Materials, plt, np
+from EasyFEA.fem import MatrixType
+from EasyFEA.Geoms import Domain, Point
+
+def Measure(func) -> tuple[float, float]:
+    """Returns the time (s) and the memory peak (MB) used by func."""
+    tracemalloc.start()
+    tic = Tic()
+    func()
+    time = tic.Tac("Benchmark", func.__name__, False)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return time, peak
+
+if __name__ == '__main__':
+
+    Display.Clear()
+
+    # ----------------------------------------------
+    # Configuration
+    # ----------------------------------------------
+    L = 1
+    meshSize2D = L/100
+    meshSize3D = L/15
+    elemTypes = [ElemType.TRI3, ElemType.TRI6, ElemType.QUAD4, ElemType.QUAD8,
+                 ElemType.TETRA4, ElemType.TETRA10, ElemType.HEXA8, ElemType.PRISM6]
+    matrixType = MatrixType.rigi
+
+    results = []
+
+    for elemType in elemTypes:
+
+        if elemType in ElemType.Get_2D():
+            mesh = Mesher().Mesh_2D(Domain(Point(), Point(L,L), meshSize2D), [], elemType)
+        else:
+            domain = Domain(Point(), Point(L,L), meshSize3D)
+            mesh = Mesher().Mesh_Extrude(domain, [], [0,0,L], [int(L/meshSize3D)], elemType)
+        mesh.zeroCopy = True # avoids copying the matrices stored in the mesh
+
+        Ne = mesh.Ne
+        nPg = mesh.Get_nPg(matrixType)
+        C = Materials.Elas_Isot(mesh.dim).C
+        k = 1.0
+
+        B_e_pg = mesh.Get_B_e_pg(matrixType)
+        leftDispPart = mesh.Get_leftDispPart(matrixType)
+        DiffusePart_e_pg = mesh.Get_DiffusePart_e_pg(matrixType)
+        dN_e_pg = mesh.Get_dN_e_pg(matrixType)
+
+        # ----------------------------------------------
+        # Properties repeated on (Ne, nPg)
+        # ----------------------------------------------
+        def repeated():
+            C_e_pg = np.ascontiguousarray(Materials.Reshape_variable(C, Ne, nPg))
+            Ku_e = np.sum(leftDispPart @ C_e_pg @ B_e_pg, axis=1)
+            k_e_pg = np.ascontiguousarray(Materials.Reshape_variable(k, Ne, nPg))
+            Kt_e = np.einsum('ep,epij,epjk->eik', k_e_pg, DiffusePart_e_pg, dN_e_pg, optimize='optimal')
+
+        # ----------------------------------------------
+        # Properties contracted against a shared tensor
+        # ----------------------------------------------
+        def shared():
+            left_e = (leftDispPart @ C).transpose(0,2,1,3).reshape(Ne, B_e_pg.shape[-1], -1)
+            Ku_e = left_e @ B_e_pg.reshape(Ne, -1, B_e_pg.shape[-1])
+            Kt_e = k * np.einsum('epij,epjk->eik', DiffusePart_e_pg, dN_e_pg, optimize='optimal')
+
+        time_r, peak_r = Measure(repeated)
+        time_s, peak_s = Measure(shared)
+
+        results.append((elemType, time_r, time_s, peak_r, peak_s))
+
+        print(f"{elemType:>8} Ne = {Ne:>6}: time {time_r:.3f} s -> {time_s:.3f} s, peak {peak_r:.1f} MB -> {peak_s:.1f} MB ({(peak_r-peak_s)/Ne*2**10:.2f} kB/element saved)")
+
+    # ----------------------------------------------
+    # Display
+    # ----------------------------------------------
+    names = [result[0] for result in results]
+    x = np.arange(len(names))
+    width = 0.4
+
+    axTime, axMemory = plt.subplots(1, 2, figsize=(12,5))[1]
+    axTime.bar(x-width/2, [result[1] for result in results], width, label="repeated")
+    axTime.bar(x+width/2, [result[2] for result in results], width, label="shared")
+    axTime.set_ylabel("time [s]")
+    axMemory.bar(x-width/2, [result[3] for result in results], width, label="repeated")
+    axMemory.bar(x+width/2, [result[4] for result in results], width, label="shared")
+    axMemory.set_ylabel("memory peak [MB]")
+    for ax in [axTime, axMemory]:
+        ax.set_xticks(x, names)
+        ax.legend()
+        ax.grid(axis='y')
+
+    plt.show()
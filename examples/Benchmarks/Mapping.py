@@ -0,0 +1,58 @@
+# Copyright (C) 2021-2024 Université Gustave Eiffel.
+# This file is part of the EasyFEA project.
+# EasyFEA is distributed under the terms of the GNU General Public License v3 or later, see LICENSE.txt and CREDITS.md for more information.
+
+"""Scaling of the point location (groupElem.Get_Mapping) with the number of points and elements."""
+
+from EasyFEA import Display, Tic, Mesher, ElemType, plt, np
+from EasyFEA.Geoms import Domain, Point
+
+if __name__ == '__main__':
+
+    Display.Clear()
+
+    # ----------------------------------------------
+    # Configuration
+    # ----------------------------------------------
+    L = 1
+    list_Ne = [1e3, 1e4, 1e5] # approximate number of elements
+    list_Np = [1e3, 1e4, 1e5, 1e6] # number of points
+    elemType = ElemType.TRI3
+
+    np.random.seed(0)
+
+    ax = Display.Init_Axes()
+
+    for Ne in list_Ne:
+
+        # TRI3 elements in a square of size L -> Ne ≈ 2 (L/meshSize)^2
+        meshSize = L / np.sqrt(Ne/2)
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(L,L), meshSize), [], elemType)
+        groupElem = mesh.groupElem
+
+        times = []
+        for Np in list_Np:
+
+            coordinates = np.zeros((int(Np), 3))
+            coordinates[:,:2] = np.random.rand(int(Np), 2) * L
+
+            groupElem._InitMatrix() # the bin grid is built during the first mapping
+
+            tic = Tic()
+            detectedNodes, detectedElements_e, connect_e_n, coordInElem_n = groupElem.Get_Mapping(coordinates)
+            time = tic.Tac("Benchmark", f"Mapping Ne={mesh.Ne}, Np={int(Np)}", False)
+            times.append(time)
+
+            assert np.unique(detectedNodes).size == int(Np), "All points must be detected."
+
+            print(f"Ne = {mesh.Ne:>7}, Np = {int(Np):>8} -> {time:.3f} s")
+
+        ax.loglog(list_Np, times, marker='.', label=f"Ne = {mesh.Ne}")
+
+    ax.set_xlabel("number of points")
+    ax.set_ylabel("time [s]")
+    ax.grid()
+    ax.legend()
+    ax.set_title("Get_Mapping")
+
+    plt.show()
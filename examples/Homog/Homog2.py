@@ -211,9 +211,7 @@ if __name__ == '__main__':
     E22 = np.array([[0, 0],[0, 1]])
     E12 = np.array([[0, 1/r2],[1/r2, 0]])
 
-    def Calc_ukl(Ekl: np.ndarray, pltSol=False):
-
-        simu.Bc_Init()
+    def Apply_Bc(Ekl: np.ndarray):
 
         func_ux = lambda x, y, z: Ekl.dot([x, y])[0]
         func_uy = lambda x, y, z: Ekl.dot([x, y])[1]
@@ -254,7 +252,14 @@ if __name__ == '__main__':
                 condition = LagrangeCondition("elastic", nodes, dofs, ["y"], [0], [vect])
                 simu._Bc_Add_Lagrange(condition)
 
-        ukl = simu.Solve()
+    # the 3 problems share the same matrix system
+    u11, u22, u12 = simu.Solve_multiple([lambda: Apply_Bc(E11),
+                                         lambda: Apply_Bc(E22),
+                                         lambda: Apply_Bc(E12)])
+
+    for ukl, pltSol in zip([u11, u22, u12], [False, False, True]):
+
+        simu._Set_u_n(simu.problemType, ukl)
 
         simu.Save_Iter()
 
@@ -269,12 +274,6 @@ if __name__ == '__main__':
             # Display.Plot_Result(simu, "Eyy", factorDef=0.3, nodeValues=True)
             # Display.Plot_Result(simu, "Exy", factorDef=0.3, nodeValues=True)
 
-        return ukl
-
-    u11 = Calc_ukl(E11, False)
-    u22 = Calc_ukl(E22, False)
-    u12 = Calc_ukl(E12, True)
-
     u11_e = mesh.Locates_sol_e(u11)
     u22_e = mesh.Locates_sol_e(u22)
     u12_e = mesh.Locates_sol_e(u12)
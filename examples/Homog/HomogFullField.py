@@ -120,9 +120,7 @@ if __name__ == '__main__':
     else:
         nodes_border = mesh_VER.Nodes_Tags(["L0", "L1", "L2", "L3"])
 
-    def Calc_ukl(Ekl: np.ndarray):
-
-        simu_VER.Bc_Init()
+    def Apply_Bc(Ekl: np.ndarray):
 
         func_ux = lambda x, y, z: Ekl.dot([x, y])[0]
         func_uy = lambda x, y, z: Ekl.dot([x, y])[1]
@@ -145,19 +143,20 @@ if __name__ == '__main__':
                     condition = LagrangeCondition("elastic", nodes, dofs, [direction], [value], [1, -1])
                     simu_VER._Bc_Add_Lagrange(condition)
 
-        ukl = simu_VER.Solve()
+    # the 3 problems share the same matrix system
+    u11, u22, u12 = simu_VER.Solve_multiple([lambda: Apply_Bc(E11),
+                                             lambda: Apply_Bc(E22),
+                                             lambda: Apply_Bc(E12)])
+
+    for ukl in [u11, u22, u12]:
+
+        simu_VER._Set_u_n(simu_VER.problemType, ukl)
 
         simu_VER.Save_Iter()
         # Display.Plot_Result(simu_VER, "Exx")
         # Display.Plot_Result(simu_VER, "Eyy")
         # Display.Plot_Result(simu_VER, "Exy")
 
-        return ukl
-
-    u11 = Calc_ukl(E11)
-    u22 = Calc_ukl(E22)
-    u12 = Calc_ukl(E12)
-
     u11_e = mesh_VER.Locates_sol_e(u11)
     u22_e = mesh_VER.Locates_sol_e(u22)
     u12_e = mesh_VER.Locates_sol_e(u12)
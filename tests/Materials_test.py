@@ -8,7 +8,7 @@ from EasyFEA import np
 from EasyFEA import Geoms, Mesher, Simulations
 # materials
 from EasyFEA.Materials import _Elas, Elas_Isot, Elas_IsotTrans, Elas_Anisot,  PhaseField
-from EasyFEA.materials import Get_Pmat, Apply_Pmat, KelvinMandel_Matrix
+from EasyFEA.materials import Get_Pmat, Apply_Pmat, KelvinMandel_Matrix, Reshape_variable
 
 class Test_Materials(unittest.TestCase):
     
@@ -209,6 +209,21 @@ class Test_Materials(unittest.TestCase):
 
         mat.Walpole_Decomposition()
 
+    def test_Reshape_variable(self):
+
+        Ne, nPg = 10, 4
+        C = Elas_Isot(3).C
+
+        # constant values are broadcasted without copies
+        for variable, shape in [(2.0, (Ne, nPg)), (np.arange(nPg, dtype=float), (Ne, nPg)),
+                                (C, (Ne, nPg, 6, 6)), (np.array([C]*Ne), (Ne, nPg, 6, 6))]:
+            variable_e_pg = Reshape_variable(variable, Ne, nPg)
+            self.assertEqual(variable_e_pg.shape, shape)
+            self.assertFalse(variable_e_pg.flags.writeable)
+
+        self.assertTrue(np.array_equal(Reshape_variable(C, Ne, nPg)[3,2], C))
+        self.assertTrue(np.array_equal(Reshape_variable(np.arange(Ne, dtype=float), Ne, nPg)[:,1], np.arange(Ne)))
+
     def test_getPmat(self):
 
         Ne = 10
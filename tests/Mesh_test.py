@@ -3,9 +3,14 @@
 # EasyFEA is distributed under the terms of the GNU General Public License v3 or later, see LICENSE.txt and CREDITS.md for more information.
 
 import unittest
+import warnings
+from itertools import product
 
-from EasyFEA.fem._utils import MatrixType
+from EasyFEA.fem._utils import MatrixType, ElemType
 from EasyFEA import Display, Mesher, Mesh, plt, np
+from EasyFEA.Geoms import Point, Domain, Line, Circle
+from EasyFEA.fem import Calc_projector, _GroupElem
+import scipy.sparse as sp
 
 class Test_Mesh(unittest.TestCase):
 
@@ -44,5 +49,395 @@ class Test_Mesh(unittest.TestCase):
                 mesh.Get_ddN_e_pg(matrixType)                
                 mesh.Get_B_e_pg(matrixType)
 
+    def test_Assemble_matrix(self):
+
+        meshes = Mesher._Construct_2D_meshes()
+        meshes.extend(Mesher._Construct_3D_meshes()[:2])
+
+        for mesh in meshes:
+
+            for dof_n in [1, mesh.dim]:
+
+                Ndof = mesh.Nn * dof_n
+                nPe = mesh.nPe * dof_n
+                values_e = np.random.rand(mesh.Ne, nPe, nPe)
+
+                lines = mesh.Get_linesVector_e(dof_n).ravel()
+                columns = mesh.Get_columnsVector_e(dof_n).ravel()
+                K_coo = sp.csr_matrix((values_e.ravel(), (lines, columns)), shape=(Ndof, Ndof))
+                K_coo.sum_duplicates()
+
+                K = mesh.Assemble_matrix(values_e, dof_n)
+                np.testing.assert_array_equal(K.indptr, K_coo.indptr)
+                np.testing.assert_array_equal(K.indices, K_coo.indices)
+                np.testing.assert_allclose(K.data, K_coo.data)
+
+                # extra lines and columns (eg. lagrange multipliers)
+                K = mesh.Assemble_matrix(values_e, dof_n, Ndof + 3)
+                self.assertEqual(K.shape, (Ndof + 3, Ndof + 3))
+
+                # upper triangle of symmetric matrices
+                values_e = values_e + values_e.transpose(0,2,1)
+                K_coo = sp.csr_matrix((values_e.ravel(), (lines, columns)), shape=(Ndof, Ndof))
+                K = mesh.Assemble_matrix(values_e, dof_n, symmetric=True)
+                np.testing.assert_allclose(K.toarray(), sp.triu(K_coo).toarray())
+
+    def test_Assembly_indexes(self):
+
+        mesh = Mesher._Construct_2D_meshes()[0]
+        dim = mesh.dim
+
+        # the indexes are cached and copied by default
+        self.assertTrue(mesh.assembly_e.flags.writeable)
+        self.assertFalse(np.shares_memory(mesh.assembly_e, mesh.Get_assembly_e(dim)))
+        self.assertEqual(mesh.assembly_e.dtype, np.int64)
+
+        # the indexes are read-only views with zeroCopy
+        mesh.zeroCopy = True
+        self.assertTrue(np.shares_memory(mesh.assembly_e, mesh.Get_assembly_e(dim)))
+        self.assertTrue(np.shares_memory(mesh.linesVector_e, mesh.Get_linesVector_e(dim)))
+        self.assertTrue(np.shares_memory(mesh.columnsScalar_e, mesh.Get_columnsVector_e(1)))
+        self.assertFalse(mesh.assembly_e.flags.writeable)
+        mesh.zeroCopy = False
+
+        assembly_e = mesh.assembly_e.copy()
+        lines_e = mesh.linesScalar_e.copy()
+        K = mesh.Assemble_matrix(np.ones((mesh.Ne, mesh.nPe*dim, mesh.nPe*dim)), dim)
+
+        # int32 indexes
+        mesh.useInt32Indexes = True
+        self.assertEqual(mesh.assembly_e.dtype, np.int32)
+        self.assertEqual(mesh.linesScalar_e.dtype, np.int32)
+        np.testing.assert_array_equal(mesh.assembly_e, assembly_e)
+        np.testing.assert_array_equal(mesh.linesScalar_e, lines_e)
+        K32 = mesh.Assemble_matrix(np.ones((mesh.Ne, mesh.nPe*dim, mesh.nPe*dim)), dim)
+        self.assertEqual((K - K32).nnz, 0)
+
+    def test_zeroCopy(self):
+
+        mesh = Mesher._Construct_2D_meshes()[0]
+        matrixType = MatrixType.rigi
+
+        # by default the stored matrices are copied
+        B_e_pg = mesh.Get_B_e_pg(matrixType)
+        self.assertTrue(B_e_pg.flags.writeable)
+        self.assertFalse(np.shares_memory(B_e_pg, mesh.Get_B_e_pg(matrixType)))
+
+        mesh.zeroCopy = True
+        B_e_pg = mesh.Get_B_e_pg(matrixType)
+        self.assertFalse(B_e_pg.flags.writeable)
+        self.assertTrue(np.shares_memory(B_e_pg, mesh.Get_B_e_pg(matrixType)))
+        with self.assertRaises(ValueError):
+            B_e_pg[0] = 0.0
+        # the stored matrices are unchanged
+        mesh.zeroCopy = False
+        np.testing.assert_array_equal(B_e_pg, mesh.Get_B_e_pg(matrixType))
+
+    def test_StrainOperator(self):
+
+        meshes = Mesher._Construct_2D_meshes()[::3]
+        meshes.extend(Mesher._Construct_3D_meshes()[::2])
+
+        np.random.seed(0)
+
+        for mesh, matrixType in product(meshes, [MatrixType.rigi, MatrixType.mass]):
+
+            Ne, nPg = mesh.Ne, mesh.Get_nPg(matrixType)
+            strainOp = mesh.Get_strainOperator(matrixType)
+            B_e_pg = mesh.Get_B_e_pg(matrixType)
+            leftDispPart = mesh.Get_leftDispPart(matrixType)
+            nC, ndof_e = B_e_pg.shape[2:]
+
+            # the operator only stores dN_e_pg and wJ_e_pg
+            self.assertLess(strainOp.dN_e_pg.nbytes + strainOp.wJ_e_pg.nbytes, B_e_pg.nbytes)
+            np.testing.assert_allclose(strainOp.Get_B_e_pg(), B_e_pg, atol=1e-12)
+
+            u_e = np.random.rand(Ne, ndof_e)
+            Epsilon_e_pg = np.einsum('epij,ej->epi', B_e_pg, u_e)
+            np.testing.assert_allclose(strainOp.apply(u_e), Epsilon_e_pg, rtol=1e-10, atol=1e-12*np.abs(Epsilon_e_pg).max())
+
+            Sigma_e_pg = np.random.rand(Ne, nPg, nC)
+            f_e = np.einsum('epij,epj->ei', leftDispPart, Sigma_e_pg)
+            np.testing.assert_allclose(strainOp.applyT(Sigma_e_pg), f_e, rtol=1e-10, atol=1e-12*np.abs(f_e).max())
+
+            # homogeneous and heterogeneous stiffness matrices
+            C = np.random.rand(nC, nC); C = C + C.T
+            C_e_pg = np.random.rand(Ne, nPg, nC, nC); C_e_pg = C_e_pg + C_e_pg.transpose(0,1,3,2)
+            for c in [C, C_e_pg]:
+                Ku_e = np.sum(leftDispPart @ c @ B_e_pg, axis=1)
+                for useNumba in [False, True]:
+                    np.testing.assert_allclose(strainOp.stiffness(c, useNumba), Ku_e, rtol=1e-10, atol=1e-12*np.abs(Ku_e).max())
+
+            # operator restricted to some elements
+            elements = np.arange(0, Ne, 2)
+            np.testing.assert_allclose(mesh.Get_strainOperator(matrixType, elements).apply(u_e[elements]), strainOp.apply(u_e)[elements])
+
+    def test_ConstantStrain(self):
+
+        for elemType in [ElemType.TRI3, ElemType.TETRA4]:
+
+            if elemType == ElemType.TRI3:
+                mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/5), [], elemType)
+            else:
+                mesh = Mesher().Mesh_Extrude(Domain(Point(), Point(1,1), 1/5), [], [0,0,1], [3], elemType)
+            groupElem = mesh.groupElem
+            self.assertTrue(groupElem.isConstantStrain)
+
+            # the mass rule has several integration points
+            matrixType = MatrixType.mass
+            nPg = mesh.Get_nPg(matrixType)
+            self.assertTrue(nPg > 1)
+
+            # the gradients are stored on a single integration point and broadcasted
+            # without zeroCopy, the returned arrays are writeable copies
+            self.assertFalse(mesh.zeroCopy)
+            for array_e_pg in [groupElem.Get_F_e_pg(matrixType), groupElem.Get_invF_e_pg(matrixType),
+                               mesh.Get_jacobian_e_pg(matrixType), mesh.Get_dN_e_pg(matrixType)]:
+                self.assertEqual(array_e_pg.shape[:2], (mesh.Ne, nPg))
+                self.assertTrue(array_e_pg.flags.writeable)
+                array_e_pg *= 2
+            self.assertEqual(mesh.Get_strainOperator(matrixType).dN_e_pg.shape[1], 1)
+
+            # with zeroCopy, the returned arrays are the read-only broadcasted views
+            mesh.zeroCopy = True
+            for array_e_pg in [groupElem.Get_F_e_pg(matrixType), groupElem.Get_invF_e_pg(matrixType),
+                               mesh.Get_jacobian_e_pg(matrixType), mesh.Get_dN_e_pg(matrixType)]:
+                self.assertEqual(array_e_pg.shape[:2], (mesh.Ne, nPg))
+                self.assertEqual(array_e_pg.strides[1], 0)
+                self.assertFalse(array_e_pg.flags.writeable)
+            mesh.zeroCopy = False
+
+            # the gradients are the same on every integration point
+            dN_pg = groupElem.Get_dN_pg(matrixType)
+            invF_e_pg = np.linalg.inv(np.einsum('pik,ekj->epij', dN_pg, mesh.coord[mesh.connect][:,:,:mesh.dim]))
+            np.testing.assert_allclose(mesh.Get_dN_e_pg(matrixType), invF_e_pg @ dN_pg, rtol=1e-10, atol=1e-10)
+
+    def test_Evaluates_Polynomials(self):
+
+        meshes = Mesher._Construct_2D_meshes()[::3]
+        meshes.extend(Mesher._Construct_3D_meshes()[::2])
+
+        np.random.seed(0)
+
+        for mesh in meshes:
+
+            groupElem = mesh.groupElem
+            coord = np.random.rand(100, groupElem.dim) / groupElem.dim
+
+            for name, functions in [("N", groupElem._Ntild()), ("dN", groupElem._dNtild()), ("ddN", groupElem._ddNtild())]:
+                # the shape functions are stored as polynomial tables
+                self.assertIsNotNone(groupElem._Get_polynomials(name))
+                values = _GroupElem._Evaluates_Functions(functions, coord)
+                np.testing.assert_allclose(groupElem._Evaluates_Polynomials(name, coord), values, atol=1e-12)
+
+    def test_Gauss(self):
+
+        mesh = Mesher._Construct_2D_meshes()[0]
+        groupElem = mesh.groupElem
+
+        for matrixType in MatrixType.Get_types():
+            if matrixType == MatrixType.beam: continue
+            # the quadratures and the shape functions are computed once and shared
+            gauss = groupElem.Get_gauss(matrixType)
+            self.assertIs(gauss.weights, groupElem.Get_weight_pg(matrixType))
+            self.assertIs(groupElem.Get_dN_pg(matrixType), groupElem.Get_dN_pg(matrixType))
+            for array in [gauss.coord, gauss.weights, groupElem.Get_N_pg(matrixType), groupElem.Get_dN_pg(matrixType)]:
+                self.assertFalse(array.flags.writeable)
+            np.testing.assert_allclose(groupElem.Get_N_pg(matrixType).sum(-1), 1)
+
+    def test_Get_Mapping(self):
+
+        meshes = Mesher._Construct_2D_meshes()[::3]
+        meshes.extend(Mesher._Construct_3D_meshes()[::3])
+
+        np.random.seed(0)
+
+        for mesh in meshes:
+
+            groupElem = mesh.groupElem
+            coord = mesh.coordGlob
+            coordinates = coord.min(0) + (coord.max(0) - coord.min(0)) * np.random.rand(200, 3)
+            if mesh.inDim == 2:
+                coordinates[:,2] = 0
+
+            nodes, elements, connect_e_n, coordInElem_n = groupElem.Get_Mapping(coordinates)
+
+            # compare with the points detected element by element
+            connect_ref = [groupElem.Get_pointsInElem(coordinates, e) for e in range(mesh.Ne)]
+            elements_ref = [e for e in range(mesh.Ne) if connect_ref[e].size > 0]
+            np.testing.assert_array_equal(elements, elements_ref)
+            for e, nodes_e in zip(elements, connect_e_n):
+                np.testing.assert_array_equal(np.asarray(nodes_e, dtype=int), connect_ref[e])
+
+            # the coordinates in the reference element give back the coordinates
+            N_n_pe = np.array([[N[0](*xi) for N in groupElem._Ntild()] for xi in coordInElem_n[nodes]]).reshape(-1, mesh.nPe)
+            connect_n = np.array([mesh.connect[e] for e, nodes_e in zip(elements, connect_e_n) for n in nodes_e], dtype=int).reshape(-1, mesh.nPe)
+            last = len(nodes) - 1 - np.unique(nodes[::-1], return_index=True)[1]
+            coordinates_n = np.einsum('np,npi->ni', N_n_pe[last], coord[connect_n[last]])
+            np.testing.assert_allclose(coordinates_n, coordinates[nodes[last]], atol=1e-8)
+
+    def test_Get_Mapping_image(self):
+
+        # mesh positioned in an image of 40 x 30 pixels
+        domain = Domain(Point(3.5, 2.5), Point(35.5, 27), 4)
+        meshes = [Mesher().Mesh_2D(domain, [], elemType) for elemType in [ElemType.TRI3, ElemType.QUAD4, ElemType.TRI6]]
+
+        nY, nX = 30, 40
+        X, Y = np.meshgrid(np.arange(nX), np.arange(nY))
+        pixels = np.zeros((nX*nY, 3), dtype=int)
+        pixels[:,0] = X.ravel()
+        pixels[:,1] = Y.ravel()
+
+        for mesh in meshes:
+            groupElem = mesh.groupElem
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                # integer pixels use the image fast path and float coordinates use the bin grid
+                results = groupElem.Get_Mapping(pixels)
+                results_ref = groupElem.Get_Mapping(pixels.astype(float))
+                # coordinates located on the nodes
+                groupElem.Get_Mapping(mesh.coordGlob)
+
+            nodes, elements, connect_e_n, coordInElem_n = results
+            nodes_ref, elements_ref, connect_ref, coordInElem_ref = results_ref
+            self.assertTrue(nodes.size > 0)
+            np.testing.assert_array_equal(nodes, nodes_ref)
+            np.testing.assert_array_equal(elements, elements_ref)
+            for nodes_e, nodes_e_ref in zip(connect_e_n, connect_ref):
+                np.testing.assert_array_equal(nodes_e, nodes_e_ref)
+            np.testing.assert_allclose(coordInElem_n, coordInElem_ref, atol=1e-12)
+
+    def test_Get_Mapping_Newton(self):
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/2), [], ElemType.QUAD4)
+        Newton = mesh.groupElem._GroupElem__Get_coordInElem_Newton
+
+        distorted = np.array([[0,0],[2,0],[1.5,1.2],[0,1]], dtype=float)
+        # all the nodes are aligned: the jacobian matrix is singular
+        degenerated = np.array([[0,0],[1,0],[2,0],[3,0]], dtype=float)
+
+        coordElem_p = np.array([distorted, degenerated])
+        xP_p = np.array([[1, 0.5], [0.5, 0.5]])
+
+        xi_p, converged_p = Newton(coordElem_p, xP_p, np.zeros((2, 2)))
+
+        np.testing.assert_array_equal(converged_p, [True, False])
+        N = np.array([N[0](*xi_p[0]) for N in mesh.groupElem._Ntild()]).ravel()
+        np.testing.assert_allclose(N @ distorted, xP_p[0], atol=1e-12)
+
+    def test_Elements_Nodes(self):
+
+        meshes = Mesher._Construct_2D_meshes()[::3]
+        meshes.extend(Mesher._Construct_3D_meshes()[::3])
+
+        np.random.seed(0)
+
+        for mesh in meshes:
+
+            connect = mesh.connect
+            nodes = np.random.choice(mesh.Nn, mesh.Nn//2, replace=False)
+            isIn_e_n = np.isin(connect, nodes)
+
+            # elements using the nodes
+            elements = mesh.Elements_Nodes(nodes, exclusively=False)
+            np.testing.assert_array_equal(elements, np.where(np.any(isIn_e_n, 1))[0])
+
+            # elements only using the nodes
+            elements = mesh.Elements_Nodes(nodes, exclusively=True)
+            np.testing.assert_array_equal(elements, np.where(np.all(isIn_e_n, 1))[0])
+
+            # second layer of elements
+            elements = mesh.Elements_Nodes(nodes[:5], exclusively=False)
+            elements2 = np.where(np.any(np.isin(connect, connect[elements]), 1))[0]
+            np.testing.assert_array_equal(mesh.Elements_Nodes(nodes[:5], False, 2), elements2)
+
+            # elements sharing a node
+            connect_e_e = mesh.Get_connect_e_e()
+            for e in range(0, mesh.Ne, 10):
+                neighbors = np.where(np.any(np.isin(connect, connect[e]), 1))[0]
+                np.testing.assert_array_equal(connect_e_e[e].indices, neighbors)
+
+    def test_Nodes_Points_batch(self):
+
+        mesh = Mesher._Construct_2D_meshes()[0]
+        coord = mesh.coord
+
+        nodes = np.arange(0, mesh.Nn, 3)
+        np.testing.assert_array_equal(mesh.Nodes_Points_batch(coord[nodes]), nodes)
+        np.testing.assert_array_equal(mesh.Nodes_Points([Point(*coord[n]) for n in nodes]), nodes)
+
+        # points far from the nodes
+        np.testing.assert_array_equal(mesh.Nodes_Points_batch(coord[nodes] + 1e3), -1)
+
+        # the spatial index follows the mesh coordinates
+        mesh.Translate(dx=2)
+        np.testing.assert_array_equal(mesh.Nodes_Points_batch(coord[nodes] + [2,0,0]), nodes)
+        self.assertEqual(mesh.Nodes_Point(Point(*coord[nodes[1]])).size, 0)
+        self.assertEqual(mesh.Nodes_Point(Point(*coord[nodes[1]] + [2,0,0]))[0], nodes[1])
+
+    def test_Nodes_selection(self):
+
+        L, h = 10, 4
+        domain = Domain(Point(), Point(L, h), h/6)
+        circle = Circle(Point(L/2, h/2), h/2, h/10)
+        mesh2D = Mesher().Mesh_2D(domain, [circle], ElemType.TRI6)
+        mesh3D = Mesher().Mesh_Extrude(domain, [circle], [0,0,h], [4], ElemType.PRISM6)
+
+        for mesh in [mesh2D, mesh3D]:
+            
+            groupElem = mesh.groupElem
+            coord = mesh.coord
+
+            def check(nodes: np.ndarray, groupNodes: np.ndarray):
+                # the spatial index must not change the detected nodes
+                np.testing.assert_array_equal(np.sort(nodes), np.sort(groupNodes))
+                self.assertTrue(nodes.size > 0)
+
+            for point in [Point(*coord[3]), Point(*coord[-1]), Point(*coord[3] * (1 + 1e-5))]:
+                check(mesh.Nodes_Point(point), groupElem.Get_Nodes_Point(point))
+
+            for line in [Line(Point(), Point(L)), Line(Point(L), Point(L,h)), Line(Point(0,h), Point(L,h))]:
+                check(mesh.Nodes_Line(line), groupElem.Get_Nodes_Line(line))
+
+            for dom in [Domain(Point(), Point(L/3,h)), Domain(Point(L/4,h/4), Point(L,h,h/2))]:
+                check(mesh.Nodes_Domain(dom), groupElem.Get_Nodes_Domain(dom))
+
+            for onEdge in [False, True]:
+                check(mesh.Nodes_Circle(circle, onEdge), groupElem.Get_Nodes_Circle(circle, onEdge))
+                for direction in [[0,0,1], [0,1,0]]:
+                    check(mesh.Nodes_Cylinder(circle, direction, onEdge),
+                          groupElem.Get_Nodes_Cylinder(circle, direction, onEdge))
+
+    def test_Calc_projector(self):
+
+        domain = lambda meshSize: Domain(Point(), Point(1,1), meshSize)
+        
+        for elemType in [ElemType.TRI3, ElemType.TRI6, ElemType.QUAD4, ElemType.QUAD8]:
+
+            oldMesh = Mesher().Mesh_2D(domain(1/5), [], elemType)
+            newMesh = Mesher().Mesh_2D(domain(1/9), [], elemType)
+
+            proj = Calc_projector(oldMesh, newMesh)
+            self.assertEqual(proj.shape, (newMesh.Nn, oldMesh.Nn))
+
+            # linear fields are projected exactly
+            func = lambda coord: 1 + 2 * coord[:,0] - 3 * coord[:,1]
+            np.testing.assert_allclose(proj @ func(oldMesh.coord), func(newMesh.coord), atol=1e-12)
+
+            # coincident nodes keep their values
+            corners = newMesh.Get_list_groupElem(0)[0].nodes
+            oldCorners = oldMesh.Nodes_Points_batch(newMesh.coord[corners])
+            np.testing.assert_array_equal(proj[corners].indices, oldCorners)
+            np.testing.assert_array_equal(proj[corners].data, 1)
+
+            # nodes outside the old mesh take the values of the closest old nodes
+            largerMesh = Mesher().Mesh_2D(Domain(Point(), Point(1.2,1), 1/9), [], elemType)
+            proj = Calc_projector(oldMesh, largerMesh)
+            outside = largerMesh.Nodes_Conditions(lambda x,y,z: x > 1 + 1e-12)
+            distances = np.linalg.norm(largerMesh.coord[outside,np.newaxis] - oldMesh.coord, axis=2)
+            np.testing.assert_array_equal(np.diff(proj.indptr) > 0, True)
+            np.testing.assert_array_equal(np.diff(proj[outside].indptr), 1)
+            np.testing.assert_allclose(distances[np.arange(outside.size), proj[outside].indices], distances.min(1))
+
 if __name__ == '__main__':
-    unittest.main(verbosity=2)
\ No newline at end of file
+    unittest.main(verbosity=2)
@@ -8,6 +8,10 @@ from EasyFEA import Display, Tic, plt, np
 from EasyFEA.Geoms import Domain, Circle, Point, Line
 from EasyFEA import Mesher, Mesh, ElemType
 from EasyFEA import Materials, Simulations
+from EasyFEA.fem import LagrangeCondition
+from EasyFEA.simulations import Solvers
+from EasyFEA.simulations.Solvers import _ScipyLinearDirect, _Available_Solvers
+import scipy.sparse as sparse
 
 class Test_Simu(unittest.TestCase):
     
@@ -301,6 +305,535 @@ class Test_Simu(unittest.TestCase):
                     simu.Solve()
                     simu.Save_Iter()
 
+    def test_Factorizations(self):
+        """Function use to check that stored factorizations are reused only when the matrix system is unchanged"""
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/10))
+        nodes_0 = mesh.Nodes_Conditions(lambda x,y,z: x == 0)
+        nodes_1 = mesh.Nodes_Conditions(lambda x,y,z: x == 1)
+
+        material = Materials.Elas_Isot(2)
+        simu = Simulations.ElasticSimu(mesh, material, verbosity=False)
+        simu.solver = "scipy"
+
+        def DoSolve(load: float) -> np.ndarray:
+            simu.Bc_Init()
+            simu.add_dirichlet(nodes_0, [0, 0], ["x","y"])
+            simu.add_surfLoad(nodes_1, [load], ["y"])
+            return simu.Solve()
+
+        u1 = DoSolve(1)
+        u2 = DoSolve(2)
+        self.assertEqual(simu.factorizationStats, {"hits": 1, "misses": 1})
+        self.assertTrue(np.allclose(u2, 2*u1, rtol=1e-12, atol=1e-15))
+
+        # the material is modified, the matrix system must be factorized again
+        material.E *= 2
+        u3 = DoSolve(2)
+        self.assertEqual(simu.factorizationStats, {"hits": 1, "misses": 2})
+        self.assertTrue(np.allclose(u3, u1, rtol=1e-12, atol=1e-15))
+
+        # the unknown dofs are modified
+        simu.Bc_Init()
+        simu.add_dirichlet(nodes_0, [0], ["x"])
+        simu.add_dirichlet(nodes_1, [0, 0], ["x","y"])
+        simu.Solve()
+        self.assertEqual(simu.factorizationStats, {"hits": 1, "misses": 3})
+
+    def test_zeroCopy(self):
+        """Function use to check that the assembled matrices are returned as read-only views with zeroCopy"""
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/10))
+        simu = Simulations.ElasticSimu(mesh, Materials.Elas_Isot(2), verbosity=False)
+
+        # by default the assembled matrices are copied
+        K1 = simu.Get_K_C_M_F()[0]
+        K2 = simu.Get_K_C_M_F()[0]
+        self.assertTrue(K1.data.flags.writeable)
+        self.assertFalse(np.shares_memory(K1.data, K2.data))
+
+        # assembled matrices returned as read-only views
+        simu.zeroCopy = True
+        K1 = simu.Get_K_C_M_F()[0]
+        K2 = simu.Get_K_C_M_F()[0]
+        self.assertTrue(K1.data is K2.data and not K1.data.flags.writeable)
+        simu.zeroCopy = False
+        self.assertTrue(simu.Get_K_C_M_F()[0].data.flags.writeable)
+
+    def test_MatrixFree(self):
+        """Function use to check that the matrix-free elastic operator gives the assembled stiffness matrix"""
+
+        mesh = Mesher().Mesh_Extrude(Domain(Point(), Point(1,1), 1/4), [], [0,0,1], [3], ElemType.HEXA8)
+        nodes_0 = mesh.Nodes_Conditions(lambda x,y,z: x == 0)
+        nodes_1 = mesh.Nodes_Conditions(lambda x,y,z: x == 1)
+
+        material = Materials.Elas_Isot(3)
+        simu = Simulations.ElasticSimu(mesh, material, verbosity=False)
+        simu.add_dirichlet(nodes_0, [0, 0, 0], ["x","y","z"])
+        simu.add_dirichlet(nodes_1, [1e-3], ["x"])
+        simu.add_surfLoad(nodes_1, [10], ["y"])
+        u_ref = simu.Solve()
+
+        K = simu.Get_K_C_M_F()[0]
+        u = np.random.rand(K.shape[0])
+        self.assertTrue(np.allclose(simu.Get_K_operator() @ u, K @ u, rtol=1e-12))
+        self.assertTrue(np.allclose(simu.Get_K_diagonal(), K.diagonal(), rtol=1e-12))
+        blocks = simu.Get_K_diagonal(block=True)
+        self.assertTrue(np.allclose(blocks[-1], K[-3:,-3:].toarray(), rtol=1e-12))
+
+        simu.matrixFree = True
+        # the matrix-free resolution requires an iterative solver
+        self.assertRaises(AssertionError, simu.Solve)
+        simu.solver = "cg"
+        simu._Set_u_n(simu.problemType, np.zeros_like(u_ref))
+        u = simu.Solve()
+        # cg is used with rtol=1e-10
+        self.assertTrue(np.linalg.norm(u - u_ref)/np.linalg.norm(u_ref) < 1e-8)
+
+    def test_Assembly_chunks(self):
+        """Function use to check that the assembly by blocks of elements gives the same matrices"""
+
+        mesh = Mesher().Mesh_Extrude(Domain(Point(), Point(1,1), 1/5), [], [0,0,1], [4], ElemType.PRISM6)
+
+        material = Materials.Elas_Isot(3, E=np.linspace(1, 2, mesh.Ne))
+        simu = Simulations.ElasticSimu(mesh, material, verbosity=False)
+        K1, _, M1, _ = simu.Get_K_C_M_F()
+
+        simu.assemblyChunkSize = 7
+        self.assertEqual(len(simu._Get_assembly_chunks(1)), int(np.ceil(mesh.Ne/7)))
+        simu.Need_Update()
+        K2, _, M2, _ = simu.Get_K_C_M_F()
+        self.assertTrue(np.allclose(K1.toarray(), K2.toarray(), rtol=1e-12, atol=1e-12))
+        self.assertTrue(np.allclose(M1.toarray(), M2.toarray(), rtol=1e-12, atol=1e-15))
+
+        # numpy scalars are homogeneous densities
+        for rho in [np.int64(2), np.float64(2), np.full(mesh.Ne, 2.0)]:
+            simu.rho = rho
+            simu.Need_Update()
+            M3 = simu.Get_K_C_M_F()[2]
+            self.assertTrue(np.allclose(M3.toarray(), 2*M1.toarray(), rtol=1e-12, atol=1e-15))
+        simu.rho = 1
+
+        simu.assemblyChunkSize = None
+        simu.assemblyMaxMemory = 1e-2 # MB
+        self.assertTrue(len(simu._Get_assembly_chunks(1024)) > 1)
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/10))
+        pfm = Materials.PhaseField(Materials.Elas_Isot(2), "Miehe", "AT2", 1, 1e-1)
+        simu = Simulations.PhaseFieldSimu(mesh, pfm, verbosity=False)
+        simu._Set_u_n("elastic", np.random.rand(mesh.Nn*2))
+        simu._Set_u_n("damage", np.random.rand(mesh.Nn))
+        K1 = simu.Get_K_C_M_F("elastic")[0]
+        simu.assemblyChunkSize = 10
+        K2 = simu.Get_K_C_M_F("elastic")[0]
+        self.assertTrue(np.allclose(K1.toarray(), K2.toarray(), rtol=1e-12, atol=1e-12))
+
+    def test_Numba_stiffness(self):
+        """Function use to check that the numba kernels and the numpy products give the same stiffness matrices"""
+
+        mesh = Mesher().Mesh_Extrude(Domain(Point(), Point(1,1), 1/5), [], [0,0,1], [4], ElemType.PRISM6)
+
+        material = Materials.Elas_Isot(3, E=np.linspace(1, 2, mesh.Ne))
+        simu = Simulations.ElasticSimu(mesh, material, verbosity=False)
+        # numba kernels are used by default
+        K1 = simu.Get_K_C_M_F()[0]
+
+        simu.useNumba = False
+        simu.Need_Update()
+        K0 = simu.Get_K_C_M_F()[0]
+        self.assertTrue(np.allclose(K0.toarray(), K1.toarray(), rtol=1e-12, atol=1e-12))
+
+        # the degraded stiffness of the anisotropic splits is not symmetric
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/5), [], ElemType.QUAD4)
+        material = Materials.Elas_IsotTrans(2, El=15716, Et=232, Gl=557, vl=0.44, vt=0.0, axis_l=[0,1,0], axis_t=[1,0,0])
+        pfm = Materials.PhaseField(material, Materials.PhaseField.SplitType.AnisotStress_PM, Materials.PhaseField.ReguType.AT2, 1, 0.1)
+        simu = Simulations.PhaseFieldSimu(mesh, pfm, verbosity=False)
+        rng = np.random.default_rng(0)
+        simu._Set_u_n("elastic", rng.uniform(-1e-3, 1e-3, mesh.Nn*2))
+        simu._Set_u_n("damage", rng.uniform(0, 0.9, mesh.Nn))
+        K1 = simu.Get_K_C_M_F("elastic")[0]
+        self.assertFalse(np.allclose(K1.toarray(), K1.toarray().T, rtol=1e-6))
+
+        simu.useNumba = False
+        simu.Need_Update()
+        K0 = simu.Get_K_C_M_F("elastic")[0]
+        self.assertTrue(np.allclose(K0.toarray(), K1.toarray(), rtol=1e-12, atol=1e-12*np.abs(K0).max()))
+
+    def test_Index_dtype(self):
+        """Function use to check the indices of the assembled matrices (int32 or int64)"""
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/10))
+        nodesX0 = mesh.Nodes_Conditions(lambda x,y,z: x==0)
+        nodesX1 = mesh.Nodes_Conditions(lambda x,y,z: x==1)
+
+        simu = Simulations.ElasticSimu(mesh, Materials.Elas_Isot(2), verbosity=False)
+        simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+        simu.add_neumann(nodesX1, [1], ["x"])
+
+        for solver in ["scipy", simu.solver]:
+            simu.solver = solver
+            list_u = []
+            for dtype in [np.int32, np.int64]:
+                simu.useInt32Matrices = dtype == np.int32
+                self.assertTrue(simu.needUpdate)
+                K, C, M, F = simu.Get_K_C_M_F()
+                for matrix in [K, C, M]:
+                    self.assertEqual(matrix.indices.dtype, dtype)
+                    self.assertEqual(matrix.indptr.dtype, dtype)
+                list_u.append(simu.Solve())
+            self.assertTrue(np.allclose(list_u[0], list_u[1], rtol=1e-12, atol=1e-15))
+
+        # the matrices given to the solvers are not modified
+        simu.useInt32Matrices = True
+        K = simu.Get_K_C_M_F()[0][2:,2:]
+        K.indices = K.indices.astype(np.int64); K.indptr = K.indptr.astype(np.int64)
+        b = sparse.csr_matrix(np.ones((K.shape[0], 1)))
+        Solvers._Solve_Axb(simu, simu.problemType, K, b, np.zeros(K.shape[0]), [], [])
+        self.assertEqual(K.indices.dtype, np.int64)
+        self.assertEqual(K.indptr.dtype, np.int64)
+
+    def test_Symmetric_storage(self):
+        """Function use to check that the upper triangular storage gives the same solutions"""
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/10), [], ElemType.TRI6)
+        nodesX0 = mesh.Nodes_Conditions(lambda x,y,z: x==0)
+        nodesX1 = mesh.Nodes_Conditions(lambda x,y,z: x==1)
+        nodesY0 = mesh.Nodes_Conditions(lambda x,y,z: y==0)
+
+        def Solve(simu: Simulations._Simu, useLagrange=False) -> np.ndarray:
+            simu.Bc_Init()
+            if isinstance(simu, Simulations.ThermalSimu):
+                # same previous solution
+                simu._Set_u_n("thermal", np.zeros(mesh.Nn))
+                simu._Set_v_n("thermal", np.zeros(mesh.Nn))
+                simu.add_dirichlet(nodesX0, [0], ["t"])
+                simu.add_neumann(nodesX1, [1], ["t"])
+            else:
+                simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+                simu.add_surfLoad(nodesX1, [1], ["x"])
+                if useLagrange:
+                    nodes = nodesY0[:2]
+                    dofs = simu.Bc_dofs_nodes(nodes, ["y"])
+                    simu._Bc_Add_Lagrange(LagrangeCondition("elastic", nodes, dofs, ["y"], [0], [1, -1]))
+            return simu.Solve()
+
+        elastic = Simulations.ElasticSimu(mesh, Materials.Elas_Isot(2), verbosity=False)
+        thermal = Simulations.ThermalSimu(mesh, Materials.Thermal(2, 1, 1), verbosity=False)
+        thermal.Solver_Set_Parabolic_Algorithm(0.1)
+
+        for simu, useLagrange, solver in [(elastic, False, "scipy"), (elastic, False, elastic.solver), (elastic, True, elastic.solver), (thermal, False, thermal.solver)]:
+            simu.solver = solver
+            simu.useSymmetricStorage = False
+            x_full = Solve(simu, useLagrange)
+            K_full = simu.Get_K_C_M_F()[0].toarray()
+
+            simu.useSymmetricStorage = True
+            self.assertTrue(simu.needUpdate)
+            x = Solve(simu, useLagrange)
+            K = simu.Get_K_C_M_F()[0]
+            self.assertTrue(np.allclose(K.toarray(), np.triu(K_full), rtol=1e-12, atol=1e-12))
+            self.assertTrue(np.allclose(x, x_full, rtol=1e-8, atol=1e-12))
+
+        # the non-symmetric Ku of the mixed phase-field splits is stored in full
+        material = Materials.Elas_IsotTrans(2, El=15716, Et=232, Gl=557, vl=0.44, vt=0.0, axis_l=[0,1,0], axis_t=[1,0,0])
+        pfm = Materials.PhaseField(material, Materials.PhaseField.SplitType.AnisotStress_PM, Materials.PhaseField.ReguType.AT2, 1, 0.1)
+        simu = Simulations.PhaseFieldSimu(mesh, pfm, verbosity=False)
+        u = np.random.default_rng(0).uniform(-1e-3, 1e-3, mesh.Nn*2)
+        d = np.random.default_rng(1).uniform(0, 0.9, mesh.Nn)
+        list_K = []
+        for useSymmetricStorage in [False, True]:
+            simu.useSymmetricStorage = useSymmetricStorage
+            # same previous solution
+            simu._Set_u_n("elastic", u)
+            simu._Set_u_n("damage", d)
+            list_K.append([simu.Get_K_C_M_F(problemType)[0].toarray() for problemType in ["elastic", "damage"]])
+            u_d = Solve(simu)[:2]
+            if not useSymmetricStorage:
+                u_d_full = u_d
+        self.assertTrue(np.allclose(list_K[1][0], list_K[0][0], rtol=1e-12, atol=1e-12))
+        self.assertTrue(np.allclose(list_K[1][1], np.triu(list_K[0][1]), rtol=1e-12, atol=1e-12))
+        for x, x_full in zip(u_d, u_d_full):
+            self.assertTrue(np.allclose(x, x_full, rtol=1e-8, atol=1e-12))
+
+    def test_Symmetry(self):
+        """Function use to check that the declared symmetry selects the factorization"""
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/10), [], ElemType.TRI6)
+        nodesX0 = mesh.Nodes_Conditions(lambda x,y,z: x==0)
+        nodesX1 = mesh.Nodes_Conditions(lambda x,y,z: x==1)
+
+        class NonSymmetricSimu(Simulations.ElasticSimu):
+            def Is_symmetric(self, problemType=None) -> bool:
+                return False
+
+        list_x = []
+        for simu in [Simulations.ElasticSimu(mesh, Materials.Elas_Isot(2), verbosity=False),
+                     NonSymmetricSimu(mesh, Materials.Elas_Isot(2), verbosity=False)]:
+            simu.solver = "scipy"
+            simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+            simu.add_surfLoad(nodesX1, [1], ["x"])
+            list_x.append(simu.Solve())
+        self.assertTrue(np.allclose(list_x[0], list_x[1], rtol=1e-10, atol=1e-14))
+
+        self.assertTrue(simu.Is_symmetric("elastic") is False)
+        self.assertRaises(AssertionError, setattr, simu, "useSymmetricStorage", True)
+
+        # the penalized system is not symmetric even if the simulation is
+        simu = Simulations.ElasticSimu(mesh, Materials.Elas_Isot(2), verbosity=False)
+        simu.solver = "scipy"
+        simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+        simu.add_surfLoad(nodesX1, [1], ["x"])
+        simu.Get_K_C_M_F()
+        x = getattr(Solvers, "__Solver_3")(simu, "elastic")
+        self.assertTrue(np.allclose(x, list_x[0], rtol=1e-10, atol=1e-14))
+
+        # symmetric indefinite system
+        A = sparse.bmat([[sparse.eye(3)*2, np.ones((3,1))], [np.ones((1,3)), None]], format="csr")
+        b = sparse.csr_matrix(np.arange(4, dtype=float).reshape(-1,1))
+        for isSymmetric, isDefinite in [(True, False), (False, False)]:
+            x = _ScipyLinearDirect(A, b, isSymmetric, isDefinite)[0].ravel()
+            self.assertTrue(np.allclose(A @ x, b.toarray().ravel()))
+
+    def test_PhaseField_symmetry(self):
+        """Function use to check the symmetry declared for the phase-field splits"""
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/5), [], ElemType.QUAD4)
+        nodesX0 = mesh.Nodes_Conditions(lambda x,y,z: x==0)
+        material = Materials.Elas_IsotTrans(2, El=15716, Et=232, Gl=557, vl=0.44, vt=0.0, axis_l=[0,1,0], axis_t=[1,0,0])
+        SplitType = Materials.PhaseField.SplitType
+        nonSymmetricSplits = [SplitType.Zhang, SplitType.AnisotStress_PM, SplitType.AnisotStress_MP, SplitType.AnisotStrain_PM, SplitType.AnisotStrain_MP]
+
+        rng = np.random.default_rng(0)
+        u = rng.uniform(-1e-3, 1e-3, mesh.Nn*2)
+        d = rng.uniform(0, 0.9, mesh.Nn)
+
+        for split in [SplitType.Bourdin, SplitType.He] + nonSymmetricSplits:
+            pfm = Materials.PhaseField(material, split, Materials.PhaseField.ReguType.AT2, 1, 0.1)
+            simu = Simulations.PhaseFieldSimu(mesh, pfm, verbosity=False)
+            self.assertTrue(simu.Is_symmetric("damage"))
+            self.assertTrue(simu.Is_symmetric("elastic") is (split not in nonSymmetricSplits))
+            # cholmod, cg (petsc) and the symmetric modes are only used for the symmetric splits
+            isSymmetric, isDefinite = getattr(Solvers, "__Get_Matrix_Properties")(simu, "elastic")
+            self.assertTrue(isSymmetric is isDefinite is (split not in nonSymmetricSplits))
+
+            simu._Set_u_n("elastic", u)
+            simu._Set_u_n("damage", d)
+            simu.solver = "scipy"
+            simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+            dofsUnknown = simu.Bc_dofs_known_unknow("elastic")[1]
+            K = simu.Get_K_C_M_F("elastic")[0].tocsr()
+            Kii = K[dofsUnknown][:,dofsUnknown]
+            b = sparse.csr_matrix(rng.uniform(-1, 1, (dofsUnknown.size, 1)))
+            x = Solvers._Solve_Axb(simu, "elastic", Kii, b, np.zeros(dofsUnknown.size), [], [])
+            self.assertTrue(np.allclose(Kii @ x, b.toarray().ravel(), rtol=1e-8, atol=1e-10))
+
+    def test_Cholmod(self):
+        """Function use to check the cholmod solver and the reuse of its symbolic analysis"""
+
+        if "cholmod" not in _Available_Solvers():
+            self.skipTest("scikit-sparse is not installed")
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/10), [], ElemType.TRI6)
+        nodesX0 = mesh.Nodes_Conditions(lambda x,y,z: x==0)
+        nodesX1 = mesh.Nodes_Conditions(lambda x,y,z: x==1)
+
+        material = Materials.Elas_Isot(2)
+        simu = Simulations.ElasticSimu(mesh, material, verbosity=False)
+        simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+        simu.add_surfLoad(nodesX1, [1], ["x"])
+
+        simu.solver = "scipy"
+        u_ref = simu.Solve()
+
+        for useSymmetricStorage in [False, True]:
+            simu.useSymmetricStorage = useSymmetricStorage
+            simu.solver = "cholmod"
+            u = simu.Solve()
+            self.assertTrue(np.allclose(u, u_ref, rtol=1e-10, atol=1e-14))
+            dofsUnknown = simu.Bc_dofs_known_unknow("elastic")[1]
+            self.assertTrue(simu._factorizations.Get_preconditioner("elastic", dofsUnknown) is None)
+            factor = simu._factorizations._Factorizations__cholmodFactors["elastic"][-1]
+
+            # new values with the same sparsity pattern
+            material.E *= 2
+            u = simu.Solve()
+            material.E /= 2
+            self.assertTrue(np.allclose(2*u, u_ref, rtol=1e-10, atol=1e-14))
+            self.assertTrue(simu._factorizations._Factorizations__cholmodFactors["elastic"][-1] is factor)
+            simu.Need_Update()
+
+        # the non-symmetric Ku of the mixed phase-field splits is not factorized with cholmod
+        material = Materials.Elas_IsotTrans(2, El=15716, Et=232, Gl=557, vl=0.44, vt=0.0, axis_l=[0,1,0], axis_t=[1,0,0])
+        pfm = Materials.PhaseField(material, Materials.PhaseField.SplitType.AnisotStress_PM, Materials.PhaseField.ReguType.AT2, 1, 0.1)
+        simu = Simulations.PhaseFieldSimu(mesh, pfm, verbosity=False)
+        simu._Set_u_n("elastic", np.random.default_rng(0).uniform(-1e-3, 1e-3, mesh.Nn*2))
+        simu._Set_u_n("damage", np.random.default_rng(1).uniform(0, 0.9, mesh.Nn))
+        simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+        simu.add_surfLoad(nodesX1, [1], ["x"])
+        dofsUnknown = simu.Bc_dofs_known_unknow("elastic")[1]
+        K = simu.Get_K_C_M_F("elastic")[0].tocsr()
+        Kii = K[dofsUnknown][:,dofsUnknown]
+        b = sparse.csr_matrix(np.random.default_rng(2).uniform(-1, 1, (dofsUnknown.size, 1)))
+        simu.solver = "cholmod"
+        x = Solvers._Solve_Axb(simu, "elastic", Kii, b, np.zeros(dofsUnknown.size), [], [], dofsUnknown)
+        self.assertTrue(np.allclose(Kii @ x, b.toarray().ravel(), rtol=1e-8, atol=1e-10))
+        self.assertTrue("elastic" not in simu._factorizations._Factorizations__cholmodFactors)
+
+    def test_PETSc(self):
+        """Function use to check that the PETSc objects are reused and scoped to the simulation"""
+
+        if "petsc" not in _Available_Solvers():
+            self.skipTest("petsc4py is not installed")
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/10), [], ElemType.TRI3)
+        nodesX0 = mesh.Nodes_Conditions(lambda x,y,z: x==0)
+        nodesX1 = mesh.Nodes_Conditions(lambda x,y,z: x==1)
+
+        list_simu: list[Simulations.ElasticSimu] = []
+        for _ in range(2):
+            simu = Simulations.ElasticSimu(mesh, Materials.Elas_Isot(2), verbosity=False)
+            simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+            simu.add_surfLoad(nodesX1, [1], ["x"])
+            simu.solver = "scipy"
+            u_ref = simu.Solve()
+            simu.solver = "petsc"
+            list_simu.append(simu)
+
+        simu1, simu2 = list_simu
+        u = simu1.Solve()
+        self.assertTrue(np.allclose(u, u_ref, rtol=1e-6, atol=1e-12))
+        context = simu1._factorizations.Get_PETSc_context("elastic")
+        self.assertEqual(len(context.iterations), 1)
+        self.assertEqual(len(context.residuals), 1)
+
+        # new values with the same sparsity pattern
+        simu1.material.E *= 2
+        u = simu1.Solve()
+        self.assertTrue(np.allclose(2*u, u_ref, rtol=1e-6, atol=1e-12))
+        self.assertTrue(simu1._factorizations.Get_PETSc_context("elastic") is context)
+        self.assertEqual(len(context.iterations), 2)
+
+        # the fallback only applies to the simulation
+        context.Set_fallback("none")
+        simu1.material.E /= 2
+        self.assertTrue(np.allclose(simu1.Solve(), u_ref, rtol=1e-6, atol=1e-12))
+        self.assertEqual(context.pcType, "none")
+        simu2.Solve()
+        self.assertTrue(simu2._factorizations.Get_PETSc_context("elastic").pcFallback is None)
+
+    def test_AMG(self):
+        """Function use to check the cg solver preconditioned with the smoothed aggregation AMG"""
+
+        domain = Domain(Point(), Point(1,1), 1/8)
+        meshes = [Mesher().Mesh_2D(domain, [], ElemType.QUAD8), Mesher().Mesh_Extrude(domain, [], [0,0,1], [4], ElemType.TETRA4)]
+
+        for mesh in meshes:
+            nodesX0 = mesh.Nodes_Conditions(lambda x,y,z: x==0)
+            nodesX1 = mesh.Nodes_Conditions(lambda x,y,z: x==1)
+            dim = mesh.dim
+            directions = ["x","y","z"][:dim]
+
+            elastic = Simulations.ElasticSimu(mesh, Materials.Elas_Isot(dim), verbosity=False)
+            thermal = Simulations.ThermalSimu(mesh, Materials.Thermal(dim, 1, 1), verbosity=False)
+
+            def Update_material(simu: Simulations._Simu):
+                if simu is elastic:
+                    simu.material.E = simu.material.E * 3
+                else:
+                    simu.thermalModel.k = simu.thermalModel.k * 3
+
+            for simu, direction in [(elastic, directions), (thermal, ["t"])]:
+                simu.add_dirichlet(nodesX0, [0]*len(direction), direction)
+                simu.add_neumann(nodesX1, [1], direction[:1])
+                simu.solver = "scipy"
+                x_ref = simu.Solve()
+                simu.solver = "cg-amg"
+                x = simu.Solve()
+                self.assertTrue(np.allclose(x, x_ref, rtol=1e-8, atol=1e-8*np.abs(x_ref).max()))
+                dofsUnknown = simu.Bc_dofs_known_unknow(simu.problemType)[1]
+                amg = simu._factorizations.Get_preconditioner(simu.problemType, dofsUnknown)
+                self.assertIsNotNone(amg)
+
+                # the preconditioner is updated with the new values of the matrix
+                Update_material(simu)
+                x = simu.Solve()
+                self.assertIs(simu._factorizations.Get_preconditioner(simu.problemType, dofsUnknown), amg)
+                self.assertFalse(np.allclose(x, x_ref, rtol=1e-2))
+                simu.solver = "scipy"
+                x_ref = simu.Solve()
+                self.assertTrue(np.allclose(x, x_ref, rtol=1e-8, atol=1e-8*np.abs(x_ref).max()))
+
+    def test_Dirichlet_partition(self):
+        """Function use to check that the known and unknown dofs and the extraction of Aii and Aic are reused"""
+
+        mesh = Mesher().Mesh_2D(Domain(Point(), Point(1,1), 1/10), [], ElemType.TRI3)
+        nodesX0 = mesh.Nodes_Conditions(lambda x,y,z: x==0)
+        nodesX1 = mesh.Nodes_Conditions(lambda x,y,z: x==1)
+
+        simu = Simulations.ElasticSimu(mesh, Materials.Elas_Isot(2), verbosity=False)
+
+        for useSymmetricStorage in [False, True]:
+            simu.useSymmetricStorage = useSymmetricStorage
+            simu.Bc_Init()
+            simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+            simu.add_dirichlet(nodesX1, [1e-3], ["x"])
+            known, unknown = simu.Bc_dofs_known_unknow("elastic")
+            self.assertTrue(np.array_equal(known, np.unique(simu.Bc_dofs_Dirichlet("elastic"))))
+            self.assertTrue(np.array_equal(unknown, np.setdiff1d(np.arange(mesh.Nn*2), known)))
+            u = simu.Solve()
+            partition = simu._factorizations.Get_partition("elastic")
+
+            # same dofs with other values
+            simu.Bc_Init()
+            simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+            simu.add_dirichlet(nodesX1, [2e-3], ["x"])
+            self.assertTrue(simu.Bc_dofs_known_unknow("elastic")[1] is unknown)
+            self.assertTrue(np.allclose(simu.Solve(), 2*u, rtol=1e-10, atol=1e-14))
+            self.assertTrue(simu._factorizations.Get_partition("elastic") is partition)
+
+            # other dofs
+            simu.Bc_Init()
+            simu.add_dirichlet(nodesX0, [0,0], ["x","y"])
+            known, unknown = simu.Bc_dofs_known_unknow("elastic")
+            self.assertEqual(known.size, nodesX0.size*2)
+            self.assertTrue(np.allclose(simu.Solve(), 0))
+            self.assertFalse(simu._factorizations.Get_partition("elastic") is partition)
+
+    def test_Solve_multiple(self):
+        """Function use to check that the multiple right-hand sides resolution gives the sequential solutions"""
+
+        mesh = Mesher().Mesh_2D(Domain(Point(-1/2,-1/2), Point(1/2,1/2), 1/10))
+        corners = mesh.Nodes_Tags(["P0", "P1", "P2", "P3"])
+        paired_nodes = mesh.Get_Paired_Nodes(corners, True)
+        coord = mesh.coord
+
+        simu = Simulations.ElasticSimu(mesh, Materials.Elas_Isot(2), verbosity=False)
+
+        def Apply_Bc(Ekl: np.ndarray, usePER: bool):
+            simu.add_dirichlet(corners, [lambda x,y,z: Ekl.dot([x, y])[0], lambda x,y,z: Ekl.dot([x, y])[1]], ["x","y"])
+            if usePER:
+                for n0, n1 in paired_nodes:
+                    nodes = np.array([n0, n1])
+                    values = Ekl @ (coord[n0,:2] - coord[n1,:2])
+                    for d, direction in enumerate(["x", "y"]):
+                        dofs = simu.Bc_dofs_nodes(nodes, [direction])
+                        simu._Bc_Add_Lagrange(LagrangeCondition("elastic", nodes, dofs, [direction], [values[d]], [1, -1]))
+
+        list_Ekl = [np.array([[1, 0],[0, 0]]), np.array([[0, 0],[0, 1]]), np.array([[0, .5],[.5, 0]])]
+
+        for usePER in [False, True]:
+            list_u = []
+            for Ekl in list_Ekl:
+                simu.Bc_Init()
+                Apply_Bc(Ekl, usePER)
+                list_u.append(simu.Solve())
+
+            u_mult = simu.Solve_multiple([lambda Ekl=Ekl: Apply_Bc(Ekl, usePER) for Ekl in list_Ekl])
+
+            self.assertEqual(u_mult.shape, (3, mesh.Nn*2))
+            self.assertTrue(np.allclose(u_mult, list_u, rtol=1e-9, atol=1e-12))
+            self.assertTrue(np.allclose(simu.displacement, list_u[-1], rtol=1e-9, atol=1e-12))
+
     def test_Update_Elastic(self):
         """Function use to check that modifications on elastic material activate the update of the simulation"""
 